@@ -3,25 +3,110 @@ API Flask améliorée pour scraper Indeed avec Selenium sur le VPS
 Version 2 avec filtres avancés et évitement 403
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+import requests
+import os
 import time
+import queue
 import random
 import logging
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
 from datetime import datetime, timedelta
 import re
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 app = Flask(__name__)
 CORS(app)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pool de drivers (DRIVER_POOL_SIZE=0: un driver neuf par requête, comme avant)
+DRIVER_POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', '2'))
+DRIVER_MAX_PAGES = int(os.getenv('DRIVER_MAX_PAGES', '60'))
+DRIVER_MAX_RSS_MB = int(os.getenv('DRIVER_MAX_RSS_MB', '900'))
+DRIVER_CHECKOUT_TIMEOUT = float(os.getenv('DRIVER_CHECKOUT_TIMEOUT', '180'))
+
+# File de jobs: nombre de navigateurs qui scrapent en parallèle et rétention des résultats
+SCRAPE_WORKERS = int(os.getenv('SCRAPE_WORKERS', str(max(1, DRIVER_POOL_SIZE))))
+JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', '900'))
+SYNC_WAIT_TIMEOUT = float(os.getenv('SYNC_WAIT_TIMEOUT', '300'))
+MAX_BATCH_SEARCHES = int(os.getenv('MAX_BATCH_SEARCHES', '20'))
+
+# Cache des pages de résultats (RESULT_CACHE_TTL=0 pour le désactiver)
+RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', '180'))
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', str(20 * 1024 * 1024)))
+
+# Chargement des pages: blocage des ressources inutiles et attente des cartes d'offres
+BLOCK_RESOURCES = os.getenv('BLOCK_RESOURCES', 'true').lower() == 'true'
+PAGE_WAIT_TIMEOUT = float(os.getenv('PAGE_WAIT_TIMEOUT', '15'))
+
+# Ressources bloquées via CDP (images, polices, styles, traqueurs)
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.css', '*.mp4',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*hotjar.com*', '*bing.com/bat*'
+]
+
+JOB_CARD_SELECTOR = 'div.job_seen_beacon, div[data-jk], td.resultContent'
+
+# Extraction des cartes dans la page (un seul aller-retour WebDriver par page)
+EXTRACT_CARDS_JS = """
+const clean = value => (value || '').replace(/\\s+/g, ' ').trim();
+const cards = [];
+const ids = new Set();
+for (const card of document.querySelectorAll(arguments[0])) {
+    let id = card.getAttribute('data-jk');
+    if (!id) {
+        const link = card.querySelector('a[data-jk]');
+        if (link) id = link.getAttribute('data-jk');
+    }
+    if (!id || ids.has(id)) continue;
+
+    const text = selector => {
+        const element = card.querySelector(selector);
+        return element ? clean(element.textContent) : '';
+    };
+    const titre = text('h2.jobTitle span[title], h2.jobTitle a span');
+    if (!titre) continue;
+
+    ids.add(id);
+    cards.push({
+        id: id,
+        titre: titre,
+        entreprise: text('span[data-testid="company-name"], span.companyName'),
+        lieu: text('div[data-testid="text-location"], div.companyLocation'),
+        date: text('span.date, span[data-testid="myJobsStateDate"]')
+    });
+}
+
+let bytes = 0;
+for (const entry of performance.getEntries()) {
+    bytes += entry.transferSize || 0;
+}
+return {cards: cards, bytes: bytes};
+"""
+
+# Taille moyenne d'une offre sérialisée, quand aucune n'a été renvoyée pour l'estimer
+ESTIMATED_JOB_BYTES = 250
+
 def create_driver():
     """Crée un driver Selenium Chromium avec options anti-détection"""
     chrome_options = Options()
@@ -48,8 +133,528 @@ def create_driver():
     # Masquer webdriver
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
 
+    # Bloquer images, polices, styles et traqueurs (inutiles pour l'extraction)
+    if BLOCK_RESOURCES:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+
     return driver
 
+class PageLoadStats:
+    """Temps de chargement et octets transférés des pages de résultats"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.timeouts = 0
+        self.load_ms_total = 0.0
+        self.bytes_total = 0
+
+    def record(self, load_ms, transferred_bytes, timed_out=False):
+        """Enregistre le chargement d'une page"""
+        with self._lock:
+            self.pages += 1
+            self.timeouts += int(timed_out)
+            self.load_ms_total += load_ms
+            self.bytes_total += transferred_bytes
+
+    def get_stats(self):
+        """Moyennes par page (octets: transferSize des entrées Performance, approximatif)"""
+        with self._lock:
+            return {
+                'resources_blocked': BLOCK_RESOURCES,
+                'pages': self.pages,
+                'wait_timeouts': self.timeouts,
+                'avg_load_ms': round(self.load_ms_total / self.pages, 1) if self.pages else 0.0,
+                'avg_bytes': int(self.bytes_total / self.pages) if self.pages else 0
+            }
+
+page_stats = PageLoadStats()
+
+class PooledDriver:
+    """Driver Selenium du pool avec son compteur d'utilisation"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.time()
+        self.pages = 0
+        self.healthy = True
+
+    def rss_mb(self):
+        """Mémoire (RSS) de chromedriver et de ses processus Chromium, en Mo"""
+        if psutil is None:
+            return None
+
+        try:
+            process = psutil.Process(self.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except Exception:
+            return None
+
+class DriverPool:
+    """
+    Pool borné de drivers Chromium préchauffés
+
+    Un driver est emprunté pour une requête puis rendu. Il est recyclé
+    (quit puis recréé) s'il ne répond plus, après DRIVER_MAX_PAGES pages ou
+    au-delà de DRIVER_MAX_RSS_MB de mémoire (si psutil est installé).
+    """
+
+    def __init__(self, size, max_pages, max_rss_mb, checkout_timeout):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._total = 0  # Drivers vivants (au repos + empruntés)
+
+        self.stats = {
+            'created': 0,
+            'recycled': 0,
+            'recycle_reasons': {},
+            'checkouts': 0,
+            'checkout_timeouts': 0,
+            'wait_total_ms': 0.0,
+            'wait_max_ms': 0.0,
+            'create_total_ms': 0.0
+        }
+
+    def _create(self):
+        """Démarre un nouveau driver (démarrage à froid)"""
+        start = time.monotonic()
+        driver = create_driver()
+        with self._lock:
+            self.stats['created'] += 1
+            self.stats['create_total_ms'] += (time.monotonic() - start) * 1000
+        return PooledDriver(driver)
+
+    def _destroy(self, pooled, reason):
+        """Ferme un driver"""
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.warning(f"Erreur fermeture driver: {e}")
+
+        with self._lock:
+            self.stats['recycle_reasons'][reason] = self.stats['recycle_reasons'].get(reason, 0) + 1
+            if reason != 'cold':
+                self.stats['recycled'] += 1
+
+    def _is_alive(self, pooled):
+        """Vérifie que le navigateur répond encore"""
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def warm_up(self):
+        """Démarre les drivers du pool à l'avance"""
+        while True:
+            with self._lock:
+                if self._total >= self.size:
+                    break
+                self._total += 1
+            try:
+                self._idle.put(self._create())
+            except Exception as e:
+                with self._lock:
+                    self._total -= 1
+                logger.error(f"Erreur préchauffage driver: {e}")
+                break
+
+        logger.info(f"🔥 Pool de drivers prêt ({self._idle.qsize()}/{self.size})")
+
+    def checkout(self):
+        """Emprunte un driver (attend si tous sont occupés)"""
+        start = time.monotonic()
+
+        if self.size <= 0:
+            pooled = self._create()
+        else:
+            pooled = None
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._total < self.size
+                    if can_create:
+                        self._total += 1
+                if can_create:
+                    try:
+                        pooled = self._create()
+                    except Exception:
+                        with self._lock:
+                            self._total -= 1
+                        raise
+                else:
+                    try:
+                        pooled = self._idle.get(timeout=self.checkout_timeout)
+                    except queue.Empty:
+                        with self._lock:
+                            self.stats['checkout_timeouts'] += 1
+                        raise TimeoutError("Aucun driver disponible dans le pool")
+
+            if not self._is_alive(pooled):
+                self._destroy(pooled, 'unhealthy')
+                try:
+                    pooled = self._create()
+                except Exception:
+                    with self._lock:
+                        self._total -= 1
+                    raise
+
+        wait_ms = (time.monotonic() - start) * 1000
+        with self._lock:
+            self.stats['checkouts'] += 1
+            self.stats['wait_total_ms'] += wait_ms
+            self.stats['wait_max_ms'] = max(self.stats['wait_max_ms'], wait_ms)
+
+        return pooled
+
+    def checkin(self, pooled):
+        """Rend un driver au pool (ou le recycle)"""
+        if self.size <= 0:
+            self._destroy(pooled, 'cold')
+            return
+
+        reason = None
+        if not pooled.healthy:
+            reason = 'error'
+        elif pooled.pages >= self.max_pages:
+            reason = 'max_pages'
+        else:
+            rss = pooled.rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                reason = 'memory'
+
+        if reason:
+            logger.info(f"♻️ Recyclage driver ({reason}, {pooled.pages} pages)")
+            self._destroy(pooled, reason)
+            with self._lock:
+                self._total -= 1
+            return
+
+        self._idle.put(pooled)
+
+    @contextmanager
+    def lease(self):
+        """Emprunte un driver le temps d'un bloc with"""
+        pooled = self.checkout()
+        try:
+            yield pooled
+        except Exception:
+            pooled.healthy = False
+            raise
+        finally:
+            self.checkin(pooled)
+
+    def get_stats(self):
+        """Statistiques du pool (temps d'attente, recyclages)"""
+        with self._lock:
+            stats = dict(self.stats, recycle_reasons=dict(self.stats['recycle_reasons']))
+            checkouts = stats['checkouts']
+            created = stats['created']
+            stats.update({
+                'size': self.size,
+                'alive': self._total,
+                'idle': self._idle.qsize(),
+                'wait_avg_ms': round(stats['wait_total_ms'] / checkouts, 1) if checkouts else 0.0,
+                'create_avg_ms': round(stats['create_total_ms'] / created, 1) if created else 0.0
+            })
+        return stats
+
+driver_pool = DriverPool(DRIVER_POOL_SIZE, DRIVER_MAX_PAGES, DRIVER_MAX_RSS_MB, DRIVER_CHECKOUT_TIMEOUT)
+
+class ResultCache:
+    """
+    Cache LRU à courte durée de vie des pages de résultats parsées
+
+    Clé: (mot-clé, localisation, page) normalisés. La taille totale est
+    bornée en octets (offres sérialisées en JSON), les entrées les moins
+    récemment utilisées sont évincées en premier.
+    """
+
+    def __init__(self, ttl, max_bytes):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # clé -> (expiration, taille, offres)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.stats = {'hits': 0, 'misses': 0, 'bypassed': 0, 'expired': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(keyword, location, page):
+        """Clé normalisée d'une page de résultats"""
+        return (' '.join(keyword.lower().split()), ' '.join(location.lower().split()), page)
+
+    def get(self, key):
+        """Offres d'une page en cache, ou None"""
+        if self.ttl <= 0:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] < time.time():
+                self._remove(key)
+                self.stats['expired'] += 1
+                entry = None
+
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[2]
+
+    def put(self, key, page_jobs):
+        """Met en cache les offres d'une page"""
+        if self.ttl <= 0:
+            return
+
+        size = len(json.dumps(page_jobs))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.time() + self.ttl, size, page_jobs)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats['evictions'] += 1
+
+    def record_bypass(self):
+        """Compte une requête qui a demandé à ignorer le cache"""
+        with self._lock:
+            self.stats['bypassed'] += 1
+
+    def _remove(self, key):
+        """Retire une entrée (appelé sous verrou)"""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get_stats(self):
+        """Statistiques du cache (taux de succès, occupation)"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(self.stats, ttl=self.ttl, entries=len(self._entries), bytes=self._bytes,
+                        max_bytes=self.max_bytes,
+                        hit_rate=round(self.stats['hits'] / lookups, 3) if lookups else 0.0)
+
+result_cache = ResultCache(RESULT_CACHE_TTL, RESULT_CACHE_MAX_BYTES)
+
+class ScrapeJob:
+    """Recherche exécutée par la file, partagée par un ou plusieurs demandeurs"""
+
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        # Identifiant de demande -> (offres connues du demandeur, callback_url)
+        self.requests = {}
+        self.status = 'queued'  # queued -> running -> done | failed
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.pages = []  # Offres de chaque page, au fil du scraping
+        self.done = threading.Event()
+
+    @property
+    def key(self):
+        """Clé de déduplication (mot-clé, localisation, nombre d'offres, âge maximal)"""
+        return (self.params['keyword'].strip().lower(), self.params['location'].strip().lower(),
+                self.params['max_jobs'], self.params['max_age_minutes'])
+
+    def to_dict(self, request_id=None):
+        """
+        Représentation JSON du job (avec les offres une fois terminé)
+
+        Pour une demande, job_id est son identifiant et les offres qu'elle
+        connaissait déjà sont retirées.
+        """
+        data = {
+            'job_id': request_id or self.id,
+            'status': self.status,
+            'keyword': self.params['keyword'],
+            'location': self.params['location'],
+            'submitted_at': datetime.fromtimestamp(self.submitted_at).isoformat(),
+            'queue_seconds': round((self.started_at or time.time()) - self.submitted_at, 1)
+        }
+        if self.finished_at and self.started_at:
+            data['run_seconds'] = round(self.finished_at - self.started_at, 1)
+        if self.status == 'done':
+            data.update(self.result)
+            if request_id in self.requests:
+                jobs = exclude_seen(self.result['jobs'], self.requests[request_id][0])
+                data.update(jobs=jobs, count=len(jobs))
+        if self.error:
+            data['error'] = self.error
+        return data
+
+class ScrapeJobQueue:
+    """
+    File de jobs de scraping servie par des workers navigateur
+
+    Les clients reçoivent un identifiant immédiatement et récupèrent les
+    résultats plus tard (ou via callback_url). Un job identique (même
+    mot-clé, localisation, max_jobs et max_age_minutes) déjà en attente ou
+    en cours est réutilisé; chaque demandeur reçoit son propre identifiant
+    de demande, qui filtre les résultats selon ses offres connues.
+    """
+
+    def __init__(self, workers, result_ttl):
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._active = {}  # clé de déduplication -> job en attente ou en cours
+        self._requests = {}  # identifiant de demande -> job
+        self._lock = threading.Lock()
+        self._threads = []
+        self.progress = threading.Condition()  # Notifié à chaque page ou fin de job
+
+        self.stats = {'submitted': 0, 'deduplicated': 0, 'completed': 0, 'failed': 0}
+
+    def start(self):
+        """Démarre les workers (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"scrape-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+        logger.info(f"👷 {self.workers} workers de scraping démarrés")
+
+    def submit(self, params, callback_url=None):
+        """
+        Ajoute une demande à la file (nouveau job ou job identique réutilisé)
+
+        Chaque demande garde son propre ensemble d'offres connues, appliqué
+        quand ses résultats lui sont servis.
+
+        Returns:
+            (job, identifiant de la demande, deduplicated)
+        """
+        self.start()
+        request_id = uuid.uuid4().hex
+
+        with self._lock:
+            self._purge()
+            job = ScrapeJob(dict(params, seen_ids=set(params['seen_ids'])))
+            existing = self._active.get(job.key)
+            deduplicated = bool(existing) and self._can_share(existing, params)
+
+            if deduplicated:
+                job = existing
+                self.stats['deduplicated'] += 1
+            else:
+                self._jobs[job.id] = job
+                self._active[job.key] = job
+                self.stats['submitted'] += 1
+
+            job.requests[request_id] = (params['seen_ids'], callback_url)
+            self._requests[request_id] = job
+
+        if not deduplicated:
+            self._queue.put(job)
+        return job, request_id, deduplicated
+
+    def _can_share(self, existing, params):
+        """
+        Indique si un nouveau demandeur peut réutiliser un job (appelé sous verrou)
+
+        Une demande sans cache (Cache-Control: no-cache) a toujours son propre
+        job. Sinon le job n'exclut que les offres connues de tous ses
+        demandeurs: en attente, son ensemble d'exclusion (copie propre au job)
+        est réduit à l'intersection ; en cours, il n'est partagé que s'il
+        n'exclut rien d'inconnu du demandeur.
+        """
+        if params['no_cache']:
+            return False
+        if existing.status == 'queued':
+            existing.params['seen_ids'] = existing.params['seen_ids'] & params['seen_ids']
+            return True
+        return existing.params['seen_ids'] <= params['seen_ids']
+
+    def get(self, request_id):
+        """Retourne le job d'une demande (ou d'un identifiant de job)"""
+        with self._lock:
+            return self._requests.get(request_id) or self._jobs.get(request_id)
+
+    def _purge(self):
+        """Oublie les jobs terminés depuis plus de result_ttl et leurs demandes (appelé sous verrou)"""
+        limit = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < limit]
+        for job_id in expired:
+            for request_id in self._jobs.pop(job_id).requests:
+                self._requests.pop(request_id, None)
+
+    def _worker(self):
+        """Boucle d'un worker: exécute les jobs un par un"""
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                job.started_at = time.time()
+                job.status = 'running'
+
+            try:
+                job.result = run_scrape(job.params, on_page=lambda page_jobs: self._add_page(job, page_jobs))
+                job.status = 'done'
+            except Exception as e:
+                logger.error(f"Erreur job {job.id}: {e}")
+                job.error = str(e)
+                job.status = 'failed'
+
+            job.finished_at = time.time()
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+                self.stats['completed' if job.status == 'done' else 'failed'] += 1
+            with self.progress:
+                job.done.set()
+                self.progress.notify_all()
+
+            self._send_callbacks(job)
+
+    def _add_page(self, job, page_jobs):
+        """Publie les offres d'une page pour les clients en streaming"""
+        with self.progress:
+            job.pages.append(page_jobs)
+            self.progress.notify_all()
+
+    def _send_callbacks(self, job):
+        """Envoie à chaque demandeur qui a fourni une callback_url ses résultats"""
+        with self._lock:
+            callbacks = [(request_id, url) for request_id, (_, url) in job.requests.items() if url]
+
+        for request_id, callback_url in callbacks:
+            try:
+                requests.post(callback_url, json=job.to_dict(request_id), timeout=10)
+            except Exception as e:
+                logger.warning(f"Erreur callback {callback_url}: {e}")
+
+    def get_stats(self):
+        """Statistiques de la file"""
+        with self._lock:
+            running = sum(1 for job in self._active.values() if job.status == 'running')
+            return dict(self.stats, workers=self.workers, queued=self._queue.qsize(),
+                        running=running, retained=len(self._jobs))
+
+job_queue = ScrapeJobQueue(SCRAPE_WORKERS, JOB_RESULT_TTL)
+
 def parse_date_posted(date_text):
     """Parse la date de publication et retourne les minutes écoulées"""
     if not date_text:
@@ -80,140 +685,302 @@ def parse_date_posted(date_text):
 @app.route('/health', methods=['GET'])
 def health():
     """Endpoint de santé"""
-    return jsonify({"status": "ok", "service": "scraper-api-v2"}), 200
+    return jsonify({
+        "status": "ok",
+        "service": "scraper-api-v2",
+        "pool": driver_pool.get_stats(),
+        "queue": job_queue.get_stats(),
+        "cache": result_cache.get_stats(),
+        "pages": page_stats.get_stats()
+    }), 200
+
+def parse_scrape_params(data):
+    """Paramètres de scraping d'une requête (valeurs par défaut historiques)"""
+    return {
+        'keyword': data.get('keyword', 'développeur'),
+        'location': data.get('location', 'France'),
+        'max_jobs': data.get('max_jobs', 50),
+        'max_age_minutes': data.get('max_age_minutes', 60),  # Offres de moins d'1h par défaut
+        'seen_ids': set(data.get('seen_ids') or []),  # Identifiants (data-jk) déjà connus du client
+        'no_cache': 'no-cache' in request.headers.get('Cache-Control', '').lower()
+    }
+
+def exclude_seen(jobs, seen_ids):
+    """Retire les offres déjà connues du client (job partagé avec un autre demandeur)"""
+    if not seen_ids:
+        return jobs
+    return [job for job in jobs if job['external_id'] not in seen_ids]
+
+def run_scrape(params, on_page=None):
+    """Scrape une recherche (driver du pool emprunté seulement si une page n'est pas en cache)"""
+    if params['no_cache']:
+        result_cache.record_bypass()
+
+    with ExitStack() as stack:
+        leased = []
+
+        def get_pooled():
+            if not leased:
+                leased.append(stack.enter_context(driver_pool.lease()))
+                logger.info(f"Driver emprunté pour: {params['keyword']}")
+            return leased[0]
+
+        jobs, page, known_skipped, pages_saved = _scrape_indeed_pages(
+            get_pooled, params['keyword'], params['location'], params['max_jobs'], params['max_age_minutes'],
+            seen_ids=params['seen_ids'], use_cache=not params['no_cache'], on_page=on_page
+        )
+
+    # Octets économisés: offres connues non renvoyées, à la taille moyenne des offres renvoyées
+    job_bytes = len(json.dumps(jobs)) / len(jobs) if jobs else ESTIMATED_JOB_BYTES
+    bytes_saved = int(known_skipped * job_bytes)
+
+    logger.info(f"🎉 Total final: {len(jobs)} offres trouvées")
+    if known_skipped:
+        logger.info(f"   ⏭️ {known_skipped} offres déjà connues exclues, "
+                    f"{pages_saved} pages et ~{bytes_saved} octets économisés")
+
+    return {
+        "jobs": jobs,
+        "count": len(jobs),
+        "pages_scraped": page,
+        "known_skipped": known_skipped,
+        "pages_saved": pages_saved,
+        "bytes_saved": bytes_saved
+    }
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Soumet une recherche à la file et renvoie immédiatement son identifiant"""
+    data = request.json or {}
+    job, request_id, deduplicated = job_queue.submit(parse_scrape_params(data), data.get('callback_url'))
+    return jsonify({"success": True, "job_id": request_id, "status": job.status, "deduplicated": deduplicated}), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """État d'un job (et ses offres une fois terminé)"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"success": False, "error": "Job inconnu ou expiré"}), 404
+
+    return jsonify(dict(job.to_dict(job_id), success=job.status != 'failed')), 200
+
+@app.route('/scrape/indeed/batch', methods=['POST'])
+def scrape_indeed_batch():
+    """
+    Scrape plusieurs recherches (mot-clé, localisation) en une requête
+
+    Les résultats sont renvoyés en NDJSON au fil de l'eau: une ligne
+    "page" par page scrapée, une ligne "done" par recherche terminée,
+    puis une ligne "end".
+    """
+    data = request.json or {}
+    searches = data.get('searches', [])[:MAX_BATCH_SEARCHES]
+    if not searches:
+        return jsonify({"success": False, "error": "Aucune recherche"}), 400
+
+    jobs = []
+    seen_by_job = {}
+    for search in searches:
+        params = parse_scrape_params(dict(data, **search))
+        job, _, _ = job_queue.submit(params)
+        if job not in jobs:
+            jobs.append(job)
+            seen_by_job[job.id] = params['seen_ids']
+
+    return Response(_stream_batch(jobs, seen_by_job), mimetype='application/x-ndjson')
+
+def _stream_batch(jobs, seen_by_job):
+    """Génère les lignes NDJSON d'un batch à mesure que les pages arrivent"""
+    sent_pages = {job.id: 0 for job in jobs}
+    finished = set()
+
+    def has_news():
+        return any(len(job.pages) > sent_pages[job.id] or (job.done.is_set() and job.id not in finished)
+                   for job in jobs)
+
+    while len(finished) < len(jobs):
+        with job_queue.progress:
+            if not job_queue.progress.wait_for(has_news, timeout=SYNC_WAIT_TIMEOUT):
+                yield json.dumps({"type": "error", "error": "Timeout"}) + "\n"
+                return
+
+        for job in jobs:
+            while sent_pages[job.id] < len(job.pages):
+                page_jobs = job.pages[sent_pages[job.id]]
+                sent_pages[job.id] += 1
+                yield json.dumps({
+                    "type": "page",
+                    "job_id": job.id,
+                    "keyword": job.params['keyword'],
+                    "location": job.params['location'],
+                    "page": sent_pages[job.id],
+                    "jobs": exclude_seen(page_jobs, seen_by_job[job.id])
+                }) + "\n"
+
+            if job.done.is_set() and job.id not in finished:
+                finished.add(job.id)
+                done = {"type": "done", "job_id": job.id, "keyword": job.params['keyword'],
+                        "success": job.status == 'done'}
+                if job.status == 'done':
+                    done.update({key: job.result[key] for key in
+                                 ('count', 'pages_scraped', 'known_skipped', 'pages_saved', 'bytes_saved')})
+                else:
+                    done['error'] = job.error
+                yield json.dumps(done) + "\n"
+
+    yield json.dumps({"type": "end", "searches": len(jobs)}) + "\n"
 
 @app.route('/scrape/indeed', methods=['POST'])
 def scrape_indeed():
-    """Scrape Indeed avec Selenium - Version améliorée"""
-    data = request.json
-    keyword = data.get('keyword', 'développeur')
-    location = data.get('location', 'France')
-    max_jobs = data.get('max_jobs', 50)
-    max_age_minutes = data.get('max_age_minutes', 60)  # Offres de moins d'1h par défaut
-
-    driver = None
-    try:
-        jobs = []
-        page = 0
-
-        # Initialiser le driver
-        driver = create_driver()
-        logger.info(f"Driver initialisé pour: {keyword}")
-
-        # Scraper jusqu'à avoir max_jobs offres ou 3 pages max
-        while len(jobs) < max_jobs and page < 3:
-            # Construire l'URL avec pagination
-            start = page * 10
-            url = f"https://fr.indeed.com/jobs?q={keyword} alternance&l={location}&fromage=1&sort=date&start={start}"
-            logger.info(f"📄 Page {page + 1}: {url}")
+    """Scrape Indeed avec Selenium (synchrone: passe par la file et attend le résultat)"""
+    params = parse_scrape_params(request.json or {})
+    job, _, _ = job_queue.submit(params)
+
+    if not job.done.wait(SYNC_WAIT_TIMEOUT):
+        return jsonify({"success": False, "error": "Timeout", "job_id": job.id}), 504
+
+    if job.status != 'done':
+        return jsonify({"success": False, "error": job.error}), 500
+
+    jobs = exclude_seen(job.result['jobs'], params['seen_ids'])
+    return jsonify(dict(job.result, jobs=jobs, count=len(jobs), success=True)), 200
+
+def _scrape_indeed_pages(get_pooled, keyword, location, max_jobs, max_age_minutes,
+                         seen_ids=None, use_cache=True, on_page=None):
+    """
+    Parcourt les pages de résultats Indeed (cache, sinon driver du pool)
+
+    Les cartes dont l'identifiant est dans seen_ids ne sont pas renvoyées, et
+    la pagination s'arrête sur une page sans nouvelle offre (les résultats
+    sont triés par date). on_page(offres) est appelé avec les offres de
+    chaque page dès qu'elle est disponible.
+
+    Args:
+        get_pooled: Fonction qui emprunte le driver au premier appel
+
+    Returns:
+        (offres, pages, offres connues ignorées, pages évitées)
+    """
+    seen_ids = seen_ids or set()
+    jobs = []
+    page = 0
+    known_skipped = 0
+    pages_saved = 0
+    loaded_pages = 0
+
+    # Scraper jusqu'à avoir max_jobs offres ou 3 pages max
+    while len(jobs) < max_jobs and page < 3:
+        cache_key = result_cache.make_key(keyword, location, page)
+        page_cards = result_cache.get(cache_key) if use_cache else None
+
+        if page_cards is None:
+            # Délai entre les pages chargées
+            if loaded_pages:
+                time.sleep(random.uniform(4, 8))
 
-            # Charger la page
-            driver.get(url)
+            page_cards, timed_out = _load_indeed_page(get_pooled(), keyword, location, page)
+            loaded_pages += 1
+            # Page vide ou chargée partiellement (blocage, lenteur): ne pas la resservir
+            if page_cards and not timed_out:
+                result_cache.put(cache_key, page_cards)
+        else:
+            logger.info(f"💾 Page {page + 1} servie depuis le cache ({len(page_cards)} offres)")
+
+        if not page_cards:
+            logger.info("   Aucune offre sur cette page, arrêt pagination")
+            break
+
+        page_jobs = []
+        page_known = 0
+        for card in page_cards:
+            if card['external_id'] in seen_ids:
+                page_known += 1
+                continue
+
+            # Filtrer par date si spécifié
+            minutes_ago = card['minutes_ago']
+            if max_age_minutes and minutes_ago and minutes_ago > max_age_minutes:
+                continue
+
+            page_jobs.append(card)
+            if len(jobs) + len(page_jobs) >= max_jobs:
+                break
 
-            # Délai aléatoire pour simuler comportement humain
-            time.sleep(random.uniform(3, 6))
+        jobs.extend(page_jobs)
+        known_skipped += page_known
+        logger.info(f"   ✅ {len(page_jobs)} offres valides ajoutées (total: {len(jobs)})")
 
-            # Parser avec BeautifulSoup
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            job_cards = soup.select('div.job_seen_beacon, div[data-jk], td.resultContent')
+        if on_page and page_jobs:
+            on_page(page_jobs)
 
-            logger.info(f"   Trouvé {len(job_cards)} cartes sur cette page")
+        # Si cette page n'a donné aucun résultat, arrêter
+        if not page_jobs:
+            if page_known:
+                # Page déjà connue: les suivantes (plus anciennes) le sont aussi
+                pages_saved = 3 - (page + 1)
+                logger.info(f"   ⏭️ Page déjà connue, arrêt pagination ({pages_saved} pages évitées)")
+            break
 
-            if len(job_cards) == 0:
-                logger.info("   Aucune carte trouvée, arrêt pagination")
-                break
+        page += 1
 
-            page_jobs_count = 0
-            for card in job_cards:
-                try:
-                    # Job ID
-                    job_id = card.get('data-jk')
-                    if not job_id:
-                        link = card.select_one('a[data-jk]')
-                        if link:
-                            job_id = link.get('data-jk')
-
-                    if not job_id:
-                        continue
-
-                    # Titre
-                    title_elem = card.select_one('h2.jobTitle span[title], h2.jobTitle a span')
-                    titre = title_elem.get_text(strip=True) if title_elem else ""
-
-                    if not titre:
-                        continue
-
-                    # Vérifier alternance dans le titre
-                    if not any(word in titre.lower() for word in ['alternance', 'apprentissage', 'apprenti']):
-                        continue
-
-                    # Entreprise
-                    company_elem = card.select_one('span[data-testid="company-name"], span.companyName')
-                    entreprise = company_elem.get_text(strip=True) if company_elem else "Non précisé"
-
-                    # Localisation
-                    location_elem = card.select_one('div[data-testid="text-location"], div.companyLocation')
-                    lieu = location_elem.get_text(strip=True) if location_elem else ""
-
-                    # Date de publication
-                    date_elem = card.select_one('span.date, span[data-testid="myJobsStateDate"]')
-                    date_text = date_elem.get_text(strip=True) if date_elem else ""
-                    minutes_ago = parse_date_posted(date_text)
-
-                    # Filtrer par date si spécifié
-                    if max_age_minutes and minutes_ago and minutes_ago > max_age_minutes:
-                        continue
-
-                    # URL
-                    job_url = f"https://fr.indeed.com/viewjob?jk={job_id}"
-
-                    jobs.append({
-                        'titre': titre,
-                        'entreprise': entreprise,
-                        'lieu': lieu,
-                        'url': job_url,
-                        'external_id': job_id,
-                        'date_posted': date_text,
-                        'minutes_ago': minutes_ago
-                    })
-
-                    page_jobs_count += 1
-
-                    # Arrêter si on a atteint max_jobs
-                    if len(jobs) >= max_jobs:
-                        break
-
-                except Exception as e:
-                    logger.error(f"Erreur parsing carte: {e}")
-                    continue
-
-            logger.info(f"   ✅ {page_jobs_count} offres valides ajoutées (total: {len(jobs)})")
-
-            # Si cette page n'a donné aucun résultat, arrêter
-            if page_jobs_count == 0:
-                break
+    return jobs, page, known_skipped, pages_saved
 
-            page += 1
+def _load_indeed_page(pooled, keyword, location, page):
+    """
+    Charge et parse une page de résultats Indeed (offres d'alternance, sans autre filtre)
 
-            # Délai entre les pages
-            if page < 3 and len(jobs) < max_jobs:
-                time.sleep(random.uniform(4, 8))
+    Returns:
+        (offres, timed_out) où timed_out indique que les cartes ne sont pas apparues à temps
+    """
+    driver = pooled.driver
 
-        logger.info(f"🎉 Total final: {len(jobs)} offres trouvées")
-        return jsonify({
-            "success": True,
-            "jobs": jobs,
-            "count": len(jobs),
-            "pages_scraped": page
-        }), 200
+    # Construire l'URL avec pagination
+    start = page * 10
+    url = f"https://fr.indeed.com/jobs?q={keyword} alternance&l={location}&fromage=1&sort=date&start={start}"
+    logger.info(f"📄 Page {page + 1}: {url}")
 
-    except Exception as e:
-        logger.error(f"Erreur scraping: {e}")
-        return jsonify({"success": False, "error": str(e)}), 500
+    # Charger la page et attendre les cartes d'offres (plutôt qu'un délai fixe)
+    load_start = time.monotonic()
+    driver.get(url)
+    pooled.pages += 1
 
-    finally:
-        if driver:
-            driver.quit()
+    timed_out = False
+    try:
+        WebDriverWait(driver, PAGE_WAIT_TIMEOUT).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, JOB_CARD_SELECTOR))
+        )
+    except TimeoutException:
+        timed_out = True
+
+    # Extraire les cartes dans la page
+    extracted = driver.execute_script(EXTRACT_CARDS_JS, JOB_CARD_SELECTOR)
+    load_ms = (time.monotonic() - load_start) * 1000
+    page_stats.record(load_ms, extracted['bytes'], timed_out)
+
+    logger.info(f"   Trouvé {len(extracted['cards'])} cartes sur cette page "
+                f"({load_ms:.0f} ms, {extracted['bytes'] / 1024:.0f} Ko)")
+
+    cards = []
+    for card in extracted['cards']:
+        titre = card['titre']
+
+        # Vérifier alternance dans le titre
+        if not any(word in titre.lower() for word in ['alternance', 'apprentissage', 'apprenti']):
+            continue
+
+        cards.append({
+            'titre': titre,
+            'entreprise': card['entreprise'] or "Non précisé",
+            'lieu': card['lieu'],
+            'url': f"https://fr.indeed.com/viewjob?jk={card['id']}",
+            'external_id': card['id'],
+            'date_posted': card['date'],
+            'minutes_ago': parse_date_posted(card['date'])
+        })
+
+    return cards, timed_out
 
 if __name__ == '__main__':
+    driver_pool.warm_up()
+    job_queue.start()
     app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
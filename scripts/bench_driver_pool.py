@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'API Selenium du VPS: requêtes par minute avec et sans pool de drivers
+
+Lancer l'API deux fois, une avec DRIVER_POOL_SIZE=0 (démarrage à froid à
+chaque requête) et une avec le pool, puis comparer:
+
+    DRIVER_POOL_SIZE=0 python3 scraper_api_v2.py
+    python3 scripts/bench_driver_pool.py --url http://localhost:5000 --label froid
+
+    DRIVER_POOL_SIZE=2 python3 scraper_api_v2.py
+    python3 scripts/bench_driver_pool.py --url http://localhost:5000 --label pool
+
+Le temps de chargement et les octets par page permettent aussi de comparer
+avec et sans blocage des ressources (BLOCK_RESOURCES=false). Penser à
+désactiver le cache de résultats (RESULT_CACHE_TTL=0) pour ces mesures.
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+KEYWORDS = ['développeur', 'data', 'marketing', 'comptable', 'commercial', 'réseau']
+
+def run_request(url: str, keyword: str, location: str, max_jobs: int) -> dict:
+    """Envoie une requête de scraping et mesure sa durée"""
+    start = time.monotonic()
+    try:
+        response = requests.post(
+            f"{url}/scrape/indeed",
+            json={'keyword': keyword, 'location': location, 'max_jobs': max_jobs},
+            timeout=600
+        )
+        ok = response.status_code == 200 and response.json().get('success', False)
+    except Exception as e:
+        print(f"❌ {keyword}: {e}")
+        ok = False
+    return {'keyword': keyword, 'ok': ok, 'duration': time.monotonic() - start}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pool de drivers de l'API VPS")
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--requests', type=int, default=12, help="Nombre total de requêtes")
+    parser.add_argument('--concurrency', type=int, default=2, help="Requêtes simultanées")
+    parser.add_argument('--location', default='Paris')
+    parser.add_argument('--max-jobs', type=int, default=10)
+    parser.add_argument('--label', default='', help="Nom du scénario dans le rapport")
+    args = parser.parse_args()
+
+    keywords = [KEYWORDS[i % len(KEYWORDS)] for i in range(args.requests)]
+
+    print(f"🚀 {args.requests} requêtes, {args.concurrency} en parallèle sur {args.url}")
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(
+            lambda keyword: run_request(args.url, keyword, args.location, args.max_jobs), keywords
+        ))
+    elapsed = time.monotonic() - start
+
+    durations = [r['duration'] for r in results]
+    successes = sum(1 for r in results if r['ok'])
+
+    print(f"\n📊 Résultats {args.label}".rstrip())
+    print(f"   Réussies: {successes}/{len(results)}")
+    print(f"   Débit: {len(results) / elapsed * 60:.1f} requêtes/min")
+    print(f"   Durée médiane: {statistics.median(durations):.1f}s (max {max(durations):.1f}s)")
+
+    try:
+        health = requests.get(f"{args.url}/health", timeout=10).json()
+        pool = health.get('pool', {})
+        pages = health.get('pages', {})
+        print(f"   Drivers créés: {pool.get('created')} (temps moyen {pool.get('create_avg_ms')} ms)")
+        print(f"   Attente pool: moyenne {pool.get('wait_avg_ms')} ms, max {pool.get('wait_max_ms', 0):.0f} ms")
+        print(f"   Recyclages: {pool.get('recycle_reasons')}")
+        print(f"   Pages: {pages.get('pages')} chargées, {pages.get('avg_load_ms')} ms et "
+              f"{pages.get('avg_bytes', 0) / 1024:.0f} Ko en moyenne "
+              f"(ressources bloquées: {pages.get('resources_blocked')})")
+    except Exception as e:
+        print(f"   Statistiques du pool indisponibles: {e}")
+
+if __name__ == "__main__":
+    main()
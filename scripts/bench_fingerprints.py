@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Débit et qualité des empreintes SimHash des offres
+
+Mesure les offres empreintées par seconde, puis la distance d'en-tête
+(titre, entreprise, lieu) de paires d'offres: une paire est rattachée si
+la distance est <= MAX_DISTANCE.
+
+Les paires intégrées reprennent les formats des sources (extrait Indeed,
+texte complet France Travail, entreprise en majuscules chez La Bonne
+Alternance...). Des paires réelles peuvent être fournies en JSON lines,
+une paire par ligne:
+
+    {"a": {"titre": ..., "entreprise": ..., "lieu": ..., "description": ...},
+     "b": {...}, "duplicate": true}
+
+    python3 scripts/bench_fingerprints.py
+    python3 scripts/bench_fingerprints.py --pairs data/paires_offres.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+# Ajouter le dossier src au path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dedupe import MAX_DISTANCE, hamming_distance, offer_fingerprints
+
+TITRES = ['Commercial', 'Développeur web', 'Assistant RH', 'Comptable', 'Chargé de communication',
+          'Technicien réseau', 'Vendeur conseil', 'Data analyst']
+VILLES = ['Paris', 'Lyon', 'Marseille', 'Lille', 'Nantes', 'Bordeaux', 'Rennes', 'Toulouse']
+VOCABULAIRE = [f"mot{i}" for i in range(2000)]
+
+FULL_TEXT = ("Rejoignez notre magasin pour accompagner nos clients dans le choix de leurs équipements. "
+             "Vous participez à la mise en rayon, à l'accueil et à l'encaissement, et vous êtes formé "
+             "aux techniques de vente. Profil: bac en cours de préparation, goût du sport et du contact.")
+
+def offer(titre: str, entreprise: str, lieu: str, description: str = '') -> Dict:
+    return {'titre': titre, 'entreprise': entreprise, 'lieu': lieu, 'description': description}
+
+# (libellé, offre a, offre b, même offre)
+BUILTIN_PAIRS = [
+    ("sans description / 25 mots", offer('Vendeur H/F', 'Decathlon', 'Lyon'),
+     offer('Vendeur H/F', 'Decathlon', 'Lyon', ' '.join(FULL_TEXT.split()[:25])), True),
+    ("extrait Indeed / texte France Travail", offer('Vendeur en alternance (H/F)', 'Decathlon', 'Lyon (69)', FULL_TEXT[:150]),
+     offer('Vendeur (H/F) - Alternance', 'DECATHLON', '69 - LYON 03', FULL_TEXT), True),
+    ("raison sociale", offer('Assistant RH', 'Capgemini France SAS', 'Paris 15e'),
+     offer('Alternance - Assistant RH H/F', 'CAPGEMINI', 'Paris (75)'), True),
+    ("lieu avec cedex", offer('Comptable', 'KPMG', 'Nantes Cedex 1'),
+     offer('Comptable en apprentissage', 'KPMG', 'Nantes'), True),
+    ("autre ville", offer('Vendeur H/F', 'Decathlon', 'Lyon (69)', FULL_TEXT),
+     offer('Vendeur H/F', 'Decathlon', 'Marseille (13)', FULL_TEXT), False),
+    ("autre poste", offer('Vendeur H/F', 'Decathlon', 'Lyon (69)', FULL_TEXT),
+     offer('Technicien atelier cycle H/F', 'Decathlon', 'Lyon (69)', FULL_TEXT), False),
+    ("autre entreprise", offer('Vendeur H/F', 'Decathlon', 'Lyon (69)', FULL_TEXT),
+     offer('Vendeur H/F', 'Intersport', 'Lyon (69)', FULL_TEXT), False),
+]
+
+def load_pairs(path: str) -> List:
+    """Paires réelles au format JSON lines"""
+    pairs = []
+    with open(path, encoding='utf-8') as file:
+        for number, line in enumerate(file, 1):
+            if line.strip():
+                data = json.loads(line)
+                pairs.append((f"{os.path.basename(path)}:{number}", data['a'], data['b'], data['duplicate']))
+    return pairs
+
+def header_distance(a: Dict, b: Dict) -> int:
+    """Distance entre les empreintes d'en-tête de deux offres"""
+    fingerprint_a = offer_fingerprints(a['titre'], a['entreprise'], a['lieu'], a.get('description', ''))[0]
+    fingerprint_b = offer_fingerprints(b['titre'], b['entreprise'], b['lieu'], b.get('description', ''))[0]
+    return hamming_distance(fingerprint_a, fingerprint_b)
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit et qualité des empreintes SimHash")
+    parser.add_argument('--offers', type=int, default=10000, help="Nombre d'offres empreintées")
+    parser.add_argument('--pairs', help="Paires réelles (JSON lines) à évaluer en plus des paires intégrées")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    offers = [(rng.choice(TITRES), f"Société {rng.choice(VOCABULAIRE)}", rng.choice(VILLES),
+               ' '.join(rng.choices(VOCABULAIRE, k=120))) for _ in range(args.offers)]
+
+    start = time.perf_counter()
+    for titre, entreprise, lieu, description in offers:
+        offer_fingerprints(titre, entreprise, lieu, description)
+    duration = time.perf_counter() - start
+
+    print(f"\n📊 {args.offers} offres en {duration:.2f}s: {args.offers / duration:.0f} offres/s")
+
+    pairs = BUILTIN_PAIRS + (load_pairs(args.pairs) if args.pairs else [])
+    errors = 0
+    for label, a, b, duplicate in pairs:
+        distance = header_distance(a, b)
+        linked = distance <= MAX_DISTANCE
+        errors += linked != duplicate
+        status = '✅' if linked == duplicate else '❌'
+        print(f"   {status} {label}: distance {distance} "
+              f"({'rattachées' if linked else 'distinctes'}, attendu {'rattachées' if duplicate else 'distinctes'})")
+
+    print(f"   {len(pairs) - errors}/{len(pairs)} paires correctes")
+
+if __name__ == "__main__":
+    main()
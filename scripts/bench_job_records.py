@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Mémoire des offres scrapées: dictionnaires contre JobRecord
+
+Construit N offres comme le ferait un cycle de scraping (chaînes neuves à
+chaque offre, mêmes sites, villes et entreprises qui reviennent) et mesure
+avec tracemalloc les allocations et la mémoire retenue par chaque format,
+puis, sans tracemalloc, le temps de construction seul. Les deux formats
+portent les mêmes champs (identity_key comprise).
+
+    python3 scripts/bench_job_records.py
+    python3 scripts/bench_job_records.py --jobs 50000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+# Ajouter le dossier src au path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+SITES = ['indeed_http', 'indeed_vps', 'welcometothejungle', 'labonnealternance', 'francetravail']
+VILLES = ['Paris', 'Lyon', 'Marseille', 'Toulouse', 'Bordeaux', 'Lille', 'Nantes', 'Rennes']
+ENTREPRISES = [f"Entreprise {i}" for i in range(300)]
+SALAIRES = ['1000 €/mois', '1200 €/mois', None, 'Selon profil']
+
+def fresh(text: str) -> str:
+    """Copie neuve d'une chaîne, comme en sortie de parsing"""
+    return ''.join(list(text)) if text else text
+
+def scraped_fields(i: int) -> Dict:
+    """Champs d'une offre tels que les reçoit build_job_dict"""
+    salaire = SALAIRES[i % len(SALAIRES)]
+    return {
+        'titre': f"Développeur en alternance (H/F) #{i}",
+        'entreprise': fresh(ENTREPRISES[i % len(ENTREPRISES)]),
+        'description': f"Offre {i}: " + 'Rejoignez notre équipe technique en alternance. ' * 4,
+        'lieu': fresh(VILLES[i % len(VILLES)]),
+        'latitude': 48.85,
+        'longitude': 2.35,
+        'salaire': fresh(salaire),
+        'url': f"https://fr.indeed.com/viewjob?jk={i:016x}",
+        'source_site': fresh(SITES[i % len(SITES)]),
+        'external_id': f"{i:016x}",
+        'date_publication': datetime.now(),
+        'date_first_seen': datetime.utcnow(),
+        'metier_id': i % 20,
+    }
+
+def build_dict(fields: Dict) -> Dict:
+    """Format historique de build_job_dict, avec la clé de déduplication comme JobRecord"""
+    from dedupe import identity_key
+    return {
+        'titre': fields.get('titre', ''),
+        'entreprise': fields.get('entreprise', ''),
+        'description': fields.get('description', ''),
+        'lieu': fields.get('lieu', ''),
+        'latitude': fields.get('latitude'),
+        'longitude': fields.get('longitude'),
+        'salaire': fields.get('salaire'),
+        'url': fields.get('url', ''),
+        'source_site': fields.get('source_site', ''),
+        'external_id': fields.get('external_id'),
+        'date_publication': fields.get('date_publication', datetime.now()),
+        'date_first_seen': fields.get('date_first_seen', datetime.utcnow()),
+        'metier_id': fields.get('metier_id'),
+        'identity_key': identity_key(fields.get('source_site', ''), fields.get('url', ''), fields.get('external_id'))
+    }
+
+def build_record(fields: Dict):
+    """Format actuel: JobRecord"""
+    from scrapers.job_record import JobRecord
+    return JobRecord(**fields)
+
+def measure(build: Callable[[Dict], object], count: int) -> Dict:
+    """Construit count offres: allocations retenues, puis temps de construction seul"""
+    gc.collect()
+    tracemalloc.start()
+
+    jobs: List = [build(scraped_fields(i)) for i in range(count)]
+
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    blocks = sum(stat.count for stat in snapshot.statistics('filename'))
+    del jobs
+
+    # Temps hors tracemalloc (qui ralentit chaque allocation), champs préparés à l'avance
+    fields = [scraped_fields(i) for i in range(count)]
+    gc.collect()
+    start = time.perf_counter()
+    jobs = [build(job_fields) for job_fields in fields]
+    duration = time.perf_counter() - start
+    del jobs
+
+    return {'current': current, 'peak': peak, 'blocks': blocks, 'duration': duration}
+
+def main():
+    parser = argparse.ArgumentParser(description="Mémoire des offres: dictionnaires contre JobRecord")
+    parser.add_argument('--jobs', type=int, default=10000, help="Nombre d'offres construites")
+    args = parser.parse_args()
+
+    # Import hors mesure
+    build_record(scraped_fields(0))
+
+    results = {'dict': measure(build_dict, args.jobs), 'JobRecord': measure(build_record, args.jobs)}
+
+    print(f"\n📊 {args.jobs} offres")
+    for name, result in results.items():
+        print(f"   {name}: {result['current'] / 1024 / 1024:.2f} Mo retenus "
+              f"({result['current'] / args.jobs:.0f} o/offre), pic {result['peak'] / 1024 / 1024:.2f} Mo, "
+              f"{result['blocks']} blocs alloués, construction {result['duration'] * 1000:.0f} ms "
+              f"({result['duration'] / args.jobs * 1e6:.1f} µs/offre)")
+
+    before, after = results['dict'], results['JobRecord']
+    print(f"   Gain: {(1 - after['current'] / before['current']) * 100:.0f}% de mémoire, "
+          f"{before['blocks'] - after['blocks']} blocs en moins")
+    print(f"   Coût: construction {after['duration'] / before['duration']:.2f}× le dictionnaire "
+          f"({(after['duration'] - before['duration']) / args.jobs * 1e6:+.1f} µs/offre)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Benchmark des parsers de pages de résultats sur des pages enregistrées
+
+Compare pour chaque site l'extraction rapide (données structurées) et le
+parsing HTML de repli: temps par page et offres extraites.
+
+Enregistrer des pages (une fois), puis lancer le benchmark:
+
+    python3 scripts/bench_parsers.py indeed --record "https://fr.indeed.com/jobs?q=alternance&l=Paris"
+    python3 scripts/bench_parsers.py indeed --repeat 50
+
+    python3 scripts/bench_parsers.py wttj --record "https://www.welcometothejungle.com/fr/jobs?query=developpeur"
+    python3 scripts/bench_parsers.py wttj
+
+Les pages peuvent aussi être enregistrées depuis le navigateur
+("Enregistrer sous", HTML uniquement) dans data/pages/<site>/. Pour WTTJ,
+chaque page <nom>.html est accompagnée de la réponse de recherche Algolia
+<nom>.json pour la même requête (enregistrée automatiquement par --record).
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.request
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Ajouter le dossier src au path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+PAGES_DIR = os.path.join('data', 'pages')
+
+METIER = {'id': 1, 'nom': 'Développeur', 'keywords': '[]'}
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36')
+
+Parser = Callable[[str], Optional[List[Dict]]]
+
+# Chaque parser lit le fichier <nom><extension> de la page enregistrée
+Parsers = Dict[str, Tuple[str, Parser]]
+
+def indeed_parsers() -> Parsers:
+    """Parsers Indeed: JSON embarqué et cartes HTML"""
+    from scrapers.indeed_scraper import IndeedScraper, extract_embedded_results
+
+    scraper = IndeedScraper({'base_url': 'https://fr.indeed.com'})
+
+    def embedded(html: str) -> Optional[List[Dict]]:
+        results = extract_embedded_results(html)
+        if results is None:
+            return None
+        return [job for result in results if (job := scraper._parse_embedded_result(result, METIER))]
+
+    def dom(html: str) -> List[Dict]:
+        return scraper._parse_search_page_dom(html, METIER)
+
+    return {'json': ('.html', embedded), 'dom': ('.html', dom)}
+
+def wttj_parsers() -> Parsers:
+    """Parsers WTTJ: réponse de recherche Algolia et page HTML"""
+    from scrapers.welcometothejungle_scraper import WelcomeToTheJungleScraper, parse_search_response
+
+    scraper = WelcomeToTheJungleScraper({'base_url': 'https://www.welcometothejungle.com'})
+
+    def algolia(text: str) -> List[Dict]:
+        hits, _ = parse_search_response(json.loads(text))
+        return [job for hit in hits if (job := scraper._parse_hit(hit, METIER))]
+
+    def html(text: str) -> List[Dict]:
+        return scraper._parse_search_page(text, METIER)
+
+    return {'algolia': ('.json', algolia), 'html': ('.html', html)}
+
+def record_wttj_search(html: str, url: str, path: str):
+    """Enregistre la réponse Algolia correspondant à une page de recherche WTTJ"""
+    from scrapers.welcometothejungle_scraper import WelcomeToTheJungleScraper, extract_algolia_config
+
+    algolia = extract_algolia_config(html)
+    if not algolia:
+        print(f"⚠️ Configuration Algolia absente de {url}")
+        return
+
+    scraper = WelcomeToTheJungleScraper({'base_url': 'https://www.welcometothejungle.com'})
+    query = parse_qs(urlparse(url).query)
+    body = scraper._build_algolia_request(
+        algolia, query.get('query', [''])[0], query.get('aroundQuery', [None])[0], 0
+    )
+
+    request = urllib.request.Request(
+        f"https://{algolia['app_id']}-dsn.algolia.net/1/indexes/*/queries",
+        data=json.dumps(body).encode(),
+        headers={'X-Algolia-Application-Id': algolia['app_id'], 'X-Algolia-API-Key': algolia['api_key'],
+                 'Content-Type': 'application/json', 'Referer': 'https://www.welcometothejungle.com/',
+                 'User-Agent': USER_AGENT}
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        payload = response.read().decode('utf-8')
+
+    json_path = f"{os.path.splitext(path)[0]}.json"
+    with open(json_path, 'w', encoding='utf-8') as file:
+        file.write(payload)
+    print(f"💾 Recherche Algolia -> {json_path}")
+
+SITES = {
+    'indeed': indeed_parsers,
+    'wttj': wttj_parsers,
+}
+
+# Enregistrements complémentaires à la page HTML
+RECORDERS = {
+    'wttj': record_wttj_search,
+}
+
+def record_pages(site: str, urls: List[str]):
+    """Télécharge et enregistre des pages de résultats"""
+    directory = os.path.join(PAGES_DIR, site)
+    os.makedirs(directory, exist_ok=True)
+
+    for url in urls:
+        request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT, 'Accept-Language': 'fr-FR,fr;q=0.9'})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                html = response.read().decode('utf-8', errors='replace')
+        except Exception as e:
+            print(f"❌ {url}: {e}")
+            continue
+
+        path = os.path.join(directory, f"{int(time.time() * 1000)}.html")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(html)
+        print(f"💾 {url} -> {path} ({len(html) / 1024:.0f} Ko)")
+
+        if site in RECORDERS:
+            try:
+                RECORDERS[site](html, url, path)
+            except Exception as e:
+                print(f"❌ Enregistrement complémentaire {url}: {e}")
+
+def time_parser(parser: Parser, html: str, repeat: int):
+    """Durée médiane (ms) et résultat d'un parser sur une page"""
+    durations = []
+    jobs = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        jobs = parser(html)
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations), jobs
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des parsers de pages de résultats")
+    parser.add_argument('site', choices=sorted(SITES))
+    parser.add_argument('--pages', help="Dossier des pages enregistrées (défaut: data/pages/<site>)")
+    parser.add_argument('--repeat', type=int, default=20, help="Répétitions par page")
+    parser.add_argument('--record', nargs='+', metavar='URL', help="Enregistre ces pages avant le benchmark")
+    args = parser.parse_args()
+
+    if args.record:
+        record_pages(args.site, args.record)
+
+    pages_dir = args.pages or os.path.join(PAGES_DIR, args.site)
+    stems = sorted({os.path.splitext(path)[0] for path in glob.glob(os.path.join(pages_dir, '*.*'))})
+    if not stems:
+        print(f"❌ Aucune page enregistrée dans {pages_dir}")
+        return
+
+    parsers = SITES[args.site]()
+    totals = {name: [] for name in parsers}
+    jobs_count = {name: 0 for name in parsers}
+    missing = {name: 0 for name in parsers}
+    mismatches = 0
+
+    for stem in stems:
+        ids = {}
+        for name, (extension, page_parser) in parsers.items():
+            if not os.path.exists(stem + extension):
+                missing[name] += 1
+                continue
+            with open(stem + extension, encoding='utf-8') as file:
+                content = file.read()
+
+            duration, jobs = time_parser(page_parser, content, args.repeat)
+            if jobs is None:
+                missing[name] += 1
+                continue
+            totals[name].append(duration)
+            jobs_count[name] += len(jobs)
+            ids[name] = {job['url'] for job in jobs}
+
+        if len(set(map(frozenset, ids.values()))) > 1:
+            mismatches += 1
+            print(f"⚠️ {os.path.basename(stem)}: offres différentes selon le parser "
+                  + ', '.join(f"{name}={len(found)}" for name, found in ids.items()))
+
+    print(f"\n📊 {args.site}: {len(stems)} pages, {args.repeat} répétitions")
+    for name, durations in totals.items():
+        if not durations:
+            print(f"   {name}: aucune page exploitable")
+            continue
+        print(f"   {name}: {statistics.mean(durations):.2f} ms/page, {jobs_count[name]} offres"
+              + (f", {missing[name]} pages sans données" if missing[name] else ""))
+
+    names = [name for name in totals if totals[name]]
+    if len(names) == 2:
+        fast, slow = sorted(names, key=lambda name: statistics.mean(totals[name]))
+        ratio = statistics.mean(totals[slow]) / statistics.mean(totals[fast])
+        print(f"   {fast} est {ratio:.1f}x plus rapide que {slow}")
+    print(f"   Pages avec des offres différentes: {mismatches}")
+
+if __name__ == "__main__":
+    main()
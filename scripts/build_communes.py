@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Génère le référentiel complet des communes pour le géocodage hors ligne
+
+Télécharge toutes les communes (API Découpage administratif de l'État,
+geo.api.gouv.fr: codes INSEE, codes postaux La Poste, centre géographique)
+et écrit le CSV au format de src/geo/data/communes_fr.csv: une ligne par
+couple commune / code postal, les plus peuplées d'abord pour départager
+les homonymes sans département.
+
+    python3 scripts/build_communes.py
+    python3 scripts/build_communes.py --output /srv/alternance/communes_fr.csv
+
+Un fichier écrit ailleurs que dans src/geo/data est utilisé via la variable
+d'environnement GAZETTEER_COMMUNES_FILE.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import urllib.request
+
+API_URL = ("https://geo.api.gouv.fr/communes"
+           "?fields=nom,code,codesPostaux,codeDepartement,centre,population&format=json")
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), '..', 'src', 'geo', 'data', 'communes_fr.csv')
+
+def fetch_communes(url: str = API_URL) -> list:
+    """Télécharge la liste des communes"""
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return json.load(response)
+
+def write_csv(communes: list, path: str) -> int:
+    """Écrit le référentiel (écriture atomique), retourne le nombre de lignes"""
+    rows = 0
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['nom', 'code_postal', 'departement', 'latitude', 'longitude'])
+
+        for commune in sorted(communes, key=lambda c: c.get('population') or 0, reverse=True):
+            centre = (commune.get('centre') or {}).get('coordinates')
+            if not centre or not commune.get('codeDepartement'):
+                continue
+            longitude, latitude = centre
+            for postcode in commune.get('codesPostaux') or ['']:
+                writer.writerow([commune['nom'], postcode, commune['codeDepartement'],
+                                 f"{latitude:.4f}", f"{longitude:.4f}"])
+                rows += 1
+
+    os.replace(tmp_path, path)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère le référentiel complet des communes")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Fichier CSV à écrire")
+    args = parser.parse_args()
+
+    try:
+        communes = fetch_communes()
+    except Exception as e:
+        print(f"❌ Téléchargement des communes impossible: {e}")
+        sys.exit(1)
+
+    rows = write_csv(communes, args.output)
+    print(f"✅ {len(communes)} communes ({rows} codes postaux) écrites dans {args.output}")
+
+if __name__ == "__main__":
+    main()
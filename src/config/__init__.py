@@ -2,11 +2,12 @@
 Module de configuration
 """
 
-from .settings import Settings, DatabaseConfig, DiscordConfig, ScrapingConfig
+from .settings import Settings, DatabaseConfig, DiscordConfig, ScrapingConfig, NotificationConfig
 
 __all__ = [
     'Settings',
     'DatabaseConfig',
     'DiscordConfig',
-    'ScrapingConfig'
+    'ScrapingConfig',
+    'NotificationConfig'
 ]
\ No newline at end of file
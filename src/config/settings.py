@@ -5,7 +5,7 @@ Configuration du bot alternance
 import os
 import yaml
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
 # Charger les variables d'environnement
@@ -36,6 +36,18 @@ class ScrapingConfig:
     request_delay: int  # Secondes
     timeout: int  # Secondes
     user_agent: str
+    default_location: Optional[str]  # Zone de recherche envoyée aux sites, None = aucune (filtrage fin par utilisateur)
+
+@dataclass
+class NotificationConfig:
+    """Configuration des notifications"""
+    max_per_hour: int
+    cooldown_minutes: int
+    daily_digest_hour: int  # Heure (UTC) d'envoi du digest quotidien
+    digest_check_minutes: int  # Fréquence de vérification des digests
+    digest_max_offres: int  # Nombre max d'offres listées par digest
+    realtime_enabled: bool  # Notification dès l'insertion via LISTEN/NOTIFY
+    sweep_minutes: int  # Fréquence de reprise des offres non notifiées
 
 @dataclass
 class LinkedInConfig:
@@ -75,7 +87,19 @@ class Settings:
             max_concurrent_requests=int(os.getenv('MAX_CONCURRENT_REQUESTS', 5)),
             request_delay=int(os.getenv('REQUEST_DELAY', 2)),
             timeout=int(os.getenv('REQUEST_TIMEOUT', 30)),
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            default_location=os.getenv('DEFAULT_LOCATION') or None
+        )
+
+        # Configuration notifications
+        self.notifications = NotificationConfig(
+            max_per_hour=int(os.getenv('NOTIFICATIONS_MAX_PER_HOUR', 10)),
+            cooldown_minutes=int(os.getenv('NOTIFICATIONS_COOLDOWN_MINUTES', 5)),
+            daily_digest_hour=int(os.getenv('DAILY_DIGEST_HOUR', 8)),
+            digest_check_minutes=int(os.getenv('DIGEST_CHECK_MINUTES', 5)),
+            digest_max_offres=int(os.getenv('DIGEST_MAX_OFFRES', 25)),
+            realtime_enabled=os.getenv('REALTIME_NOTIFICATIONS', 'true').lower() == 'true',
+            sweep_minutes=int(os.getenv('NOTIFICATION_SWEEP_MINUTES', 5))
         )
 
         # Configuration LinkedIn (optionnelle)
@@ -91,10 +115,16 @@ class Settings:
 
         # Configuration des sites de scraping
         self.sites_config = {
+            'indeed': {
+                'enabled': True,  # Source logique: stratégie la moins coûteuse qui fonctionne
+                'strategies': ['indeed_vps', 'indeed_http', 'indeed_cloudscraper', 'indeed_selenium']
+            },
             'indeed_vps': {
                 'enabled': True,  # Scraper via API Selenium sur VPS
                 'base_url': 'https://fr.indeed.com',
                 'vps_api_url': 'http://45.158.77.193:5000',
+                'vps_poll_interval': 2,  # Secondes entre deux interrogations d'un job
+                'vps_job_timeout': 300,
                 'max_pages': 1
             },
             'indeed_curlcffi': {
@@ -116,15 +146,17 @@ class Settings:
                 'enabled': False,  # 403 - en attente résolution
                 'base_url': 'https://api.francetravail.io',
                 'client_id': os.getenv('FRANCETRAVAIL_CLIENT_ID', ''),
-                'client_secret': os.getenv('FRANCETRAVAIL_CLIENT_SECRET', '')
+                'client_secret': os.getenv('FRANCETRAVAIL_CLIENT_SECRET', ''),
+                'full_reconcile_hours': 24,  # Synchronisation complète (7 jours) périodique
+                'max_parallel_ranges': 4
             },
             'test': {
                 'enabled': False,  # Désactivé - scrapers réels activés
                 'base_url': 'https://example.com',
                 'max_pages': 1
             },
-            'indeed': {
-                'enabled': False,  # Remplacé par indeed_vps
+            'indeed_http': {
+                'enabled': False,  # 403 - à réactiver pour que le routeur indeed l'utilise
                 'base_url': 'https://fr.indeed.com',
                 'search_path': '/jobs',
                 'params': {
@@ -138,6 +170,7 @@ class Settings:
                 'enabled': False,  # Désactivé temporairement
                 'base_url': 'https://www.welcometothejungle.com',
                 'search_path': '/fr/jobs',
+                'mode': 'structured',  # Recherche Algolia (JSON), 'html' pour parser les pages
                 'params': {
                     'query': '{keywords} alternance',
                     'aroundQuery': '{location}',
@@ -200,6 +233,12 @@ class Settings:
                     if hasattr(self.scraping, key):
                         setattr(self.scraping, key, value)
 
+            if 'notifications' in yaml_config:
+                notifications_config = yaml_config['notifications']
+                for key, value in notifications_config.items():
+                    if hasattr(self.notifications, key):
+                        setattr(self.notifications, key, value)
+
         except Exception as e:
             print(f"Erreur lors du chargement de {self.config_file}: {e}")
 
@@ -210,17 +249,30 @@ class Settings:
 
     def get_site_config(self, site_name: str) -> Dict:
         """Récupère la configuration d'un site spécifique"""
-        return self.sites_config.get(site_name, {})
+        config = self.sites_config.get(site_name, {})
+
+        # Source logique: fournir la configuration de chaque stratégie
+        if 'strategies' in config:
+            config = dict(config, strategy_configs={
+                strategy: self.sites_config.get(strategy, {}) for strategy in config['strategies']
+            })
+
+        return config
 
     def is_site_enabled(self, site_name: str) -> bool:
         """Vérifie si un site est activé"""
         return self.sites_config.get(site_name, {}).get('enabled', False)
 
     def get_enabled_sites(self) -> List[str]:
-        """Retourne la liste des sites activés"""
+        """Retourne la liste des sites activés (hors stratégies déjà pilotées par une source logique)"""
+        routed = {
+            strategy
+            for config in self.sites_config.values() if config.get('enabled', False)
+            for strategy in config.get('strategies', [])
+        }
         return [
             site for site, config in self.sites_config.items()
-            if config.get('enabled', False)
+            if config.get('enabled', False) and site not in routed
         ]
 
     def validate(self) -> bool:
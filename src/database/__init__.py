@@ -2,15 +2,19 @@
 Module de gestion de base de données
 """
 
-from .models import User, Metier, OffreEmploi, Notification, ScrapingSession, Configuration
+from .models import User, Metier, OffreEmploi, OffreFingerprintBand, Notification, NotificationOutbox, ScrapingSession, Configuration
 from .manager import DatabaseManager
+from .listener import OffreListener
 
 __all__ = [
     'User',
     'Metier',
     'OffreEmploi',
+    'OffreFingerprintBand',
     'Notification',
+    'NotificationOutbox',
     'ScrapingSession',
     'Configuration',
-    'DatabaseManager'
+    'DatabaseManager',
+    'OffreListener'
 ]
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+Écoute PostgreSQL LISTEN/NOTIFY des nouvelles offres
+"""
+
+import asyncio
+import logging
+from typing import Optional
+import asyncpg
+
+from .manager import NEW_OFFRE_CHANNEL
+
+class OffreListener:
+    """Connexion asyncpg dédiée qui pousse les IDs des nouvelles offres dans une file"""
+
+    def __init__(self, database_url: str, channel: str = NEW_OFFRE_CHANNEL, reconnect_delay: int = 5):
+        # asyncpg attend une URL postgresql:// sans le suffixe de driver SQLAlchemy
+        self.database_url = database_url.replace('postgresql+asyncpg://', 'postgresql://')
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.connection: Optional[asyncpg.Connection] = None
+        self.logger = logging.getLogger(__name__)
+        self._running = False
+
+    @property
+    def is_connected(self) -> bool:
+        """Indique si la connexion LISTEN est active"""
+        return self.connection is not None and not self.connection.is_closed()
+
+    def _on_notification(self, connection, pid, channel, payload):
+        """Callback asyncpg appelé à chaque NOTIFY"""
+        try:
+            self.queue.put_nowait(int(payload))
+        except ValueError:
+            self.logger.warning(f"Payload NOTIFY invalide sur {channel}: {payload}")
+
+    def _on_connection_lost(self, connection):
+        """Callback asyncpg appelé quand le serveur ferme la connexion"""
+        self.logger.warning("Connexion LISTEN perdue, reconnexion...")
+
+    async def run(self):
+        """Maintient la connexion LISTEN ouverte (à lancer comme tâche de fond)"""
+        self._running = True
+
+        while self._running:
+            try:
+                self.connection = await asyncpg.connect(self.database_url)
+                self.connection.add_termination_listener(self._on_connection_lost)
+                await self.connection.add_listener(self.channel, self._on_notification)
+                self.logger.info(f"📡 LISTEN actif sur le canal '{self.channel}'")
+
+                # Vérifie périodiquement que la connexion est toujours vivante
+                while self._running and not self.connection.is_closed():
+                    await asyncio.sleep(self.reconnect_delay)
+                    await self.connection.execute("SELECT 1")
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Erreur connexion LISTEN: {e}")
+
+            await self._close_connection()
+            if self._running:
+                await asyncio.sleep(self.reconnect_delay)
+
+        await self._close_connection()
+
+    async def _close_connection(self):
+        """Ferme la connexion LISTEN si elle est ouverte"""
+        if self.connection and not self.connection.is_closed():
+            try:
+                await self.connection.close()
+            except Exception:
+                pass
+        self.connection = None
+
+    async def stop(self):
+        """Arrête l'écoute"""
+        self._running = False
+        await self._close_connection()
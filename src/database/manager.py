@@ -8,10 +8,49 @@ from typing import List, Optional, Dict
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import selectinload
-from sqlalchemy import select, and_, or_, desc
+from sqlalchemy import select, update, delete, and_, or_, desc, text
+from sqlalchemy.dialects.postgresql import insert
 from datetime import datetime, timedelta
 
-from .models import Base, User, Metier, OffreEmploi, Notification, ScrapingSession, Configuration
+from dedupe import (FINGERPRINT_BITS, MAX_DISTANCE, fingerprint_bands, from_signed64, hamming_distance,
+                    identity_key, offer_fingerprints, source_family, to_signed64)
+
+from .models import Base, User, Metier, OffreEmploi, OffreFingerprintBand, Notification, NotificationOutbox, ScrapingSession, Configuration
+
+# Canal PostgreSQL NOTIFY émis à chaque insertion d'offre (payload: id de l'offre)
+NEW_OFFRE_CHANNEL = 'offres_nouvelles'
+
+# Colonnes ajoutées après la création initiale du schéma.
+# create_all() ne modifie pas les tables existantes, on les ajoute donc à la main.
+SCHEMA_UPDATES = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS notification_mode VARCHAR(10) DEFAULT 'instant'",
+    "ALTER TABLE offres_emploi ADD COLUMN IF NOT EXISTS date_first_seen TIMESTAMP",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION",
+    "ALTER TABLE offres_emploi ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION",
+    "ALTER TABLE offres_emploi ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION",
+    "ALTER TABLE offres_emploi ADD COLUMN IF NOT EXISTS identity_key VARCHAR(40)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_offres_emploi_identity_key ON offres_emploi (identity_key)",
+    "ALTER TABLE offres_emploi ADD COLUMN IF NOT EXISTS fingerprint BIGINT",
+    "ALTER TABLE offres_emploi ADD COLUMN IF NOT EXISTS description_fingerprint BIGINT",
+    "ALTER TABLE offres_emploi ADD COLUMN IF NOT EXISTS duplicate_of_id INTEGER REFERENCES offres_emploi(id)",
+    # Une seule fois (repère dans configuration): les offres antérieures à la reprise
+    # des offres non notifiées sont marquées notifiées, sinon le premier passage
+    # renverrait une journée d'anciennes offres
+    """
+    WITH marker AS (
+        INSERT INTO configuration (key, value, description, updated_at)
+        VALUES ('migration_offres_notifiees', 'done', 'Offres existantes marquées notifiées', now())
+        ON CONFLICT (key) DO NOTHING
+        RETURNING id
+    )
+    UPDATE offres_emploi SET is_notified = TRUE
+    WHERE is_notified IS NOT TRUE AND EXISTS (SELECT 1 FROM marker)
+    """,
+]
+
+# Une offre n'est rattachée qu'à une offre du même métier vue dans cette fenêtre
+DUPLICATE_WINDOW_DAYS = 30
 
 class DatabaseManager:
     """Gestionnaire principal de la base de données"""
@@ -35,10 +74,84 @@ class DatabaseManager:
         """Initialise la base de données et crée les tables"""
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            for statement in SCHEMA_UPDATES:
+                await conn.execute(text(statement))
 
+        await self._backfill_identity_keys()
+        await self._backfill_fingerprints()
         await self._populate_default_data()
         self.logger.info("Base de données initialisée")
 
+    async def _backfill_identity_keys(self):
+        """Calcule la clé de déduplication des offres enregistrées avant son ajout"""
+        async with self.async_session() as session:
+            result = await session.execute(
+                select(OffreEmploi.id, OffreEmploi.source_site, OffreEmploi.url, OffreEmploi.external_id)
+                .where(and_(OffreEmploi.identity_key.is_(None), OffreEmploi.duplicate_of_id.is_(None)))
+                .order_by(OffreEmploi.id)
+            )
+            rows = result.all()
+            if not rows:
+                return
+
+            existing = await session.execute(
+                select(OffreEmploi.identity_key, OffreEmploi.id).where(OffreEmploi.identity_key.isnot(None))
+            )
+            known_keys = dict(existing.all())
+
+            # Les doublons historiques (même clé qu'une offre plus ancienne) restent sans clé,
+            # rattachés à cette offre: ils ne sont plus relus aux démarrages suivants
+            updates = []
+            duplicates = []
+            for offre_id, source_site, url, external_id in rows:
+                key = identity_key(source_site, url, external_id)
+                if key in known_keys:
+                    duplicates.append({'id': offre_id, 'duplicate_of_id': known_keys[key]})
+                else:
+                    known_keys[key] = offre_id
+                    updates.append({'id': offre_id, 'identity_key': key})
+
+            for batch in (updates, duplicates):
+                if batch:
+                    await session.execute(update(OffreEmploi), batch)
+            await session.commit()
+
+            self.logger.info(
+                f"🔑 Clé de déduplication calculée pour {len(updates)} offres "
+                f"({len(duplicates)} doublons historiques rattachés)"
+            )
+
+    async def _backfill_fingerprints(self):
+        """Indexe les empreintes des offres récentes enregistrées sans (ou avec l'ancien calcul)"""
+        since = datetime.utcnow() - timedelta(days=DUPLICATE_WINDOW_DAYS)
+        async with self.async_session() as session:
+            result = await session.execute(
+                select(OffreEmploi)
+                .where(and_(OffreEmploi.description_fingerprint.is_(None), OffreEmploi.date_scraped >= since))
+            )
+            offres = result.scalars().all()
+            if not offres:
+                return
+
+            await session.execute(
+                delete(OffreFingerprintBand).where(OffreFingerprintBand.offre_id.in_([offre.id for offre in offres]))
+            )
+
+            for offre in offres:
+                fingerprint, description_fingerprint = offer_fingerprints(
+                    offre.titre, offre.entreprise, offre.lieu, offre.description
+                )
+                offre.fingerprint = to_signed64(fingerprint)
+                offre.description_fingerprint = to_signed64(description_fingerprint)
+                if fingerprint and offre.duplicate_of_id is None:
+                    session.add_all(
+                        OffreFingerprintBand(band=band, value=value, offre_id=offre.id)
+                        for band, value in enumerate(fingerprint_bands(fingerprint))
+                    )
+
+            await session.commit()
+            self.logger.info(f"🧬 Empreinte calculée pour {len(offres)} offres récentes")
+
     async def _populate_default_data(self):
         """Ajoute les données par défaut (métiers, etc.)"""
         default_metiers = [
@@ -215,27 +328,124 @@ class DatabaseManager:
             return False
 
     async def save_offre(self, offre_data: Dict) -> OffreEmploi:
-        """Sauvegarde une nouvelle offre d'emploi"""
+        """
+        Sauvegarde une nouvelle offre d'emploi
+
+        L'offre déjà connue (même clé de déduplication) est écartée par l'index
+        unique, sans requête préalable: retourne None. Une offre quasi identique
+        à une offre déjà publiée sur une autre source lui est rattachée
+        (duplicate_of_id) et n'est pas notifiée.
+        """
+        if not offre_data.get('identity_key'):
+            offre_data = dict(offre_data, identity_key=identity_key(
+                offre_data.get('source_site'), offre_data.get('url'), offre_data.get('external_id')
+            ))
+
         async with self.async_session() as session:
-            # Vérifier si l'offre existe déjà
-            existing = await session.execute(
-                select(OffreEmploi).where(
-                    and_(
-                        OffreEmploi.url == offre_data.get('url'),
-                        OffreEmploi.source_site == offre_data.get('source_site')
-                    )
-                )
+            result = await session.execute(
+                insert(OffreEmploi)
+                .values(**offre_data)
+                .on_conflict_do_nothing(index_elements=['identity_key'])
+                .returning(OffreEmploi)
             )
+            offre = result.scalar_one_or_none()
 
-            if existing.scalar_one_or_none():
+            if offre is None:
                 return None  # Offre déjà existante
 
-            offre = OffreEmploi(**offre_data)
-            session.add(offre)
+            await self._link_duplicate(session, offre)
+
+            # Réveille le dispatcher temps réel (livré par PostgreSQL au commit)
+            if offre.duplicate_of_id is None:
+                await session.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {'channel': NEW_OFFRE_CHANNEL, 'payload': str(offre.id)}
+                )
+
             await session.commit()
             await session.refresh(offre)
             return offre
 
+    async def _link_duplicate(self, session: AsyncSession, offre: OffreEmploi):
+        """
+        Rattache une nouvelle offre à la même offre déjà publiée sur une autre source
+
+        Candidates: offres du même métier partageant une bande du SimHash
+        d'en-tête (index LSH) et venant d'une autre source (deux offres d'une
+        même source sont distinctes, leur identité les départage déjà),
+        retenues si ces empreintes diffèrent d'au plus MAX_DISTANCE bits.
+        Entre plusieurs candidates, la description la plus
+        proche départage. Sinon l'offre devient une référence et ses bandes
+        sont indexées.
+        """
+        fingerprint, description_fingerprint = offer_fingerprints(
+            offre.titre, offre.entreprise, offre.lieu, offre.description
+        )
+        offre.fingerprint = to_signed64(fingerprint)
+        offre.description_fingerprint = to_signed64(description_fingerprint)
+        if not fingerprint:
+            return
+
+        bands = fingerprint_bands(fingerprint)
+        since = datetime.utcnow() - timedelta(days=DUPLICATE_WINDOW_DAYS)
+        result = await session.execute(
+            select(OffreEmploi.id, OffreEmploi.source_site, OffreEmploi.fingerprint,
+                   OffreEmploi.description_fingerprint)
+            .join(OffreFingerprintBand, OffreFingerprintBand.offre_id == OffreEmploi.id)
+            .where(
+                and_(
+                    or_(*(
+                        and_(OffreFingerprintBand.band == band, OffreFingerprintBand.value == value)
+                        for band, value in enumerate(bands)
+                    )),
+                    OffreEmploi.metier_id == offre.metier_id,
+                    OffreEmploi.date_scraped >= since
+                )
+            )
+            .distinct()
+        )
+
+        family = source_family(offre.source_site)
+        best = None
+        for candidate_id, candidate_site, candidate_fingerprint, candidate_description in result.all():
+            if source_family(candidate_site) == family:
+                continue
+
+            distance = hamming_distance(fingerprint, from_signed64(candidate_fingerprint))
+            if distance > MAX_DISTANCE:
+                continue
+
+            # Départage: description la plus proche (inconnue d'un côté: rang neutre)
+            if description_fingerprint and candidate_description:
+                description_distance = hamming_distance(description_fingerprint, from_signed64(candidate_description))
+            else:
+                description_distance = FINGERPRINT_BITS // 2
+
+            rank = (distance, description_distance, candidate_id)
+            if best is None or rank < best:
+                best = rank
+
+        if best:
+            distance, _, duplicate_of_id = best
+            offre.duplicate_of_id = duplicate_of_id
+            offre.is_notified = True
+            self.logger.info(
+                f"🔗 Offre {offre.id} ({offre.source_site}) rattachée à l'offre {duplicate_of_id} (distance {distance})"
+            )
+        else:
+            session.add_all(
+                OffreFingerprintBand(band=band, value=value, offre_id=offre.id)
+                for band, value in enumerate(bands)
+            )
+
+    async def get_offre_by_id(self, offre_id: int) -> Optional[OffreEmploi]:
+        """Récupère une offre par son ID"""
+        async with self.async_session() as session:
+            result = await session.execute(
+                select(OffreEmploi).where(OffreEmploi.id == offre_id)
+            )
+            return result.scalar_one_or_none()
+
     async def get_users_for_metier(self, metier_id: int) -> List[User]:
         """Récupère tous les utilisateurs intéressés par un métier"""
         async with self.async_session() as session:
@@ -263,6 +473,73 @@ class DatabaseManager:
             await session.commit()
             return notification
 
+    async def claim_offre_notification(self, offre_id: int) -> bool:
+        """
+        Réserve une offre pour notification (marque is_notified de façon atomique)
+
+        Returns:
+            True si l'appelant doit notifier, False si déjà prise en charge
+        """
+        async with self.async_session() as session:
+            result = await session.execute(
+                update(OffreEmploi)
+                .where(and_(OffreEmploi.id == offre_id, OffreEmploi.is_notified == False))
+                .values(is_notified=True)
+                .returning(OffreEmploi.id)
+            )
+            claimed = result.scalar_one_or_none() is not None
+            await session.commit()
+            return claimed
+
+    async def release_offre_notification(self, offre_id: int):
+        """Libère une offre réservée dont la notification a échoué"""
+        async with self.async_session() as session:
+            await session.execute(
+                update(OffreEmploi)
+                .where(OffreEmploi.id == offre_id)
+                .values(is_notified=False)
+            )
+            await session.commit()
+
+    async def add_outbox_entries(self, offre_id: int, user_ids: List[int]):
+        """Met une offre en attente pour les digests de plusieurs utilisateurs"""
+        if not user_ids:
+            return
+
+        async with self.async_session() as session:
+            session.add_all([
+                NotificationOutbox(user_id=user_id, offre_id=offre_id)
+                for user_id in user_ids
+            ])
+            await session.commit()
+
+    async def get_pending_outbox_entries(self) -> List[NotificationOutbox]:
+        """Récupère les entrées de digest non envoyées (avec utilisateur et offre)"""
+        async with self.async_session() as session:
+            result = await session.execute(
+                select(NotificationOutbox)
+                .options(
+                    selectinload(NotificationOutbox.user),
+                    selectinload(NotificationOutbox.offre)
+                )
+                .where(NotificationOutbox.sent_at.is_(None))
+                .order_by(NotificationOutbox.created_at)
+            )
+            return result.scalars().all()
+
+    async def mark_outbox_entries_sent(self, entry_ids: List[int]):
+        """Marque des entrées de digest comme envoyées"""
+        if not entry_ids:
+            return
+
+        async with self.async_session() as session:
+            await session.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(entry_ids))
+                .values(sent_at=datetime.utcnow())
+            )
+            await session.commit()
+
     async def get_recent_offres(self, metier_id: int = None, hours: int = 24) -> List[OffreEmploi]:
         """Récupère les offres récentes"""
         async with self.async_session() as session:
@@ -279,6 +556,22 @@ class DatabaseManager:
             result = await session.execute(query.order_by(desc(OffreEmploi.date_scraped)))
             return result.scalars().all()
 
+    async def get_unnotified_offres(self, hours: int = 24) -> List[OffreEmploi]:
+        """Récupère les offres récentes pas encore notifiées (des plus anciennes aux plus récentes)"""
+        async with self.async_session() as session:
+            result = await session.execute(
+                select(OffreEmploi)
+                .where(
+                    and_(
+                        OffreEmploi.is_notified == False,
+                        OffreEmploi.is_active == True,
+                        OffreEmploi.date_scraped >= datetime.utcnow() - timedelta(hours=hours)
+                    )
+                )
+                .order_by(OffreEmploi.date_scraped)
+            )
+            return result.scalars().all()
+
     async def close(self):
         """Ferme la connexion à la base de données"""
         await self.engine.dispose()
\ No newline at end of file
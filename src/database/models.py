@@ -2,7 +2,7 @@
 Modèles de base de données pour le bot alternance
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Table
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, DateTime, Boolean, Text, ForeignKey, Table, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -31,6 +31,11 @@ class User(Base):
     # Préférences de recherche
     preferred_location = Column(String(100))
     max_distance = Column(Integer, default=50)  # En km
+    latitude = Column(Float)  # Coordonnées de preferred_location (géocodage hors ligne)
+    longitude = Column(Float)
+
+    # Préférences de notification: 'instant', 'hourly' ou 'daily'
+    notification_mode = Column(String(10), default='instant')
 
     # Relations
     metiers = relationship("Metier", secondary=user_metiers, back_populates="users")
@@ -74,13 +79,20 @@ class OffreEmploi(Base):
     entreprise = Column(String(100))
     description = Column(Text)
     lieu = Column(String(100))
+    latitude = Column(Float)  # Coordonnées du lieu, None si trop vague
+    longitude = Column(Float)
     salaire = Column(String(50))
     url = Column(String(500), nullable=False)
     source_site = Column(String(50), nullable=False)  # "indeed", "linkedin", etc.
     external_id = Column(String(100))  # ID externe du site source
+    identity_key = Column(String(40), unique=True, index=True)  # Clé de déduplication (dedupe.identity_key)
+    fingerprint = Column(BigInteger)  # SimHash titre/entreprise/lieu (dedupe.simhash), indexé par bandes
+    description_fingerprint = Column(BigInteger)  # SimHash de la description (départage des candidates)
+    duplicate_of_id = Column(Integer, ForeignKey('offres_emploi.id'))  # Même offre déjà publiée sur une autre source
 
     # Dates
     date_publication = Column(DateTime)
+    date_first_seen = Column(DateTime)  # Première détection par un scraper (UTC)
     date_scraped = Column(DateTime, default=datetime.utcnow)
     date_expiration = Column(DateTime)
 
@@ -93,6 +105,14 @@ class OffreEmploi(Base):
     metier = relationship("Metier", back_populates="offres")
     notifications = relationship("Notification", back_populates="offre")
 
+class OffreFingerprintBand(Base):
+    """Index LSH des empreintes: bandes du SimHash des offres non dupliquées"""
+    __tablename__ = 'offre_fingerprint_bands'
+
+    band = Column(SmallInteger, primary_key=True)
+    value = Column(Integer, primary_key=True)
+    offre_id = Column(Integer, ForeignKey('offres_emploi.id'), primary_key=True)
+
 class Notification(Base):
     """Historique des notifications envoyées"""
     __tablename__ = 'notifications'
@@ -108,6 +128,20 @@ class Notification(Base):
     user = relationship("User", back_populates="notifications")
     offre = relationship("OffreEmploi", back_populates="notifications")
 
+class NotificationOutbox(Base):
+    """Notifications en attente d'envoi groupé (digests horaires/quotidiens)"""
+    __tablename__ = 'notification_outbox'
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    offre_id = Column(Integer, ForeignKey('offres_emploi.id'), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    sent_at = Column(DateTime)  # NULL tant que le digest n'est pas parti
+
+    # Relations
+    user = relationship("User")
+    offre = relationship("OffreEmploi")
+
 class ScrapingSession(Base):
     """Sessions de scraping pour tracking"""
     __tablename__ = 'scraping_sessions'
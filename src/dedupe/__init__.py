@@ -0,0 +1,21 @@
+"""
+Module de déduplication des offres (identité canonique par source, empreintes SimHash)
+"""
+
+from .identity import canonical_url, identity_key, source_family, source_identity
+from .simhash import (FINGERPRINT_BITS, MAX_DISTANCE, fingerprint_bands, from_signed64, hamming_distance,
+                      offer_fingerprints, to_signed64)
+
+__all__ = [
+    'canonical_url',
+    'identity_key',
+    'source_family',
+    'source_identity',
+    'FINGERPRINT_BITS',
+    'MAX_DISTANCE',
+    'fingerprint_bands',
+    'from_signed64',
+    'hamming_distance',
+    'offer_fingerprints',
+    'to_signed64'
+]
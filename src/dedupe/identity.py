@@ -0,0 +1,101 @@
+"""
+Identité stable d'une offre: URL canonique et clé de déduplication par source
+"""
+
+import hashlib
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+# Paramètres de suivi sans effet sur l'offre affichée, quel que soit le site
+TRACKING_PARAMS = frozenset({
+    'gclid', 'fbclid', 'msclkid', 'dclid', 'yclid', 'mc_cid', 'mc_eid', '_ga', '_gl',
+    'xtor', 'referer', 'referrer', 'trk', 'trackingid',
+})
+TRACKING_PREFIXES = ('utm_',)
+
+# Paramètres de suivi propres à une source (ailleurs, ref/src/from peuvent identifier l'offre)
+SOURCE_TRACKING_PARAMS = {
+    'indeed': frozenset({'ref', 'from', 'src', 'tk', 'vjs'}),
+}
+
+# Sous-domaines équivalents au domaine principal
+HOST_PREFIXES = ('www.', 'm.')
+
+# Sources dont l'offre est identifiée par un paramètre de l'URL (Indeed: ?jk=...)
+URL_ID_PARAMS = {
+    'indeed': ('jk', 'vjk'),
+}
+
+# Sources dont l'identifiant externe est stable quel que soit le point d'entrée
+EXTERNAL_ID_SOURCES = frozenset({'francetravail', 'labonnealternance'})
+
+PATH_SAFE_CHARS = "/:@!$&'()*+,;=-._~"
+
+def source_family(source_site: str) -> str:
+    """Source logique d'un scraper ('indeed_vps', 'indeed_http'... -> 'indeed')"""
+    return (source_site or '').lower().partition('_')[0]
+
+def _is_tracking_param(name: str, family: str = '') -> bool:
+    name = name.lower()
+    return (name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+            or name in SOURCE_TRACKING_PARAMS.get(family, ()))
+
+def canonical_url(url: str, family: str = '') -> str:
+    """
+    Normalise une URL d'offre
+
+    Schéma https, hôte en minuscules sans www./m. ni port par défaut, chemin
+    sans doubles ni dernier slash, paramètres de suivi retirés (communs et
+    propres à la source family) et autres paramètres triés, fragment supprimé.
+    """
+    if not url:
+        return ""
+
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').rstrip('.')
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r'/{2,}', '/', quote(unquote(parts.path), safe=PATH_SAFE_CHARS))
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name, family)
+    ))
+
+    return urlunsplit(('https', host, path, query, ''))
+
+def source_identity(source_site: str, url: str, external_id: Optional[str] = None) -> str:
+    """
+    Identité lisible d'une offre au sein de sa source (avant hachage)
+
+    Selon la source: paramètre d'URL (Indeed), identifiant externe (API
+    France Travail, La Bonne Alternance), sinon URL canonique.
+    """
+    family = source_family(source_site)
+    url = canonical_url(url, family)
+
+    params = URL_ID_PARAMS.get(family)
+    if params:
+        query = dict(parse_qsl(urlsplit(url).query))
+        for name in params:
+            if query.get(name):
+                return f"{family}:{query[name]}"
+        if external_id:
+            return f"{family}:{external_id}"
+
+    if family in EXTERNAL_ID_SOURCES and external_id:
+        return f"{family}:{external_id}"
+
+    return f"{family}:{url}"
+
+def identity_key(source_site: str, url: str, external_id: Optional[str] = None) -> str:
+    """Clé de déduplication de largeur fixe (SHA-1 hexadécimal, 40 caractères)"""
+    return hashlib.sha1(source_identity(source_site, url, external_id).encode('utf-8')).hexdigest()
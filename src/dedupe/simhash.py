@@ -0,0 +1,144 @@
+"""
+Empreinte SimHash d'une offre pour repérer la même annonce publiée sur plusieurs sources
+"""
+
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Tuple
+
+FINGERPRINT_BITS = 64
+
+# Bandes LSH: deux empreintes à distance <= MAX_DISTANCE partagent au moins une bande
+# (principe des tiroirs: 5 bandes de 12-13 bits pour 4 bits différents au plus)
+MAX_DISTANCE = 4
+BAND_COUNT = MAX_DISTANCE + 1
+BAND_WIDTHS = [FINGERPRINT_BITS // BAND_COUNT + (band < FINGERPRINT_BITS % BAND_COUNT) for band in range(BAND_COUNT)]
+
+# Poids des caractéristiques de l'en-tête (qui identifie l'offre). La description
+# (extrait chez Indeed, texte complet chez France Travail) a sa propre empreinte,
+# qui ne sert qu'à départager plusieurs candidates.
+TITLE_WEIGHT = 2
+COMPANY_WEIGHT = 4
+COMPANY_TOKEN_WEIGHT = 1
+PLACE_WEIGHT = 3
+SHINGLE_SIZE = 3
+MAX_SHINGLES = 40
+
+# Mots présents dans presque toutes les offres, sans valeur discriminante
+STOP_WORDS = frozenset({
+    'h', 'f', 'hf', 'fh', 'x', 'e', 'alternance', 'alternant', 'alternante', 'apprentissage', 'apprenti',
+    'apprentie', 'contrat', 'professionnalisation', 'cdd', 'cdi', 'en', 'de', 'des', 'du', 'd', 'la',
+    'le', 'les', 'l', 'et', 'a', 'au', 'aux', 'un', 'une', 'pour', 'sur', 'par', 'avec',
+})
+
+# Formes juridiques et mots génériques des raisons sociales ("Decathlon SAS" = "DECATHLON")
+COMPANY_STOP_WORDS = frozenset({'sa', 'sas', 'sasu', 'sarl', 'eurl', 'sci', 'scop', 'groupe', 'group', 'france'})
+
+# Entreprises non renseignées selon les sources
+COMPANY_PLACEHOLDERS = frozenset({'non precise', 'non communique', 'entreprise confidentielle', 'confidentiel'})
+
+# Mots des lieux qui varient d'une source à l'autre ("Lyon 3e Arrondissement", "Paris Cedex")
+PLACE_STOP_WORDS = frozenset({'cedex', 'arrondissement', 'er', 'eme', 'france', 'teletravail', 'hybride'})
+
+# Compteurs par bit regroupés dans un seul entier: 16 bits par bit d'empreinte.
+# Les poids d'une offre (quelques centaines) restent loin de la capacité d'un compteur.
+LANE_BITS = 16
+LANE_MASK = (1 << LANE_BITS) - 1
+
+# Octet -> ses 8 bits étalés sur 8 compteurs, pour chaque position d'octet dans le hash
+_BYTE_LANES = [sum(1 << (LANE_BITS * bit) for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+_LANE_TABLES = [[lanes << (LANE_BITS * 8 * position) for lanes in _BYTE_LANES] for position in range(8)]
+
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9]+')
+
+def _tokens(text: str) -> List[str]:
+    """Mots normalisés (minuscules, sans accents ni ponctuation), hors mots vides"""
+    text = text.lower().replace('œ', 'oe').replace('æ', 'ae')
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return [token for token in NON_ALNUM_PATTERN.split(text) if token and token not in STOP_WORDS]
+
+def header_features(titre: str, entreprise: str, lieu: str) -> Dict[str, int]:
+    """Caractéristiques pondérées de l'en-tête d'une offre (titre, entreprise, lieu)"""
+    features = Counter()
+
+    for token in _tokens(titre):
+        features[f"t:{token}"] += TITLE_WEIGHT
+
+    company = [token for token in _tokens(entreprise) if token not in COMPANY_STOP_WORDS]
+    if company and ' '.join(company) not in COMPANY_PLACEHOLDERS:
+        features[f"e:{' '.join(company)}"] += COMPANY_WEIGHT
+        for token in company:
+            features[f"e:{token}"] += COMPANY_TOKEN_WEIGHT
+
+    # Lieu: noms seulement ("Paris (75)", "75 - Paris" et "Paris 15e" se valent)
+    for token in _tokens(lieu):
+        if token.isalpha() and token not in PLACE_STOP_WORDS:
+            features[f"l:{token}"] += PLACE_WEIGHT
+
+    return features
+
+def description_features(description: str) -> Dict[str, int]:
+    """Shingles (3 mots) du début de la description"""
+    # Assez de mots pour MAX_SHINGLES après retrait des mots vides
+    words = _tokens(' '.join(description.split()[:2 * (MAX_SHINGLES + SHINGLE_SIZE)]))
+    return Counter(
+        ' '.join(words[start:start + SHINGLE_SIZE])
+        for start in range(min(len(words) - SHINGLE_SIZE + 1, MAX_SHINGLES))
+    )
+
+def simhash(features: Dict[str, int]) -> int:
+    """
+    SimHash 64 bits de caractéristiques pondérées
+
+    Les 64 compteurs sont additionnés d'un coup sur un entier (8 lectures de
+    table par caractéristique au lieu de 64 tests de bits).
+    """
+    lanes = 0
+    total_weight = 0
+    t0, t1, t2, t3, t4, t5, t6, t7 = _LANE_TABLES
+
+    for feature, weight in features.items():
+        d = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+        lanes += (t0[d[0]] + t1[d[1]] + t2[d[2]] + t3[d[3]] + t4[d[4]] + t5[d[5]] + t6[d[6]] + t7[d[7]]) * weight
+        total_weight += weight
+
+    # Bit à 1 si plus de la moitié du poids le vote
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        if 2 * ((lanes >> (LANE_BITS * bit)) & LANE_MASK) > total_weight:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def offer_fingerprints(titre: str, entreprise: str, lieu: str, description: str) -> Tuple[int, int]:
+    """
+    Empreintes d'une offre: (en-tête, description)
+
+    L'empreinte d'en-tête, indexée par bandes LSH, retrouve la même offre sur
+    une autre source quelle que soit la longueur de sa description. 0 si la
+    partie correspondante n'a aucune caractéristique exploitable.
+    """
+    header = header_features(titre or '', entreprise or '', lieu or '')
+    shingles = description_features(description or '')
+    return (simhash(header) if header else 0, simhash(shingles) if shingles else 0)
+
+def fingerprint_bands(fingerprint: int) -> List[int]:
+    """Découpe une empreinte en BAND_COUNT bandes (clés de l'index LSH)"""
+    bands = []
+    for width in BAND_WIDTHS:
+        bands.append(fingerprint & ((1 << width) - 1))
+        fingerprint >>= width
+    return bands
+
+def hamming_distance(a: int, b: int) -> int:
+    """Nombre de bits différents entre deux empreintes"""
+    return bin(a ^ b).count('1')
+
+def to_signed64(value: int) -> int:
+    """Empreinte non signée -> BIGINT PostgreSQL"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def from_signed64(value: int) -> int:
+    """BIGINT PostgreSQL -> empreinte non signée"""
+    return value & ((1 << 64) - 1)
@@ -4,8 +4,12 @@ Module du bot Discord
 
 from .bot import AlternanceBot
 from .webhook import WebhookNotifier
+from .dispatcher import NotificationDispatcher
+from .digest import DigestScheduler
 
 __all__ = [
     'AlternanceBot',
-    'WebhookNotifier'
+    'WebhookNotifier',
+    'NotificationDispatcher',
+    'DigestScheduler'
 ]
\ No newline at end of file
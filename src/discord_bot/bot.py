@@ -4,15 +4,21 @@ Bot Discord principal pour le monitoring d'alternances
 
 import asyncio
 import logging
+import os
 from typing import List, Dict
 import discord
 from discord.ext import commands, tasks
-from datetime import datetime
 
 from database.manager import DatabaseManager
+from database.listener import OffreListener
 from config.settings import Settings
 from .commands import setup_commands
 from .webhook import WebhookNotifier
+from .dispatcher import NotificationDispatcher
+from .digest import DigestScheduler
+
+# Fichier lu par le textfile collector de node_exporter
+METRICS_FILE = os.path.join('logs', 'metrics.prom')
 
 class AlternanceBot(commands.Bot):
     """Bot Discord principal"""
@@ -33,11 +39,20 @@ class AlternanceBot(commands.Bot):
         self.settings = settings
         self.db_manager = db_manager
         self.webhook_notifier = WebhookNotifier(settings.discord.webhook_url)
+        self.dispatcher = NotificationDispatcher(settings, db_manager, self.webhook_notifier)
+        self.digest_scheduler = DigestScheduler(settings, db_manager, self.webhook_notifier)
         self.logger = logging.getLogger(__name__)
 
         # État du monitoring
         self.monitoring_active = False
         self.monitoring_task = None
+        self.digest_task = None
+        self.sweep_task = None
+
+        # Notifications temps réel (LISTEN/NOTIFY)
+        self.offre_listener = OffreListener(settings.database_url)
+        self.listener_task = None
+        self.realtime_task = None
 
         # Configuration des commandes
         setup_commands(self)
@@ -57,6 +72,21 @@ class AlternanceBot(commands.Bot):
         if not self.monitoring_task:
             self.monitoring_task = self.start_monitoring.start()
 
+        # Démarrer l'écoute des nouvelles offres
+        if self.settings.notifications.realtime_enabled and not self.listener_task:
+            self.listener_task = asyncio.create_task(self.offre_listener.run())
+            self.realtime_task = asyncio.create_task(self._realtime_dispatch_loop())
+
+        # Démarrer l'envoi des digests
+        if not self.digest_task:
+            self.send_digests.change_interval(minutes=self.settings.notifications.digest_check_minutes)
+            self.digest_task = self.send_digests.start()
+
+        # Reprendre les offres non notifiées (NOTIFY perdu, échec webhook)
+        if not self.sweep_task:
+            self.sweep_unnotified.change_interval(minutes=self.settings.notifications.sweep_minutes)
+            self.sweep_task = self.sweep_unnotified.start()
+
     async def on_ready(self):
         """Événement déclenché quand le bot est prêt"""
         self.logger.info(f"Bot connecté en tant que {self.user}")
@@ -107,9 +137,13 @@ class AlternanceBot(commands.Bot):
                     scraper = get_scraper(site_name, site_config)
 
                     async with scraper:
-                        for metier in metiers:
-                            # Convertir Metier en dict pour le scraper
-                            metier_dict = metier.to_dict()
+                        # Convertir les Metier en dict pour le scraper
+                        metier_dicts = [metier.to_dict() for metier in metiers]
+
+                        # Requêtes groupées pour tous les métiers quand le site le permet
+                        await scraper.prefetch(metier_dicts, location=self.settings.scraping.default_location)
+
+                        for metier_dict in metier_dicts:
                             await self._monitor_metier(scraper, metier_dict)
                             await asyncio.sleep(2)  # Délai entre les métiers
 
@@ -118,97 +152,126 @@ class AlternanceBot(commands.Bot):
 
                 await asyncio.sleep(5)  # Délai entre les sites
 
+            # Résumé des latences du pipeline
+            from utils.latency import latency_metrics
+            for line in latency_metrics.summary_lines():
+                self.logger.info(f"⏱️ {line}")
+
+            # Export pour le textfile collector de node_exporter (hors de la boucle d'événements)
+            await asyncio.to_thread(self._export_metrics, latency_metrics.to_prometheus())
+
         except Exception as e:
             self.logger.error(f"Erreur générale monitoring: {e}")
 
-    async def _monitor_metier(self, scraper, metier: Dict):
-        """Monitore un métier spécifique avec un scraper"""
+    def _export_metrics(self, content: str):
+        """Écrit les métriques Prometheus (écriture atomique: jamais de fichier lu à moitié)"""
         try:
-            # Rechercher des offres
-            jobs = await scraper.search_jobs(metier)
-
-            new_jobs = []
-            for job in jobs:
-                # Sauvegarder l'offre (retourne None si déjà existante)
-                saved_job = await self.db_manager.save_offre(job)
-                if saved_job:
-                    new_jobs.append(saved_job)
-
-            if new_jobs:
-                self.logger.info(f"{len(new_jobs)} nouvelles offres pour {metier['nom']} sur {scraper.site_name}")
-
-                # Notifier les utilisateurs intéressés
-                for job in new_jobs:
-                    await self._notify_new_job(job, metier)
-
+            os.makedirs(os.path.dirname(METRICS_FILE) or '.', exist_ok=True)
+            tmp_path = f"{METRICS_FILE}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as metrics_file:
+                metrics_file.write(content)
+            os.replace(tmp_path, METRICS_FILE)
         except Exception as e:
-            self.logger.error(f"Erreur monitoring métier {metier['nom']}: {e}")
+            self.logger.warning(f"Impossible d'exporter les métriques dans {METRICS_FILE}: {e}")
 
-    async def _notify_new_job(self, job, metier: Dict):
-        """Notifie les utilisateurs d'une nouvelle offre"""
+    @tasks.loop(minutes=5)
+    async def send_digests(self):
+        """Tâche d'envoi périodique des digests horaires et quotidiens"""
         try:
-            # Récupérer les utilisateurs intéressés par ce métier
-            users = await self.db_manager.get_users_for_metier(metier['id'])
+            sent = await self.digest_scheduler.run_once()
+            if sent:
+                self.logger.info(f"{sent} digests envoyés")
+        except Exception as e:
+            self.logger.error(f"Erreur envoi digests: {e}")
 
-            if not users:
+    @tasks.loop(minutes=5)
+    async def sweep_unnotified(self):
+        """
+        Tâche de reprise des offres restées non notifiées
+
+        Rattrape les NOTIFY perdus pendant une coupure LISTEN non encore
+        détectée et les offres libérées après un échec webhook. La réservation
+        atomique du dispatcher évite tout doublon avec le temps réel.
+        """
+        try:
+            jobs = await self.db_manager.get_unnotified_offres(hours=24)
+            if not jobs:
                 return
 
-            # Créer l'embed Discord
-            embed = self._create_job_embed(job, metier)
+            self.logger.info(f"🧹 {len(jobs)} offres non notifiées reprises")
+            metier_names = {}
+            for job in jobs:
+                try:
+                    if job.metier_id not in metier_names:
+                        metier = await self.db_manager.get_metier_by_id(job.metier_id)
+                        metier_names[job.metier_id] = metier.nom if metier else ""
 
-            # Envoyer via webhook
-            success = await self.webhook_notifier.send_job_notification(embed, users)
+                    await self.dispatcher.dispatch(job, metier_names[job.metier_id])
+                except Exception as e:
+                    self.logger.error(f"Erreur reprise notification offre {job.id}: {e}")
 
-            if success:
-                # Marquer comme notifié et sauvegarder les notifications
-                for user in users:
-                    await self.db_manager.save_notification(
-                        user_id=user.id,
-                        offre_id=job.id,
-                        webhook_url=self.settings.discord.webhook_url
-                    )
+        except Exception as e:
+            self.logger.error(f"Erreur reprise des offres non notifiées: {e}")
 
-                # Mettre à jour le statut de l'offre
-                job.is_notified = True
+    async def _realtime_dispatch_loop(self):
+        """Notifie chaque offre dès que PostgreSQL signale son insertion"""
+        metier_names = {}
 
-                self.logger.info(f"Notification envoyée pour {job.titre} à {len(users)} utilisateurs")
+        while True:
+            offre_id = await self.offre_listener.queue.get()
 
-        except Exception as e:
-            self.logger.error(f"Erreur notification job {job.id}: {e}")
+            try:
+                job = await self.db_manager.get_offre_by_id(offre_id)
+                if not job or job.is_notified:
+                    continue
 
-    def _create_job_embed(self, job, metier: Dict) -> discord.Embed:
-        """Crée un embed Discord pour une offre d'emploi"""
-        embed = discord.Embed(
-            title=f"🎯 Nouvelle offre d'alternance - {metier['nom']}",
-            description=job.titre,
-            color=discord.Color.green(),
-            timestamp=datetime.now(),
-            url=job.url
-        )
+                if job.metier_id not in metier_names:
+                    metier = await self.db_manager.get_metier_by_id(job.metier_id)
+                    metier_names[job.metier_id] = metier.nom if metier else ""
 
-        # Champs de l'offre
-        if job.entreprise:
-            embed.add_field(name="🏢 Entreprise", value=job.entreprise, inline=True)
+                await self.dispatcher.dispatch(job, metier_names[job.metier_id])
 
-        if job.lieu:
-            embed.add_field(name="📍 Lieu", value=job.lieu, inline=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Erreur dispatch temps réel offre {offre_id}: {e}")
 
-        if job.salaire:
-            embed.add_field(name="💰 Salaire", value=job.salaire, inline=True)
+    async def _monitor_metier(self, scraper, metier: Dict):
+        """Monitore un métier spécifique avec un scraper"""
+        from utils.latency import latency_metrics
 
-        # Description (limitée)
-        if job.description:
-            desc_short = job.description[:200] + "..." if len(job.description) > 200 else job.description
-            embed.add_field(name="📝 Description", value=desc_short, inline=False)
+        try:
+            new_jobs = []
+            stored_jobs = []
+            location = self.settings.scraping.default_location
+            try:
+                async for job in scraper.iter_jobs(metier, location=location):
+                    # Sauvegarder l'offre (retourne None si déjà existante)
+                    saved_job = await self.db_manager.save_offre(job)
+                    stored_jobs.append(job)
+                    if saved_job:
+                        latency_metrics.record_stored(saved_job, scraper.provides_publication_time)
+                        new_jobs.append(saved_job)
+
+                        # Sans LISTEN actif, notifier directement (sinon le dispatcher temps réel s'en charge)
+                        if not self.offre_listener.is_connected:
+                            await self._notify_new_job(saved_job, metier)
+            finally:
+                scraper.record_stored(stored_jobs)
 
-        # Source et lien
-        embed.add_field(name="🌐 Source", value=job.source_site.capitalize(), inline=True)
-        embed.add_field(name="🔗 Postuler", value=f"[Voir l'offre]({job.url})", inline=True)
+            if new_jobs:
+                self.logger.info(f"{len(new_jobs)} nouvelles offres pour {metier['nom']} sur {scraper.site_name}")
+                scraper.record_new_offers(new_jobs)
 
-        # Footer
-        embed.set_footer(text=f"Bot Alternance • {job.source_site}")
+        except Exception as e:
+            self.logger.error(f"Erreur monitoring métier {metier['nom']}: {e}")
 
-        return embed
+    async def _notify_new_job(self, job, metier: Dict):
+        """Notifie les utilisateurs d'une nouvelle offre"""
+        try:
+            await self.dispatcher.dispatch(job, metier['nom'])
+        except Exception as e:
+            self.logger.error(f"Erreur notification job {job.id}: {e}")
 
     async def start(self):
         """Démarre le bot"""
@@ -222,5 +285,18 @@ class AlternanceBot(commands.Bot):
         if self.monitoring_task:
             self.monitoring_task.cancel()
 
+        if self.digest_task:
+            self.digest_task.cancel()
+
+        if self.sweep_task:
+            self.sweep_task.cancel()
+
+        if self.realtime_task:
+            self.realtime_task.cancel()
+
+        if self.listener_task:
+            await self.offre_listener.stop()
+            self.listener_task.cancel()
+
         await self.db_manager.close()
         await super().close()
\ No newline at end of file
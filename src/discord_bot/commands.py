@@ -6,6 +6,13 @@ import discord
 from discord.ext import commands
 from typing import List
 
+# Noms des modes côté utilisateur -> valeurs de User.notification_mode
+NOTIFICATION_MODE_ALIASES = {
+    'instantane': 'instant',
+    'horaire': 'hourly',
+    'quotidien': 'daily'
+}
+
 def setup_commands(bot):
     """Configure toutes les commandes du bot"""
 
@@ -57,6 +64,7 @@ def setup_commands(bot):
             `!alt help` - Affiche cette aide
             `!alt ping` - Teste la latence
             `!alt status` - Statut du bot
+            `!alt latence` - Fraîcheur des alertes
             """,
             inline=False
         )
@@ -77,6 +85,8 @@ def setup_commands(bot):
             value="""
             `!alt profil` - Voir mon profil
             `!alt lieu <ville>` - Définir ma localisation
+            `!alt rayon <km>` - Rayon autour de ma localisation
+            `!alt notifications <mode>` - instantane, horaire ou quotidien
             `!alt recent [métier]` - Offres récentes
             """,
             inline=False
@@ -277,6 +287,13 @@ def setup_commands(bot):
                 inline=True
             )
 
+            mode_labels = {v: k for k, v in NOTIFICATION_MODE_ALIASES.items()}
+            embed.add_field(
+                name="📬 Notifications",
+                value=mode_labels.get(user.notification_mode or 'instant', 'instantane'),
+                inline=True
+            )
+
             await ctx.send(embed=embed)
 
         except Exception as e:
@@ -291,19 +308,82 @@ def setup_commands(bot):
             return
 
         try:
+            from geo import geocode
+            coords = geocode(location)
+
             # Créer ou mettre à jour l'utilisateur
             user = await bot.db_manager.create_or_update_user(
                 discord_id=str(ctx.author.id),
                 username=ctx.author.display_name,
-                preferred_location=location
+                preferred_location=location,
+                latitude=coords[0] if coords else None,
+                longitude=coords[1] if coords else None
             )
 
-            await ctx.send(f"✅ Votre localisation a été définie sur **{location}**.")
+            if coords:
+                await ctx.send(
+                    f"✅ Votre localisation a été définie sur **{location}**. "
+                    f"Vous recevrez les offres à moins de {user.max_distance or 50} km "
+                    f"(modifiable avec `!alt rayon <km>`)."
+                )
+            else:
+                await ctx.send(
+                    f"⚠️ Localisation **{location}** enregistrée mais non reconnue: "
+                    f"vous continuerez à recevoir les offres de toute la France. "
+                    f"Essayez un nom de ville ou un code postal."
+                )
 
         except Exception as e:
             bot.logger.error(f"Erreur set location: {e}")
             await ctx.send("❌ Erreur lors de la sauvegarde de la localisation.")
 
+    @bot.command(name='rayon')
+    async def set_max_distance(ctx, distance: int = None):
+        """Définit le rayon de recherche autour de la localisation"""
+        if distance is None or distance <= 0:
+            await ctx.send("❌ Veuillez spécifier un rayon en km. Exemple: `!alt rayon 30`")
+            return
+
+        try:
+            await bot.db_manager.create_or_update_user(
+                discord_id=str(ctx.author.id),
+                username=ctx.author.display_name,
+                max_distance=distance
+            )
+
+            await ctx.send(f"✅ Rayon de recherche défini sur **{distance} km**.")
+
+        except Exception as e:
+            bot.logger.error(f"Erreur set rayon: {e}")
+            await ctx.send("❌ Erreur lors de la sauvegarde du rayon.")
+
+    @bot.command(name='notifications')
+    async def set_notification_mode(ctx, mode: str = None):
+        """Définit le mode de réception des notifications"""
+        notification_mode = NOTIFICATION_MODE_ALIASES.get((mode or '').lower())
+        if not notification_mode:
+            await ctx.send(
+                "❌ Veuillez choisir un mode: `instantane`, `horaire` ou `quotidien`. "
+                "Exemple: `!alt notifications horaire`"
+            )
+            return
+
+        try:
+            await bot.db_manager.create_or_update_user(
+                discord_id=str(ctx.author.id),
+                username=ctx.author.display_name,
+                notification_mode=notification_mode
+            )
+
+            if notification_mode == 'instant':
+                await ctx.send("✅ Vous recevrez chaque nouvelle offre immédiatement.")
+            else:
+                await ctx.send(f"✅ Vos offres vous seront envoyées en digest **{mode.lower()}**.")
+
+        except Exception as e:
+            bot.logger.error(f"Erreur set notification mode: {e}")
+            await ctx.send("❌ Erreur lors de la sauvegarde de vos préférences.")
+
     @bot.command(name='recent')
     async def show_recent_jobs(ctx, metier_id: int = None):
         """Affiche les offres récentes"""
@@ -338,6 +418,20 @@ def setup_commands(bot):
             bot.logger.error(f"Erreur recent jobs: {e}")
             await ctx.send("❌ Erreur lors de la récupération des offres récentes.")
 
+    @bot.command(name='latence')
+    async def show_latency(ctx):
+        """Affiche les latences publication -> détection -> stockage -> Discord"""
+        from utils.latency import latency_metrics
+
+        lines = latency_metrics.summary_lines()
+        embed = discord.Embed(
+            title="⏱️ Fraîcheur des alertes",
+            description="\n".join(lines)[:4000] if lines else "Aucune mesure pour le moment.",
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text="Percentiles estimés par histogramme depuis le démarrage du bot")
+        await ctx.send(embed=embed)
+
     # Commandes administrateur
     @bot.command(name='admin-stats')
     @commands.has_permissions(administrator=True)
@@ -385,6 +479,7 @@ def setup_commands(bot):
             await ctx.send("🔍 Lancement du scraping manuel...")
 
             from scrapers import get_scraper
+            from utils.latency import latency_metrics
             import asyncio
 
             # Récupérer les métiers à scraper
@@ -404,25 +499,30 @@ def setup_commands(bot):
                 site_config = bot.settings.get_site_config(site_name)
 
                 try:
-                    scraper = get_scraper(site_name, site_config)
+                    # Scraping forcé: pas de résultats en cache côté VPS
+                    scraper = get_scraper(site_name, dict(site_config, force_refresh=True))
 
                     async with scraper:
                         for metier in metiers:
                             # Convertir Metier en dict pour le scraper
                             metier_dict = metier.to_dict()
-                            jobs = await scraper.search_jobs(metier_dict)
+                            jobs = await scraper.search_jobs(metier_dict, location=bot.settings.scraping.default_location)
 
                             bot.logger.info(f"🔍 {site_name}: {len(jobs)} offres trouvées")
 
+                            stored_jobs = []
                             for job in jobs:
                                 bot.logger.info(f"💾 Tentative sauvegarde: {job.get('titre', 'N/A')}")
                                 saved_job = await bot.db_manager.save_offre(job)
+                                stored_jobs.append(job)
                                 if saved_job:
+                                    latency_metrics.record_stored(saved_job, scraper.provides_publication_time)
                                     total_jobs += 1
                                     bot.logger.info(f"✅ Nouvelle offre sauvegardée: {saved_job.titre}")
                                     await bot._notify_new_job(saved_job, metier_dict)
                                 else:
                                     bot.logger.info(f"⚠️ Offre déjà existante ou erreur")
+                            scraper.record_stored(stored_jobs)
 
                             await asyncio.sleep(2)
 
@@ -0,0 +1,114 @@
+"""
+Planificateur des digests de notifications (horaires et quotidiens)
+"""
+
+import logging
+from typing import Dict, List, Tuple
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from database.manager import DatabaseManager
+from config.settings import Settings
+from .webhook import WebhookNotifier
+
+WINDOW_LABELS = {
+    'hourly': 'horaire',
+    'daily': 'quotidien'
+}
+
+class DigestScheduler:
+    """Regroupe les entrées de l'outbox en un message par destinataire et par fenêtre"""
+
+    def __init__(self, settings: Settings, db_manager: DatabaseManager, webhook_notifier: WebhookNotifier):
+        self.settings = settings
+        self.db_manager = db_manager
+        self.webhook_notifier = webhook_notifier
+        self.logger = logging.getLogger(__name__)
+
+    def window_boundary(self, mode: str, now: datetime) -> datetime:
+        """
+        Retourne la fin de la dernière fenêtre close pour un mode
+
+        Les fenêtres sont alignées sur l'horloge (début d'heure, heure du digest
+        quotidien) : une entrée créée avant cette borne est prête à partir.
+        """
+        if mode == 'hourly':
+            return now.replace(minute=0, second=0, microsecond=0)
+
+        if mode == 'daily':
+            boundary = now.replace(
+                hour=self.settings.notifications.daily_digest_hour,
+                minute=0, second=0, microsecond=0
+            )
+            if now < boundary:
+                boundary -= timedelta(days=1)
+            return boundary
+
+        # Utilisateur repassé en 'instant' entre-temps: on vide tout de suite
+        return now
+
+    def _recipient_key(self, user) -> Tuple[str, str]:
+        """Identifie le destinataire d'un digest (rôle partagé ou utilisateur)"""
+        if user.notification_role:
+            return ('role', user.notification_role)
+        return ('user', user.discord_id)
+
+    def _mention(self, recipient: Tuple[str, str]) -> str:
+        """Construit la mention Discord d'un destinataire"""
+        kind, value = recipient
+        if kind == 'role':
+            return f"<@&{value}>" if value.isdigit() else f"@{value}"
+        return f"<@{value}>"
+
+    async def run_once(self, now: datetime = None) -> int:
+        """
+        Envoie les digests dont la fenêtre est close
+
+        Returns:
+            Nombre de messages webhook envoyés
+        """
+        now = now or datetime.utcnow()
+        entries = await self.db_manager.get_pending_outbox_entries()
+        if not entries:
+            return 0
+
+        # (mode, destinataire) -> entrées à envoyer
+        groups: Dict[Tuple[str, Tuple[str, str]], List] = defaultdict(list)
+        for entry in entries:
+            mode = entry.user.notification_mode or 'instant'
+            if entry.created_at >= self.window_boundary(mode, now):
+                continue
+            groups[(mode, self._recipient_key(entry.user))].append(entry)
+
+        messages_sent = 0
+
+        for (mode, recipient), group_entries in groups.items():
+            # Une même offre peut concerner plusieurs membres d'un rôle
+            offres = {}
+            for entry in group_entries:
+                offres.setdefault(entry.offre_id, entry.offre)
+
+            success = await self.webhook_notifier.send_digest_notification(
+                self._mention(recipient),
+                list(offres.values()),
+                WINDOW_LABELS.get(mode, 'instantané'),
+                self.settings.notifications.digest_max_offres
+            )
+
+            if not success:
+                continue
+
+            await self.db_manager.mark_outbox_entries_sent([entry.id for entry in group_entries])
+            for entry in group_entries:
+                await self.db_manager.save_notification(
+                    user_id=entry.user_id,
+                    offre_id=entry.offre_id,
+                    webhook_url=self.settings.discord.webhook_url
+                )
+
+            messages_sent += 1
+            self.logger.info(
+                f"📬 Digest {mode} envoyé à {recipient[1]}: {len(offres)} offres"
+            )
+
+        return messages_sent
@@ -0,0 +1,183 @@
+"""
+Distribution des notifications d'offres selon les préférences des utilisateurs
+"""
+
+import logging
+import time
+from typing import Dict, Iterator, List, Tuple
+from datetime import datetime
+import discord
+
+from database.manager import DatabaseManager
+from config.settings import Settings
+from geo import geocode, UserSpatialIndex
+from .webhook import WebhookNotifier
+
+# Modes de notification disponibles (stockés dans User.notification_mode)
+NOTIFICATION_MODES = ('instant', 'hourly', 'daily')
+
+# Durée de vie de l'index spatial des abonnés d'un métier (secondes)
+USER_INDEX_TTL = 60
+
+class NotificationDispatcher:
+    """Envoie les offres immédiatement ou les met en attente pour les digests"""
+
+    def __init__(self, settings: Settings, db_manager: DatabaseManager, webhook_notifier: WebhookNotifier):
+        self.settings = settings
+        self.db_manager = db_manager
+        self.webhook_notifier = webhook_notifier
+        self.logger = logging.getLogger(__name__)
+
+        # metier_id -> (date de construction, index spatial des abonnés)
+        self._user_indexes: Dict[int, Tuple[float, UserSpatialIndex]] = {}
+
+    async def dispatch(self, job, metier_nom: str) -> int:
+        """
+        Notifie les utilisateurs abonnés au métier d'une offre
+
+        Les utilisateurs en mode 'instant' reçoivent un message immédiat,
+        les autres sont ajoutés à l'outbox pour leur prochain digest.
+        L'offre est réservée au préalable: si le dispatcher temps réel et le
+        cycle de monitoring la voient tous les deux, un seul la notifie. Elle
+        ne reste marquée notifiée qu'une fois remise: échec webhook ou
+        erreur avant l'envoi libèrent la réservation.
+
+        Returns:
+            Nombre d'utilisateurs notifiés ou mis en attente
+        """
+        if not await self.db_manager.claim_offre_notification(job.id):
+            return 0
+        job.is_notified = True
+
+        delivered = False
+        try:
+            users = await self._get_recipients(job)
+            if not users:
+                return 0
+
+            instant_users = [user for user in users if (user.notification_mode or 'instant') == 'instant']
+            digest_users = [user for user in users if (user.notification_mode or 'instant') != 'instant']
+
+            count = 0
+
+            if instant_users:
+                sent = await self._send_instant(job, metier_nom, instant_users)
+                if not sent:
+                    # Échec webhook: l'offre sera reprise au prochain passage
+                    await self._release(job)
+                    return 0
+                delivered = True
+                count += sent
+
+            if digest_users:
+                await self.db_manager.add_outbox_entries(job.id, [user.id for user in digest_users])
+                count += len(digest_users)
+                self.logger.info(f"  📥 {job.titre} mis en attente pour {len(digest_users)} digests")
+
+            return count
+
+        except Exception:
+            # Rien n'a été remis: ne pas laisser l'offre marquée notifiée
+            if not delivered:
+                await self._release(job)
+            raise
+
+    async def _release(self, job):
+        """Libère la réservation d'une offre non remise"""
+        await self.db_manager.release_offre_notification(job.id)
+        job.is_notified = False
+
+    async def _get_recipients(self, job) -> List:
+        """Abonnés du métier dans le rayon de l'offre (ou sans localisation)"""
+        cached = self._user_indexes.get(job.metier_id)
+        if cached and time.monotonic() - cached[0] < USER_INDEX_TTL:
+            index = cached[1]
+        else:
+            users = await self.db_manager.get_users_for_metier(job.metier_id)
+            index = UserSpatialIndex(self._user_entries(users))
+            self._user_indexes[job.metier_id] = (time.monotonic(), index)
+
+        recipients = index.users_near(job.latitude, job.longitude)
+        if len(recipients) < index.size:
+            self.logger.info(
+                f"  📍 {job.titre}: {len(recipients)}/{index.size} abonnés dans le rayon ({job.lieu})"
+            )
+        return recipients
+
+    def _user_entries(self, users: List) -> Iterator[Tuple]:
+        """Prépare les entrées de l'index spatial (géocode les anciens profils à la volée)"""
+        for user in users:
+            lat, lon = user.latitude, user.longitude
+            if (lat is None or lon is None) and user.preferred_location:
+                lat, lon = geocode(user.preferred_location) or (None, None)
+            yield (user, lat, lon, user.max_distance)
+
+    def _record_delivery(self, job):
+        """Enregistre le délai entre la détection de l'offre et l'envoi Discord"""
+        from utils.latency import latency_metrics
+
+        sent_at = datetime.utcnow()
+        latency_metrics.record_sent(job, sent_at)
+
+        first_seen = job.date_first_seen or job.date_scraped
+        if first_seen:
+            latency = (sent_at - first_seen).total_seconds()
+            self.logger.info(f"  ⏱️ Time-to-Discord {job.source_site}: {latency:.1f}s")
+
+    async def _send_instant(self, job, metier_nom: str, users: List) -> int:
+        """Envoie une notification immédiate pour une offre"""
+        embed = self.create_job_embed(job, metier_nom)
+        success = await self.webhook_notifier.send_job_notification(embed, users)
+
+        if not success:
+            return 0
+
+        self._record_delivery(job)
+
+        # Message déjà remis: une erreur d'historique ne doit pas provoquer de renvoi
+        try:
+            for user in users:
+                await self.db_manager.save_notification(
+                    user_id=user.id,
+                    offre_id=job.id,
+                    webhook_url=self.settings.discord.webhook_url
+                )
+        except Exception as e:
+            self.logger.error(f"Erreur enregistrement des notifications de l'offre {job.id}: {e}")
+
+        self.logger.info(f"  📢 Notification envoyée pour {job.titre} à {len(users)} utilisateurs")
+        return len(users)
+
+    def create_job_embed(self, job, metier_nom: str) -> discord.Embed:
+        """Crée un embed Discord pour une offre d'emploi"""
+        embed = discord.Embed(
+            title=f"🎯 Nouvelle offre d'alternance - {metier_nom}",
+            description=job.titre,
+            color=discord.Color.green(),
+            timestamp=datetime.now(),
+            url=job.url
+        )
+
+        # Champs de l'offre
+        if job.entreprise:
+            embed.add_field(name="🏢 Entreprise", value=job.entreprise, inline=True)
+
+        if job.lieu:
+            embed.add_field(name="📍 Lieu", value=job.lieu, inline=True)
+
+        if job.salaire:
+            embed.add_field(name="💰 Salaire", value=job.salaire, inline=True)
+
+        # Description (limitée)
+        if job.description:
+            desc_short = job.description[:200] + "..." if len(job.description) > 200 else job.description
+            embed.add_field(name="📝 Description", value=desc_short, inline=False)
+
+        # Source et lien
+        embed.add_field(name="🌐 Source", value=job.source_site.capitalize(), inline=True)
+        embed.add_field(name="🔗 Postuler", value=f"[Voir l'offre]({job.url})", inline=True)
+
+        # Footer
+        embed.set_footer(text=f"Bot Alternance • {job.source_site}")
+
+        return embed
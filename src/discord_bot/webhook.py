@@ -76,6 +76,68 @@ class WebhookNotifier:
 
         return content
 
+    async def send_digest_notification(self, mention: str, offres: List, window_label: str, max_offres: int = 25) -> bool:
+        """
+        Envoie un digest regroupant plusieurs offres en un seul message
+
+        Args:
+            mention: Mention Discord du destinataire (utilisateur ou rôle)
+            offres: Liste des offres (OffreEmploi) à inclure
+            window_label: Libellé de la fenêtre ("horaire", "quotidien")
+            max_offres: Nombre maximum d'offres détaillées dans l'embed
+
+        Returns:
+            bool: True si envoyé avec succès
+        """
+        if not self.webhook_url:
+            self.logger.error("URL webhook non configurée")
+            return False
+
+        try:
+            lines = []
+            for offre in offres[:max_offres]:
+                line = f"• [{offre.titre}]({offre.url})"
+                details = " - ".join(filter(None, [offre.entreprise, offre.lieu]))
+                if details:
+                    line += f" — {details}"
+                lines.append(line)
+
+            description = "\n".join(lines)
+            # Limite Discord: 4096 caractères pour la description d'un embed
+            if len(description) > 4000:
+                description = description[:4000].rsplit("\n", 1)[0]
+
+            embed = discord.Embed(
+                title=f"📬 Digest {window_label} - {len(offres)} nouvelle(s) offre(s)",
+                description=description,
+                color=discord.Color.green(),
+                timestamp=discord.utils.utcnow()
+            )
+
+            if len(offres) > max_offres:
+                embed.set_footer(text=f"... et {len(offres) - max_offres} autres offres • Bot Alternance")
+            else:
+                embed.set_footer(text="Bot Alternance")
+
+            payload = {
+                "content": f"📬 **Votre digest d'alternances** {mention}",
+                "embeds": [embed.to_dict()],
+                "username": "Bot Alternance"
+            }
+
+            async with aiohttp.ClientSession() as session:
+                async with session.post(self.webhook_url, json=payload) as response:
+                    if response.status in [200, 204]:
+                        return True
+
+                    error_text = await response.text()
+                    self.logger.error(f"Erreur webhook digest {response.status}: {error_text}")
+                    return False
+
+        except Exception as e:
+            self.logger.error(f"Erreur envoi digest: {e}")
+            return False
+
     async def send_system_notification(self, title: str, message: str, color: discord.Color = discord.Color.blue()) -> bool:
         """
         Envoie une notification système
@@ -177,6 +239,15 @@ class WebhookNotifier:
                     inline=True
                 )
 
+            # Fraîcheur des alertes
+            latency_lines = summary.get('latency_lines', [])
+            if latency_lines:
+                embed.add_field(
+                    name="⏱️ Latences",
+                    value="\n".join(latency_lines)[:1024],
+                    inline=False
+                )
+
             # Durée du monitoring
             duration = summary.get('duration_minutes', 0)
             embed.add_field(
@@ -0,0 +1,15 @@
+"""
+Module de géolocalisation (référentiel hors ligne et index spatial)
+"""
+
+from .gazetteer import Gazetteer, get_gazetteer, geocode, normalize_place
+from .spatial import UserSpatialIndex, haversine_km
+
+__all__ = [
+    'Gazetteer',
+    'get_gazetteer',
+    'geocode',
+    'normalize_place',
+    'UserSpatialIndex',
+    'haversine_km'
+]
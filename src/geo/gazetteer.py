@@ -0,0 +1,162 @@
+"""
+Géocodage hors ligne à partir d'un référentiel de communes et départements français
+"""
+
+import csv
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+# Le fichier embarqué ne contient que les principales communes (les autres lieux
+# restent non localisés). Le référentiel complet se génère avec
+# scripts/build_communes.py, éventuellement hors du dépôt via cette variable
+COMMUNES_FILE = os.getenv('GAZETTEER_COMMUNES_FILE', os.path.join(DATA_DIR, 'communes_fr.csv'))
+DEPARTEMENTS_FILE = os.path.join(DATA_DIR, 'departements_fr.csv')
+
+# Nombre de lieux distincts gardés en cache
+GEOCODE_CACHE_SIZE = 4096
+
+Coordinates = Tuple[float, float]
+
+# Préfixes fréquents dans les lieux des offres ("Télétravail à Paris (75)")
+LOCATION_PREFIXES = ('teletravail partiel a ', 'teletravail a ', 'teletravail ', 'hybride a ', 'a ')
+
+def normalize_place(text: str) -> str:
+    """Normalise un nom de lieu (minuscules, sans accents ni ponctuation)"""
+    if not text:
+        return ""
+
+    text = text.lower().replace('œ', 'oe').replace('æ', 'ae')
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9]+", ' ', text).strip()
+
+    # Abréviations courantes
+    text = re.sub(r'\bste\b', 'sainte', text)
+    text = re.sub(r'\bst\b', 'saint', text)
+    return text
+
+def departement_from_postcode(postcode: str) -> str:
+    """Déduit le code département d'un code postal"""
+    if postcode.startswith('97'):
+        return postcode[:3]
+    if postcode.startswith('20'):
+        # Corse: 200xx/201xx -> Corse-du-Sud, 202xx/206xx -> Haute-Corse
+        return '2A' if postcode[2] in '01' else '2B'
+    return postcode[:2]
+
+class Gazetteer:
+    """Référentiel communes/départements chargé en mémoire depuis les CSV embarqués"""
+
+    def __init__(self, communes_file: str = COMMUNES_FILE, departements_file: str = DEPARTEMENTS_FILE):
+        # nom normalisé -> [(code département, coordonnées)], dans l'ordre du fichier
+        self.communes: Dict[str, List[Tuple[str, Coordinates]]] = {}
+        self.postcodes: Dict[str, Coordinates] = {}
+        self.departements: Dict[str, Coordinates] = {}
+        self.departement_names: Dict[str, str] = {}
+
+        self._load_departements(departements_file)
+        self._load_communes(communes_file)
+
+    def _load_departements(self, path: str):
+        """Charge les départements (coordonnées de la préfecture, pour information)"""
+        with open(path, encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                coords = (float(row['latitude']), float(row['longitude']))
+                self.departements[row['code']] = coords
+                self.departement_names[normalize_place(row['nom'])] = row['code']
+
+    def _load_communes(self, path: str):
+        """Charge les communes"""
+        with open(path, encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                coords = (float(row['latitude']), float(row['longitude']))
+                key = normalize_place(row['nom'])
+                self.communes.setdefault(key, []).append((row['departement'], coords))
+                self.postcodes.setdefault(row['code_postal'], coords)
+
+    def lookup_commune(self, name: str, departement: str = None) -> Optional[Coordinates]:
+        """Cherche une commune par nom normalisé (départage les homonymes par département)"""
+        entries = self.communes.get(name)
+        if not entries:
+            return None
+
+        if departement:
+            for code, coords in entries:
+                if code == departement:
+                    return coords
+        return entries[0][1]
+
+    def geocode(self, location: str) -> Optional[Coordinates]:
+        """
+        Géocode un lieu d'offre ou d'utilisateur
+
+        Comprend les formats courants: "Paris (75)", "75009 Paris", "Lyon 3e",
+        "Télétravail à Nantes (44)". Seule une commune ou un code postal du
+        référentiel donne des coordonnées: un lieu reconnu au seul niveau du
+        département (commune absente, "Hauts-de-Seine") est traité comme non
+        localisé plutôt que placé à la préfecture, tout comme les lieux trop
+        vagues (région, "France").
+
+        Returns:
+            (latitude, longitude) ou None
+        """
+        if not location:
+            return None
+
+        departement = None
+
+        # Code postal explicite
+        postcode_match = re.search(r'\b(\d{5})\b', location)
+        if postcode_match:
+            postcode = postcode_match.group(1)
+            if postcode in self.postcodes:
+                return self.postcodes[postcode]
+            departement = departement_from_postcode(postcode)
+
+        # Département entre parenthèses: "Paris (75)", "Ajaccio (2A)"
+        departement_match = re.search(r'\((\d{2,3}|2[abAB])\)', location)
+        if departement_match:
+            departement = departement_match.group(1).upper()
+
+        # Nom de la commune sans parenthèses, codes ni arrondissement ("Lyon 3e")
+        text = re.sub(r'\([^)]*\)', ' ', location)
+        text = re.sub(r'\b\d{1,2}\s*(?:e|er|eme|ème)\b', ' ', text, flags=re.IGNORECASE)
+        text = re.sub(r'\d+', ' ', text)
+        name = normalize_place(text)
+
+        for prefix in LOCATION_PREFIXES:
+            if name.startswith(prefix):
+                name = name[len(prefix):]
+                break
+
+        if name:
+            coords = self.lookup_commune(name, departement)
+            if coords:
+                return coords
+
+            # "Paris La Défense", "Marseille Euromed": essayer les préfixes du nom
+            words = name.split()
+            for end in range(len(words) - 1, 0, -1):
+                coords = self.lookup_commune(' '.join(words[:end]), departement)
+                if coords:
+                    return coords
+
+        return None
+
+_gazetteer: Optional[Gazetteer] = None
+
+def get_gazetteer() -> Gazetteer:
+    """Retourne le référentiel partagé (chargé au premier appel)"""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer()
+    return _gazetteer
+
+@lru_cache(maxsize=GEOCODE_CACHE_SIZE)
+def geocode(location: str) -> Optional[Coordinates]:
+    """Géocode un lieu avec le référentiel partagé (résultat mis en cache LRU)"""
+    return get_gazetteer().geocode(location)
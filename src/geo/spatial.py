@@ -0,0 +1,85 @@
+"""
+Index spatial en grille pour sélectionner les abonnés proches d'une offre
+"""
+
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance orthodromique entre deux points (km)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+class UserSpatialIndex:
+    """
+    Grille régulière (cellules en degrés) des utilisateurs géolocalisés
+
+    Chaque utilisateur a son propre rayon (max_distance). Une requête ne
+    parcourt que les cellules couvrant le plus grand rayon indexé, puis
+    vérifie la distance exacte. Les utilisateurs sans position reçoivent
+    toutes les offres.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[object, Optional[float], Optional[float], Optional[int]]],
+                 cell_size_deg: float = 0.5, default_radius_km: int = 50):
+        """
+        Args:
+            entries: (utilisateur, latitude, longitude, rayon_km) ; latitude None = non localisé
+            cell_size_deg: Taille des cellules de la grille en degrés
+            default_radius_km: Rayon utilisé quand l'utilisateur n'en a pas
+        """
+        self.cell_size = cell_size_deg
+        self.cells: Dict[Tuple[int, int], List[Tuple[float, float, float, object]]] = defaultdict(list)
+        self.unlocated: List = []
+        self.max_radius_km = 0.0
+        self.size = 0
+
+        for user, lat, lon, radius in entries:
+            self.size += 1
+            if lat is None or lon is None:
+                self.unlocated.append(user)
+                continue
+
+            radius = float(radius or default_radius_km)
+            self.max_radius_km = max(self.max_radius_km, radius)
+            self.cells[self._cell(lat, lon)].append((lat, lon, radius, user))
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        """Cellule de la grille contenant un point"""
+        return (math.floor(lat / self.cell_size), math.floor(lon / self.cell_size))
+
+    def users_near(self, lat: Optional[float], lon: Optional[float]) -> List:
+        """
+        Utilisateurs à qui notifier une offre située en (lat, lon)
+
+        Returns:
+            Utilisateurs dans leur rayon + utilisateurs non localisés.
+            Tous les utilisateurs si l'offre n'est pas localisée.
+        """
+        if lat is None or lon is None:
+            return self.unlocated + [entry[3] for cell in self.cells.values() for entry in cell]
+
+        users = list(self.unlocated)
+        if not self.cells:
+            return users
+
+        # Cellules couvrant le plus grand rayon autour de l'offre
+        dlat = self.max_radius_km / KM_PER_DEGREE_LAT
+        dlon = self.max_radius_km / (KM_PER_DEGREE_LAT * max(0.01, math.cos(math.radians(lat))))
+        min_i, min_j = self._cell(lat - dlat, lon - dlon)
+        max_i, max_j = self._cell(lat + dlat, lon + dlon)
+
+        for i in range(min_i, max_i + 1):
+            for j in range(min_j, max_j + 1):
+                for user_lat, user_lon, radius, user in self.cells.get((i, j), ()):
+                    if haversine_km(lat, lon, user_lat, user_lon) <= radius:
+                        users.append(user)
+
+        return users
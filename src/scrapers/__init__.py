@@ -3,6 +3,7 @@ Module des scrapers pour différents sites d'emploi
 """
 
 from .base import BaseScraper
+from .job_record import JobRecord
 from .indeed_scraper import IndeedScraper
 from .welcometothejungle_scraper import WelcomeToTheJungleScraper
 from .labonnealternance_scraper import LaBonneAlternanceScraper
@@ -11,11 +12,13 @@ from .francetravail_scraper import FranceTravailScraper
 from .indeed_selenium_scraper import IndeedSeleniumScraper
 from .indeed_cloudscraper import IndeedCloudScraper
 from .indeed_vps_scraper import IndeedVPSScraper
+from .indeed_router import IndeedRouterScraper
 # from .indeed_curlcffi_scraper import IndeedCurlCffiScraper  # Incompatible Python 3.13
 
 # Mapping des noms de sites vers leurs classes de scraper
 SCRAPERS = {
-    'indeed': IndeedScraper,
+    'indeed': IndeedRouterScraper,  # Source logique: choisit parmi les stratégies indeed_*
+    'indeed_http': IndeedScraper,
     'indeed_selenium': IndeedSeleniumScraper,
     'indeed_cloudscraper': IndeedCloudScraper,
     'indeed_vps': IndeedVPSScraper,
@@ -48,7 +51,9 @@ def get_scraper(site_name: str, config: dict) -> BaseScraper:
 
 __all__ = [
     'BaseScraper',
+    'JobRecord',
     'IndeedScraper',
+    'IndeedRouterScraper',
     'WelcomeToTheJungleScraper',
     'LaBonneAlternanceScraper',
     'TestScraper',
@@ -5,22 +5,74 @@ Scraper de base et utilitaires communs
 import asyncio
 import aiohttp
 import logging
+import os
 import random
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 
+from geo import geocode
+
+from .job_record import JobRecord
+
+# Dossier des états persistés entre deux cycles (identifiants vus, statistiques...)
+DATA_DIR = os.getenv('SCRAPER_DATA_DIR', 'data')
+
+# Pagination: pages demandées en avance et espacement minimal des requêtes vers un même hôte
+DEFAULT_PREFETCH_PAGES = 2
+DEFAULT_REQUEST_INTERVAL = 1.0
+
+# Repère de pagination: identifiants de la première page du cycle précédent.
+# La page est "franchie" quand elle en contient au moins 2 (une offre sponsorisée
+# répétée sur toutes les pages ne suffit pas à arrêter la pagination)
+WATERMARK_IDS = 10
+WATERMARK_MIN_HITS = 2
+
+class HostRateLimiter:
+    """Espacement minimal entre deux requêtes vers un même hôte, partagé par tous les scrapers"""
+
+    def __init__(self):
+        self._next_slot: Dict[str, float] = {}
+
+    async def wait(self, host: str, interval: float):
+        """Attend le prochain créneau libre de l'hôte"""
+        now = time.monotonic()
+        # Le créneau est réservé avant d'attendre: les appels concurrents s'échelonnent
+        slot = max(now, self._next_slot.get(host, 0.0))
+        self._next_slot[host] = slot + interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+host_rate_limiter = HostRateLimiter()
+
 class BaseScraper(ABC):
     """Classe de base pour tous les scrapers"""
 
+    # True si le site fournit une vraie date de publication
+    # (sinon date_publication vaut l'heure du scraping)
+    provides_publication_time = False
+
     def __init__(self, config: Dict):
         self.config = config
         self.session = None
         self.logger = logging.getLogger(self.__class__.__name__)
         self.base_url = config.get('base_url', '')
 
+        # Passe à True quand le site refuse l'accès (HTTP 403): permet de basculer de stratégie
+        self.blocked = False
+
+        # Passe à True sur une erreur de transport ou une réponse en erreur (source injoignable)
+        self.failed = False
+
+        # Cookies (challenge anti-bot, session) conservés entre les cycles et les redémarrages
+        self.persist_cookies = config.get('persist_cookies', True)
+        self._cookie_store = None
+
+        # Pages non demandées grâce aux repères de pagination, pour le rapport de fin de cycle
+        self.pages_avoided = 0
+
         # Headers plus réalistes pour imiter un vrai navigateur
         self.headers = {
             'User-Agent': config.get('user_agent',
@@ -45,20 +97,78 @@ class BaseScraper(ABC):
         self.session = aiohttp.ClientSession(
             headers=self.headers,
             connector=connector,
-            timeout=timeout
+            timeout=timeout,
+            cookie_jar=aiohttp.CookieJar()
         )
+        if self.persist_cookies:
+            self._restore_cookies()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Ferme la session HTTP"""
+        if self.pages_avoided:
+            self.logger.info(f"📉 {self.pages_avoided} page(s) évitée(s) ce cycle grâce aux offres déjà connues")
+
         if self.session:
+            if self.persist_cookies:
+                self._persist_cookies()
             await self.session.close()
 
-    @abstractmethod
+    @property
+    def cookie_store(self):
+        """Store de cookies du site (partagé entre les instances successives)"""
+        if self._cookie_store is None:
+            from .cookie_store import get_cookie_store
+            self._cookie_store = get_cookie_store(getattr(self, 'site_name', self.__class__.__name__))
+        return self._cookie_store
+
+    def _restore_cookies(self):
+        """Recharge les cookies enregistrés dans la session HTTP"""
+        restored = self.cookie_store.load_into_jar(self.session.cookie_jar)
+        if restored:
+            self.logger.debug(f"🍪 {restored} cookies restaurés")
+
+    def _persist_cookies(self):
+        """Enregistre les cookies de la session HTTP"""
+        self.cookie_store.save_from_jar(self.session.cookie_jar)
+        self._log_cookie_stats()
+
+    def _log_cookie_stats(self):
+        """Journalise les allers-retours évités grâce aux cookies conservés"""
+        avoided = self.cookie_store.avoided_round_trips()
+        if avoided:
+            self.logger.info(f"🍪 {len(self.cookie_store.cookies)} cookies conservés, "
+                             f"~{avoided} redirections/challenges évités au total")
+
+    def _record_round_trips(self, response):
+        """Compte les redirections et challenges (403) traversés par une requête"""
+        if self.persist_cookies:
+            self.cookie_store.record_response(len(response.history) + int(response.status == 403))
+
+    async def iter_jobs(self, metier: Dict, location: str = None) -> AsyncIterator[Dict]:
+        """
+        Produit les offres d'un métier au fil du parsing (page par page)
+
+        Les scrapers implémentent iter_jobs, ou search_jobs pour les plus
+        anciens: cette version par défaut produit alors le résultat de
+        search_jobs d'un bloc.
+
+        Args:
+            metier: Dictionnaire contenant les infos du métier (nom, keywords, etc.)
+            location: Localisation de recherche (optionnel)
+        """
+        if type(self).search_jobs is BaseScraper.search_jobs:
+            raise NotImplementedError(f"{self.__class__.__name__} doit implémenter iter_jobs ou search_jobs")
+
+        for job in await self.search_jobs(metier, location):
+            yield job
+
     async def search_jobs(self, metier: Dict, location: str = None) -> List[Dict]:
         """
         Recherche des offres d'emploi pour un métier donné
 
+        Compatibilité: toutes les offres de iter_jobs, une fois la recherche terminée.
+
         Args:
             metier: Dictionnaire contenant les infos du métier (nom, keywords, etc.)
             location: Localisation de recherche (optionnel)
@@ -66,6 +176,23 @@ class BaseScraper(ABC):
         Returns:
             Liste des offres trouvées
         """
+        return [job async for job in self.iter_jobs(metier, location)]
+
+    async def prefetch(self, metiers: List[Dict], location: str = None):
+        """
+        Appelé une fois par cycle avec tous les métiers, avant les search_jobs
+
+        Permet aux sites qui le supportent de grouper les requêtes de plusieurs
+        métiers; search_jobs sert ensuite les résultats préchargés.
+        """
+        pass
+
+    def record_new_offers(self, offres: List):
+        """Appelé avec les offres réellement nouvelles (stockées) issues de ce scraper"""
+        pass
+
+    def record_stored(self, jobs: List[Dict]):
+        """Appelé avec les offres produites par ce scraper qui sont en base (nouvelles ou déjà connues)"""
         pass
 
     @abstractmethod
@@ -87,6 +214,7 @@ class BaseScraper(ABC):
                     await asyncio.sleep(random.uniform(2, 5))
 
                 async with self.session.get(url, params=params, allow_redirects=True) as response:
+                    self._record_round_trips(response)
                     if response.status == 200:
                         return await response.text()
                     elif response.status == 403 and attempt < retry - 1:
@@ -94,6 +222,9 @@ class BaseScraper(ABC):
                         await asyncio.sleep(random.uniform(3, 6))  # Attendre plus longtemps avant retry
                         continue
                     else:
+                        if response.status == 403:
+                            self.blocked = True
+                        self.failed = True
                         self.logger.warning(f"HTTP {response.status} pour {url}")
                         return None
             except Exception as e:
@@ -101,6 +232,7 @@ class BaseScraper(ABC):
                     self.logger.warning(f"Erreur fetch {url} (tentative {attempt + 1}/{retry}): {e}")
                     await asyncio.sleep(random.uniform(2, 4))
                 else:
+                    self.failed = True
                     self.logger.error(f"Erreur finale fetch {url}: {e}")
                     return None
         return None
@@ -109,15 +241,124 @@ class BaseScraper(ABC):
         """Récupère des données JSON depuis une API"""
         try:
             async with self.session.get(url, params=params) as response:
+                self._record_round_trips(response)
                 if response.status == 200:
                     return await response.json()
                 else:
+                    if response.status == 403:
+                        self.blocked = True
+                    self.failed = True
                     self.logger.warning(f"HTTP {response.status} pour {url}")
                     return None
         except Exception as e:
+            self.failed = True
             self.logger.error(f"Erreur lors du fetch JSON {url}: {e}")
             return None
 
+    @staticmethod
+    def query_key(keyword: str, location: str) -> str:
+        """Clé normalisée d'une requête (mot-clé, localisation)"""
+        return f"{' '.join((keyword or '').lower().split())}|{' '.join((location or '').lower().split())}"
+
+    async def paginate(self, fetch: Callable[[int], Awaitable[Optional[List[Dict]]]], max_pages: int,
+                       page_size: int, label: str = '', query: tuple = None) -> AsyncIterator[List[Dict]]:
+        """
+        Récupère jusqu'à max_pages pages de résultats en préchargeant les suivantes
+
+        Jusqu'à prefetch_pages pages sont demandées en avance, espacées par le
+        limiteur par hôte (min_request_interval). Les pages sont traitées dans
+        l'ordre; dès qu'une page est courte, en erreur ou ne contient que des
+        offres déjà vues, les pages encore en vol sont annulées.
+
+        Pour les résultats triés par date, query active le repère persisté de
+        la requête: une page qui atteint les offres les plus récentes du cycle
+        précédent est la dernière utile.
+
+        Args:
+            fetch: récupère et parse une page (numéro à partir de 0), None si erreur
+            page_size: nombre d'offres d'une page pleine
+            label: libellé de la recherche pour le rapport de durée
+            query: (mot-clé, localisation) pour le repère de pagination
+
+        Yields:
+            Offres nouvelles de chaque page (sans doublon d'identité), dès qu'elle est parsée
+        """
+        watermark = set()
+        if query:
+            from .watermarks import get_watermark_store
+            watermarks = get_watermark_store(self.site_name)
+            watermark_key = self.query_key(*query)
+            watermark = set(watermarks.get(watermark_key).get('newest_ids', []))
+        newest_ids = None
+        avoided = 0
+
+        start = time.monotonic()
+        host = urlparse(self.base_url).netloc
+        lookahead = max(0, self.config.get('prefetch_pages', DEFAULT_PREFETCH_PAGES))
+        interval = self.config.get('min_request_interval', DEFAULT_REQUEST_INTERVAL)
+
+        async def fetch_throttled(page: int) -> Optional[List[Dict]]:
+            await host_rate_limiter.wait(host, interval)
+            return await fetch(page)
+
+        tasks: Dict[int, asyncio.Task] = {}
+
+        def schedule(page: int):
+            if page < max_pages and page not in tasks:
+                tasks[page] = asyncio.create_task(fetch_throttled(page))
+
+        jobs_count = 0
+        seen_keys = set()
+        pages_used = 0
+
+        try:
+            for page in range(lookahead + 1):
+                schedule(page)
+
+            for page in range(max_pages):
+                page_jobs = await tasks.pop(page)
+                pages_used += 1
+                if page_jobs is None:
+                    break
+
+                page_ids = [job['external_id'] for job in page_jobs if job.get('external_id')]
+                if page == 0:
+                    newest_ids = page_ids[:WATERMARK_IDS]
+
+                new_jobs = [job for job in page_jobs if job['identity_key'] not in seen_keys]
+                seen_keys.update(job['identity_key'] for job in new_jobs)
+                jobs_count += len(new_jobs)
+                if new_jobs:
+                    yield new_jobs
+
+                # Page courte (dernière page) ou déjà vue: inutile d'aller plus loin
+                if len(page_jobs) < page_size or not new_jobs:
+                    break
+
+                # Repère franchi: les pages suivantes ne contiennent que des offres plus anciennes
+                if watermark and len(watermark.intersection(page_ids)) >= min(WATERMARK_MIN_HITS, len(watermark)):
+                    avoided = max_pages - pages_used
+                    break
+
+                schedule(page + lookahead + 1)
+        finally:
+            cancelled = len(tasks)
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        if query and newest_ids:
+            watermarks.update(watermark_key, newest_ids=newest_ids)
+            watermarks.save()
+        self.pages_avoided += avoided
+
+        self.logger.info(
+            f"⏱️ {label or self.base_url}: {jobs_count} offres sur {pages_used} page(s) "
+            f"en {time.monotonic() - start:.1f}s"
+            + (f", {cancelled} page(s) préchargée(s) annulée(s)" if cancelled else "")
+            + (f", {avoided} page(s) évitée(s) (repère atteint)" if avoided else "")
+        )
+
     def get_soup(self, html: str) -> BeautifulSoup:
         """Crée un objet BeautifulSoup depuis du HTML"""
         return BeautifulSoup(html, 'html.parser')
@@ -159,20 +400,31 @@ class BaseScraper(ABC):
         text_to_check = f"{title} {description}".lower()
         return any(keyword in text_to_check for keyword in alternance_keywords)
 
-    def build_job_dict(self, **kwargs) -> Dict:
-        """Construit un dictionnaire d'offre standardisé"""
-        return {
-            'titre': kwargs.get('titre', ''),
-            'entreprise': kwargs.get('entreprise', ''),
-            'description': kwargs.get('description', ''),
-            'lieu': kwargs.get('lieu', ''),
-            'salaire': kwargs.get('salaire'),
-            'url': kwargs.get('url', ''),
-            'source_site': kwargs.get('source_site', ''),
-            'external_id': kwargs.get('external_id'),
-            'date_publication': kwargs.get('date_publication', datetime.now()),
-            'metier_id': kwargs.get('metier_id')
-        }
+    def build_job_dict(self, **kwargs) -> JobRecord:
+        """Construit une offre standardisée (JobRecord, lisible comme un dictionnaire)"""
+        # Coordonnées fournies par l'API source, sinon géocodage hors ligne du lieu
+        # (None si trop vague: région, "France"...)
+        try:
+            coords = (float(kwargs['latitude']), float(kwargs['longitude']))
+        except (KeyError, TypeError, ValueError):
+            coords = geocode(kwargs.get('lieu', ''))
+        latitude, longitude = coords or (None, None)
+
+        return JobRecord(
+            titre=kwargs.get('titre', ''),
+            entreprise=kwargs.get('entreprise', ''),
+            description=kwargs.get('description', ''),
+            lieu=kwargs.get('lieu', ''),
+            latitude=latitude,
+            longitude=longitude,
+            salaire=kwargs.get('salaire'),
+            url=kwargs.get('url', ''),
+            source_site=kwargs.get('source_site', ''),
+            external_id=kwargs.get('external_id'),
+            date_publication=kwargs.get('date_publication'),
+            date_first_seen=kwargs.get('date_first_seen'),
+            metier_id=kwargs.get('metier_id')
+        )
 
     def get_absolute_url(self, relative_url: str) -> str:
         """Convertit une URL relative en URL absolue"""
@@ -0,0 +1,172 @@
+"""
+Cookies persistés par site (cookies de challenge anti-bot, session), réutilisés entre les cycles
+"""
+
+import json
+import logging
+import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.cookies import Morsel
+from typing import Dict, List, Optional
+
+from yarl import URL
+
+from .base import DATA_DIR
+
+# Durée de conservation des cookies de session (sans date d'expiration)
+SESSION_COOKIE_TTL = 6 * 3600
+
+class CookieStore:
+    """
+    Cookies d'un site persistés en JSON, avec gestion de l'expiration
+
+    Compte aussi les redirections/challenges par requête, avec et sans
+    cookies restaurés, pour estimer les allers-retours évités.
+    """
+
+    def __init__(self, site: str, directory: str = DATA_DIR, session_ttl: int = SESSION_COOKIE_TTL):
+        self.path = os.path.join(directory, f"cookies_{site}.json")
+        self.session_ttl = session_ttl
+        self.logger = logging.getLogger(__name__)
+
+        self.cookies: List[Dict] = []
+        self.user_agent: Optional[str] = None  # Les cookies de clearance sont liés au user agent
+        self.stats = {'fresh_requests': 0, 'fresh_hops': 0, 'reused_requests': 0, 'reused_hops': 0}
+        self.reused = False  # Cookies restaurés pour la session en cours
+
+        self._load()
+
+    def _load(self):
+        """Charge le fichier s'il existe"""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                data = json.load(file)
+            self.cookies = data.get('cookies', [])
+            self.user_agent = data.get('user_agent')
+            self.stats.update(data.get('stats', {}))
+        except Exception as e:
+            self.logger.warning(f"Impossible de charger {self.path}: {e}")
+
+    def save(self):
+        """Écrit le fichier (écriture atomique)"""
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump({'cookies': self.valid_cookies(), 'user_agent': self.user_agent,
+                           'stats': self.stats}, file)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"Impossible d'enregistrer {self.path}: {e}")
+
+    def valid_cookies(self) -> List[Dict]:
+        """Cookies non expirés"""
+        now = time.time()
+        return [
+            cookie for cookie in self.cookies
+            if (cookie['expires'] or cookie['saved_at'] + self.session_ttl) > now
+        ]
+
+    def _set_cookies(self, cookies: List[Dict]):
+        """Remplace les cookies conservés"""
+        if not cookies and not self.cookies:
+            return  # Site sans cookies: pas de fichier inutile
+        self.cookies = cookies
+        self.save()
+
+    # --- Sessions aiohttp -------------------------------------------------
+
+    def load_into_jar(self, jar) -> int:
+        """Restaure les cookies dans un aiohttp.CookieJar"""
+        cookies = self.valid_cookies()
+        for cookie in cookies:
+            morsel = Morsel()
+            morsel.set(cookie['name'], cookie['value'], cookie['value'])
+            morsel['domain'] = cookie['domain']
+            morsel['path'] = cookie['path'] or '/'
+            if cookie['expires']:
+                morsel['expires'] = formatdate(cookie['expires'], usegmt=True)
+            if cookie['secure']:
+                morsel['secure'] = True
+            jar.update_cookies({cookie['name']: morsel},
+                               response_url=URL(f"https://{cookie['domain'].lstrip('.')}/"))
+
+        self.reused = bool(cookies)
+        return len(cookies)
+
+    def save_from_jar(self, jar):
+        """Enregistre les cookies d'un aiohttp.CookieJar"""
+        now = time.time()
+        cookies = []
+        for morsel in jar:
+            expires = None
+            if morsel['max-age']:
+                expires = now + int(morsel['max-age'])
+            elif morsel['expires']:
+                try:
+                    expires = parsedate_to_datetime(morsel['expires']).timestamp()
+                except (TypeError, ValueError):
+                    expires = None
+
+            cookies.append({
+                'name': morsel.key, 'value': morsel.value, 'domain': morsel['domain'],
+                'path': morsel['path'], 'expires': expires, 'secure': bool(morsel['secure']),
+                'saved_at': now
+            })
+        self._set_cookies(cookies)
+
+    # --- Sessions requests (cloudscraper) ---------------------------------
+
+    def load_into_session(self, session) -> int:
+        """Restaure les cookies (et le user agent associé) dans une session requests"""
+        cookies = self.valid_cookies()
+        for cookie in cookies:
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'],
+                                path=cookie['path'] or '/', expires=cookie['expires'],
+                                secure=cookie['secure'])
+
+        if cookies and self.user_agent:
+            session.headers['User-Agent'] = self.user_agent
+
+        self.reused = bool(cookies)
+        return len(cookies)
+
+    def save_from_session(self, session):
+        """Enregistre les cookies d'une session requests"""
+        now = time.time()
+        cookies = [
+            {'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path,
+             'expires': cookie.expires, 'secure': bool(cookie.secure), 'saved_at': now}
+            for cookie in session.cookies
+        ]
+        self.user_agent = session.headers.get('User-Agent')
+        self._set_cookies(cookies)
+
+    # --- Statistiques ------------------------------------------------------
+
+    def record_response(self, hops: int):
+        """Enregistre le nombre de redirections/challenges traversés par une requête"""
+        prefix = 'reused' if self.reused else 'fresh'
+        self.stats[f'{prefix}_requests'] += 1
+        self.stats[f'{prefix}_hops'] += hops
+
+    def avoided_round_trips(self) -> int:
+        """Allers-retours évités: écart moyen de redirections (sans - avec cookies) × requêtes avec cookies"""
+        if not self.stats['fresh_requests'] or not self.stats['reused_requests']:
+            return 0
+
+        fresh_avg = self.stats['fresh_hops'] / self.stats['fresh_requests']
+        reused_avg = self.stats['reused_hops'] / self.stats['reused_requests']
+        return int(max(0.0, fresh_avg - reused_avg) * self.stats['reused_requests'])
+
+_stores: Dict[str, CookieStore] = {}
+
+def get_cookie_store(site: str) -> CookieStore:
+    """Retourne le store partagé d'un site (les scrapers sont recréés à chaque cycle)"""
+    if site not in _stores:
+        _stores[site] = CookieStore(site)
+    return _stores[site]
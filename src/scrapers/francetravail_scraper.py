@@ -5,13 +5,31 @@ API officielle pour récupérer les offres d'emploi
 
 import json
 import asyncio
-from typing import List, Dict, Optional
+import re
+import time
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from .base import BaseScraper
+from .token_provider import get_token_provider
+from .watermarks import get_watermark_store
+
+API_DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# L'API renvoie au plus 150 offres par requête, et pas au-delà de l'offre n°3149
+RANGE_SIZE = 150
+MAX_RANGE_START = 3000
+
+# Code commune INSEE (le paramètre commune de l'API n'accepte rien d'autre)
+INSEE_CODE_PATTERN = re.compile(r'^(\d{5}|2[AB]\d{3})$')
+
+# Marge sous le repère pour les offres indexées avec un peu de retard
+WATERMARK_OVERLAP = timedelta(hours=1)
 
 class FranceTravailScraper(BaseScraper):
     """Scraper pour l'API France Travail"""
 
+    provides_publication_time = True
+
     def __init__(self, config: Dict):
         super().__init__(config)
         self.site_name = "francetravail"
@@ -21,65 +39,67 @@ class FranceTravailScraper(BaseScraper):
 
         self.client_id = config.get('client_id')
         self.client_secret = config.get('client_secret')
-        self.access_token = None
-        self.token_expires_at = None
 
-    async def get_access_token(self) -> str:
-        """Obtient un token d'accès OAuth2"""
-        # Si le token est encore valide, le retourner
-        if self.access_token and self.token_expires_at and datetime.now() < self.token_expires_at:
-            return self.access_token
-
-        # Sinon, demander un nouveau token
         # Utiliser le scope spécifique à l'application pour l'API v2
-        scope = f"application_{self.client_id}"
-        data = f"grant_type=client_credentials&client_id={self.client_id}&client_secret={self.client_secret}&scope={scope}"
+        self.token_provider = get_token_provider(
+            self.site_name, self.api_token_url, self.client_id, self.client_secret,
+            scope=f"application_{self.client_id}"
+        )
 
-        try:
-            async with self.session.post(
-                self.api_token_url,
-                data=data,
-                headers={'Content-Type': 'application/x-www-form-urlencoded'}
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    self.access_token = data['access_token']
-                    expires_in = data.get('expires_in', 3600)
-                    self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)
-                    self.logger.info("Token France Travail obtenu avec succès")
-                    return self.access_token
-                else:
-                    error = await response.text()
-                    self.logger.error(f"Erreur obtention token France Travail: {response.status} - {error}")
-                    return None
-        except Exception as e:
-            self.logger.error(f"Exception lors de l'obtention du token: {e}")
-            return None
+        # Repère de la dernière offre vue par (métier, mot-clé, lieu)
+        self.watermarks = get_watermark_store(self.site_name)
+        self.full_reconcile_interval = config.get('full_reconcile_hours', 24) * 3600
+        self.max_parallel_ranges = config.get('max_parallel_ranges', 4)
 
-    async def search_jobs(self, metier: Dict, location: str = None) -> List[Dict]:
-        """Recherche des offres sur France Travail API"""
+    async def get_access_token(self) -> str:
+        """Obtient un token d'accès OAuth2 (partagé entre les instances et les redémarrages)"""
+        return await self.token_provider.get_token(self.session)
+
+    async def iter_jobs(self, metier: Dict, location: str = None) -> AsyncIterator[Dict]:
+        """
+        Recherche des offres sur France Travail API, produites à chaque plage reçue
+
+        Synchronisation delta: seules les offres créées depuis le repère de la
+        requête (date de création la plus récente déjà vue) sont demandées.
+        Une synchronisation complète sur 7 jours est refaite périodiquement
+        pour rattraper les offres indexées en retard ou modifiées.
+        """
         token = await self.get_access_token()
         if not token:
             self.logger.error("Impossible d'obtenir le token d'accès")
-            return []
+            return
 
-        jobs = []
         keywords = self._build_keywords(metier)
 
         # Utiliser le premier mot-clé principal
         keyword = keywords[0] if keywords else metier['nom']
 
+        query_key = f"{metier.get('id')}|{keyword.lower()}|{(location or '').lower()}"
+        state = self.watermarks.get(query_key)
+        now = datetime.utcnow()
+
+        full_sync = (
+            not state.get('watermark')
+            or time.time() - state.get('full_sync_at', 0) > self.full_reconcile_interval
+        )
+        if full_sync:
+            min_date = now - timedelta(days=7)
+        else:
+            min_date = datetime.strptime(state['watermark'], API_DATE_FORMAT) - WATERMARK_OVERLAP
+
         # Construire les paramètres de recherche
         params = {
             'motsCles': f"{keyword} alternance",
             'typeContrat': 'E2,FS',  # E2=Apprentissage, FS=Contrat pro
-            'minCreationDate': (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%SZ'),
-            'range': '0-149',  # Récupérer jusqu'à 150 résultats
-            'sort': '2',  # Tri par date
+            'minCreationDate': min_date.strftime(API_DATE_FORMAT),
+            'maxCreationDate': now.strftime(API_DATE_FORMAT),
+            'sort': '1',  # Tri par date de création décroissante (2 = par distance)
         }
 
-        if location:
-            params['commune'] = location
+        if location and INSEE_CODE_PATTERN.match(location.strip()):
+            params['commune'] = location.strip()
+        elif location:
+            self.logger.debug(f"France Travail: '{location}' n'est pas un code INSEE, recherche sans commune")
 
         headers = {
             'Authorization': f'Bearer {token}',
@@ -87,27 +107,106 @@ class FranceTravailScraper(BaseScraper):
             'Content-Type': 'application/json'
         }
 
-        self.logger.info(f"Recherche France Travail: {params}")
+        self.logger.info(f"Recherche France Travail ({'complète' if full_sync else 'delta'}): {params}")
+
+        resultats, total = await self._fetch_range(params, headers, 0)
+        if resultats is None:
+            return
+
+        jobs_count = 0
+        received = 0
+        newest = None
+        complete = True
+        pending = []
+
+        # Fenêtre plus grande qu'une plage: pages suivantes en parallèle
+        if total > RANGE_SIZE:
+            starts = range(RANGE_SIZE, min(total, MAX_RANGE_START + RANGE_SIZE), RANGE_SIZE)
+            semaphore = asyncio.Semaphore(self.max_parallel_ranges)
+
+            async def fetch(start: int):
+                async with semaphore:
+                    return await self._fetch_range(params, headers, start)
+
+            pending = [asyncio.create_task(fetch(start)) for start in starts]
+
+            # Au-delà de la dernière plage accessible, les offres les plus anciennes de la fenêtre
+            # manquent. Tri par date décroissante: les plages lues sont les plus récentes, le
+            # repère avance quand même (sinon chaque cycle referait toute la fenêtre).
+            if total > MAX_RANGE_START + RANGE_SIZE:
+                self.logger.warning(
+                    f"France Travail: {total} offres depuis {params['minCreationDate']}, seules les "
+                    f"{MAX_RANGE_START + RANGE_SIZE} plus récentes sont accessibles "
+                    f"({total - MAX_RANGE_START - RANGE_SIZE} plus anciennes ignorées)"
+                )
 
         try:
-            async with self.session.get(self.api_offres, params=params, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    resultats = data.get('resultats', [])
+            # Première plage, puis les suivantes dans leur ordre d'arrivée
+            for next_range in [None] + list(asyncio.as_completed(pending)):
+                if next_range is not None:
+                    resultats, _ = await next_range
+                    if resultats is None:
+                        complete = False
+                        continue
 
-                    for offre_data in resultats:
-                        job = self._parse_offre(offre_data, metier)
-                        if job and self._is_valid_job(job):
-                            jobs.append(job)
+                received += len(resultats)
+                for offre_data in resultats:
+                    date_creation = offre_data.get('dateCreation', '')[:19]
+                    if date_creation and (newest is None or date_creation > newest):
+                        newest = date_creation
 
-                    self.logger.info(f"France Travail: {len(jobs)} offres trouvées pour {metier['nom']}")
+                    job = self._parse_offre(offre_data, metier)
+                    if job and self._is_valid_job(job):
+                        jobs_count += 1
+                        yield job
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # Le repère n'avance que si aucune plage accessible n'a échoué
+        if complete:
+            values = {'full_sync_at': time.time()} if full_sync else {}
+            if newest:
+                values['watermark'] = f"{newest}Z"
+            elif full_sync:
+                values['watermark'] = now.strftime(API_DATE_FORMAT)
+            self.watermarks.update(query_key, **values)
+            self.watermarks.save()
+
+        self.logger.info(
+            f"France Travail: {jobs_count} offres trouvées pour {metier['nom']} "
+            f"({received}/{total} depuis {params['minCreationDate']})"
+        )
+
+    async def _fetch_range(self, params: Dict, headers: Dict, start: int) -> Tuple[Optional[List[Dict]], int]:
+        """
+        Récupère une plage de résultats
+
+        Returns:
+            (offres, nombre total d'offres de la fenêtre) ou (None, 0) si erreur
+        """
+        range_params = dict(params, range=f"{start}-{start + RANGE_SIZE - 1}")
+
+        try:
+            async with self.session.get(self.api_offres, params=range_params, headers=headers) as response:
+                # 206: résultats partiels, le total est dans Content-Range ("offres 0-149/1234")
+                if response.status in (200, 206):
+                    data = await response.json()
+                    resultats = data.get('resultats', [])
+                    match = re.search(r'/(\d+)', response.headers.get('Content-Range', ''))
+                    total = int(match.group(1)) if match else len(resultats)
+                    return resultats, total
+                elif response.status == 204:
+                    return [], 0  # Aucune offre dans la fenêtre
                 else:
+                    if response.status == 401:
+                        self.token_provider.invalidate()
                     error = await response.text()
                     self.logger.warning(f"Erreur API France Travail: {response.status} - {error}")
         except Exception as e:
             self.logger.error(f"Erreur lors de la recherche France Travail: {e}")
 
-        return jobs
+        return None, 0
 
     def _parse_offre(self, offre_data: Dict, metier: Dict) -> Optional[Dict]:
         """Parse une offre France Travail"""
@@ -143,18 +242,20 @@ class FranceTravailScraper(BaseScraper):
                 try:
                     date_publication = datetime.fromisoformat(date_creation_str.replace('Z', '+00:00'))
                 except:
-                    date_publication = datetime.now()
+                    date_publication = datetime.utcnow()
 
             return self.build_job_dict(
                 titre=titre,
                 entreprise=entreprise,
                 description=self.clean_text(description)[:500],  # Limiter la description
                 lieu=ville,
+                latitude=lieu_travail.get('latitude'),
+                longitude=lieu_travail.get('longitude'),
                 salaire=salaire,
                 url=url,
                 source_site=self.site_name,
                 external_id=offre_id,
-                date_publication=date_publication or datetime.now(),
+                date_publication=date_publication or datetime.utcnow(),
                 metier_id=metier.get('id')
             )
         except Exception as e:
@@ -23,6 +23,17 @@ class IndeedCloudScraper(BaseScraper):
             }
         )
 
+    def _restore_cookies(self):
+        """Recharge les cookies de clearance dans la session cloudscraper (et non la session aiohttp)"""
+        restored = self.cookie_store.load_into_session(self.scraper)
+        if restored:
+            self.logger.debug(f"🍪 {restored} cookies restaurés")
+
+    def _persist_cookies(self):
+        """Enregistre les cookies de la session cloudscraper"""
+        self.cookie_store.save_from_session(self.scraper)
+        self._log_cookie_stats()
+
     async def search_jobs(self, metier: Dict, location: str = None) -> List[Dict]:
         """Recherche des offres sur Indeed avec CloudScraper"""
         jobs = []
@@ -37,8 +48,8 @@ class IndeedCloudScraper(BaseScraper):
         # Dédupliquer
         unique_jobs = {}
         for job in jobs:
-            if job['url'] not in unique_jobs:
-                unique_jobs[job['url']] = job
+            if job['identity_key'] not in unique_jobs:
+                unique_jobs[job['identity_key']] = job
 
         self.logger.info(f"Indeed CloudScraper: {len(unique_jobs)} offres trouvées pour {metier['nom']}")
         return list(unique_jobs.values())
@@ -76,6 +87,7 @@ class IndeedCloudScraper(BaseScraper):
                     jobs.append(job)
 
         except Exception as e:
+            self.failed = True
             self.logger.error(f"Erreur scraping Indeed CloudScraper: {e}")
 
         return jobs
@@ -84,12 +96,18 @@ class IndeedCloudScraper(BaseScraper):
         """Fait une requête avec cloudscraper (méthode synchrone)"""
         try:
             response = self.scraper.get(url, timeout=30)
+            if self.persist_cookies:
+                self.cookie_store.record_response(len(response.history) + int(response.status_code == 403))
             if response.status_code == 200:
                 return response.text
             else:
+                if response.status_code == 403:
+                    self.blocked = True
+                self.failed = True
                 self.logger.warning(f"Status code {response.status_code} pour {url}")
                 return None
         except Exception as e:
+            self.failed = True
             self.logger.error(f"Erreur cloudscraper: {e}")
             return None
 
@@ -139,7 +157,7 @@ class IndeedCloudScraper(BaseScraper):
                 url=url,
                 source_site=self.site_name,
                 external_id=job_id,
-                date_publication=datetime.now(),
+                date_publication=datetime.utcnow(),
                 metier_id=metier.get('id')
             )
 
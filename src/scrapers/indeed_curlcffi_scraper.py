@@ -30,8 +30,8 @@ class IndeedCurlCffiScraper(BaseScraper):
         # Dédupliquer
         unique_jobs = {}
         for job in jobs:
-            if job['url'] not in unique_jobs:
-                unique_jobs[job['url']] = job
+            if job['identity_key'] not in unique_jobs:
+                unique_jobs[job['identity_key']] = job
 
         self.logger.info(f"Indeed CurlCffi: {len(unique_jobs)} offres trouvées pour {metier['nom']}")
         return list(unique_jobs.values())
@@ -149,7 +149,7 @@ class IndeedCurlCffiScraper(BaseScraper):
                 url=url,
                 source_site=self.site_name,
                 external_id=job_id,
-                date_publication=datetime.now(),
+                date_publication=datetime.utcnow(),
                 metier_id=metier.get('id')
             )
 
@@ -0,0 +1,270 @@
+"""
+Source Indeed logique: route chaque recherche vers la stratégie la moins coûteuse qui fonctionne
+"""
+
+import json
+import logging
+import os
+import time
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, Dict, List, Optional
+
+from .base import BaseScraper, DATA_DIR
+
+# Stratégies par ordre de préférence (départage à coût égal)
+DEFAULT_STRATEGIES = ['indeed_vps', 'indeed_http', 'indeed_cloudscraper', 'indeed_selenium']
+
+# Mise à l'écart d'une stratégie en échec: 30 min, doublée à chaque échec consécutif (24h max)
+BLOCKED_COOLDOWN = 1800
+MAX_COOLDOWN = 24 * 3600
+
+ROUTER_STATS_FILE = os.path.join(DATA_DIR, 'indeed_router.json')
+
+# Clés propres au routeur; les autres (force_refresh...) sont transmises à chaque stratégie
+ROUTER_KEYS = frozenset({'enabled', 'strategies', 'strategy_configs'})
+
+class StrategyStats:
+    """Taux de succès et coût (latence, CPU) d'une stratégie"""
+
+    FIELDS = ('attempts', 'successes', 'failures', 'blocked', 'consecutive_failures',
+              'cooldown_until', 'latency_total', 'cpu_total', 'offers', 'new_offers')
+
+    def __init__(self, data: Dict = None):
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.blocked = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.latency_total = 0.0
+        self.cpu_total = 0.0
+        self.offers = 0
+        self.new_offers = 0
+
+        for field in self.FIELDS:
+            if data and field in data:
+                setattr(self, field, data[field])
+
+    @property
+    def cost_total(self) -> float:
+        """Coût cumulé (secondes de latence + secondes CPU)"""
+        return self.latency_total + self.cpu_total
+
+    def expected_cost(self) -> float:
+        """Coût attendu d'une recherche réussie (0 si jamais essayée, pour l'explorer)"""
+        if not self.attempts:
+            return 0.0
+        if not self.successes:
+            return float('inf')
+        # Les échecs sont payés aussi: coût total rapporté aux succès
+        return self.cost_total / self.successes
+
+    def cost_per_new_offer(self) -> Optional[float]:
+        """Coût cumulé divisé par le nombre d'offres nouvelles apportées"""
+        return self.cost_total / self.new_offers if self.new_offers else None
+
+    def record(self, latency: float, cpu: float, offers: int, failed: bool, blocked: bool):
+        """Enregistre une recherche"""
+        self.attempts += 1
+        self.latency_total += latency
+        self.cpu_total += cpu
+        self.offers += offers
+
+        if failed:
+            self.failures += 1
+            self.blocked += int(blocked)
+            self.consecutive_failures += 1
+            cooldown = min(BLOCKED_COOLDOWN * 2 ** (self.consecutive_failures - 1), MAX_COOLDOWN)
+            self.cooldown_until = time.time() + cooldown
+        else:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.cooldown_until = 0.0
+
+    def to_dict(self) -> Dict:
+        """Exporte les compteurs"""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+_router_stats: Optional[Dict[str, StrategyStats]] = None
+
+def get_router_stats() -> Dict[str, StrategyStats]:
+    """Statistiques partagées des stratégies (les scrapers sont recréés à chaque cycle)"""
+    global _router_stats
+    if _router_stats is None:
+        _router_stats = {}
+        if os.path.exists(ROUTER_STATS_FILE):
+            try:
+                with open(ROUTER_STATS_FILE, encoding='utf-8') as file:
+                    _router_stats = {name: StrategyStats(data) for name, data in json.load(file).items()}
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Impossible de charger {ROUTER_STATS_FILE}: {e}")
+    return _router_stats
+
+def save_router_stats():
+    """Enregistre les statistiques des stratégies"""
+    try:
+        os.makedirs(os.path.dirname(ROUTER_STATS_FILE) or '.', exist_ok=True)
+        tmp_path = f"{ROUTER_STATS_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({name: stats.to_dict() for name, stats in get_router_stats().items()}, file)
+        os.replace(tmp_path, ROUTER_STATS_FILE)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Impossible d'enregistrer {ROUTER_STATS_FILE}: {e}")
+
+class IndeedRouterScraper(BaseScraper):
+    """
+    Source 'indeed' unique au-dessus des différentes implémentations
+
+    Chaque recherche part sur la stratégie au coût attendu le plus faible
+    parmi celles qui ne sont pas mises à l'écart. Un 403 (ou une erreur)
+    écarte temporairement la stratégie et bascule sur la suivante. Les
+    stratégies désactivées dans leur configuration (enabled: false) ne sont
+    jamais essayées.
+    """
+
+    def __init__(self, config: Dict):
+        super().__init__(config)
+        self.site_name = "indeed"
+
+        overrides = {key: value for key, value in config.items() if key not in ROUTER_KEYS}
+        strategy_configs = config.get('strategy_configs', {})
+        self.strategy_configs = {
+            name: dict(strategy_configs.get(name, {}), **overrides)
+            for name in config.get('strategies', DEFAULT_STRATEGIES)
+        }
+        self.strategy_names = [
+            name for name, strategy_config in self.strategy_configs.items() if strategy_config.get('enabled', True)
+        ]
+        self.stats = get_router_stats()
+
+        self._scrapers: Dict[str, BaseScraper] = {}
+        self._site_to_strategy: Dict[str, str] = {}
+        self._stack = None
+
+    async def __aenter__(self):
+        """Les stratégies sont ouvertes à la demande (un navigateur ne démarre que s'il sert)"""
+        self._stack = AsyncExitStack()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Ferme les stratégies utilisées et enregistre les statistiques"""
+        await self._stack.aclose()
+        save_router_stats()
+
+        for line in self.summary_lines():
+            self.logger.info(f"🔀 {line}")
+
+    def _get_stats(self, name: str) -> StrategyStats:
+        if name not in self.stats:
+            self.stats[name] = StrategyStats()
+        return self.stats[name]
+
+    async def _get_strategy(self, name: str) -> BaseScraper:
+        """Instancie et ouvre une stratégie au premier usage"""
+        if name not in self._scrapers:
+            from . import get_scraper
+
+            scraper = get_scraper(name, self.strategy_configs[name])
+            await self._stack.enter_async_context(scraper)
+            self._scrapers[name] = scraper
+            self._site_to_strategy[scraper.site_name] = name
+        return self._scrapers[name]
+
+    def ranked_strategies(self) -> List[str]:
+        """Stratégies disponibles, de la moins coûteuse à la plus coûteuse"""
+        now = time.time()
+        available = [name for name in self.strategy_names if self._get_stats(name).cooldown_until <= now]
+        return sorted(available, key=lambda name: (self._get_stats(name).expected_cost(),
+                                                   self.strategy_names.index(name)))
+
+    async def iter_jobs(self, metier: Dict, location: str = None) -> AsyncIterator[Dict]:
+        """
+        Produit les offres de la meilleure stratégie au fil de l'eau
+
+        Si la stratégie échoue en cours de route, les offres déjà produites
+        sont gardées et la suivante complète la recherche. Le temps passé
+        chez l'appelant entre deux offres n'est pas compté dans le coût.
+        """
+        seen_keys = set()
+
+        for name in self.ranked_strategies():
+            stats = self._get_stats(name)
+            start, cpu_start = time.monotonic(), time.process_time()
+            paused, cpu_paused = 0.0, 0.0
+            offers = 0
+            blocked = False
+
+            try:
+                scraper = await self._get_strategy(name)
+                scraper.blocked = False
+                scraper.failed = False
+
+                async for job in scraper.iter_jobs(metier, location):
+                    offers += 1
+                    if job['identity_key'] in seen_keys:
+                        continue
+                    seen_keys.add(job['identity_key'])
+
+                    pause_start, cpu_pause_start = time.monotonic(), time.process_time()
+                    yield job
+                    paused += time.monotonic() - pause_start
+                    cpu_paused += time.process_time() - cpu_pause_start
+
+                # Les stratégies journalisent leurs erreurs sans lever: lire leurs indicateurs
+                blocked = scraper.blocked
+                failed = blocked or scraper.failed
+            except Exception as e:
+                self.logger.error(f"Erreur stratégie {name}: {e}")
+                failed = True
+
+            stats.record(time.monotonic() - start - paused, time.process_time() - cpu_start - cpu_paused,
+                         offers, failed, blocked)
+
+            if failed:
+                self.logger.warning(
+                    f"↪️ Stratégie {name} en échec{' (403)' if blocked else ''}, "
+                    f"écartée {int(stats.cooldown_until - time.time()) // 60} min"
+                )
+                continue
+
+            return
+
+        self.logger.warning(f"Aucune stratégie Indeed disponible pour {metier['nom']}")
+
+    def record_new_offers(self, offres: List):
+        """Attribue les offres nouvelles à la stratégie qui les a trouvées (par source_site)"""
+        for offre in offres:
+            name = self._site_to_strategy.get(offre.source_site)
+            if name:
+                self._get_stats(name).new_offers += 1
+
+    def record_stored(self, jobs: List[Dict]):
+        """Transmet les offres en base à la stratégie qui les a produites"""
+        by_strategy: Dict[str, List[Dict]] = {}
+        for job in jobs:
+            name = self._site_to_strategy.get(job['source_site'])
+            if name:
+                by_strategy.setdefault(name, []).append(job)
+
+        for name, strategy_jobs in by_strategy.items():
+            self._scrapers[name].record_stored(strategy_jobs)
+
+    def summary_lines(self) -> List[str]:
+        """Rapport par stratégie: succès, coût moyen et coût par offre nouvelle"""
+        lines = []
+        for name in self.strategy_names:
+            stats = self._get_stats(name)
+            if not stats.attempts:
+                continue
+
+            cost_per_offer = stats.cost_per_new_offer()
+            lines.append(
+                f"{name}: {stats.successes}/{stats.attempts} succès ({stats.blocked} × 403), "
+                f"{stats.latency_total / stats.attempts:.1f}s + {stats.cpu_total / stats.attempts:.2f}s CPU par recherche, "
+                + (f"{cost_per_offer:.1f}s par offre nouvelle" if cost_per_offer is not None else "aucune offre nouvelle")
+            )
+        return lines
+
+    def parse_job_details(self, job_element) -> Optional[Dict]:
+        """Non utilisé pour ce scraper"""
+        pass
@@ -4,11 +4,36 @@ Scraper pour Indeed France
 
 import json
 import asyncio
-from typing import List, Dict, Optional
+import re
+from html import unescape
+from typing import AsyncIterator, List, Dict, Optional
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 from .base import BaseScraper
 
+# Données des cartes embarquées dans la page (script du fournisseur "mosaic")
+MOSAIC_JOBCARDS_PATTERN = re.compile(r'window\.mosaic\.providerData\["mosaic-provider-jobcards"\]\s*=\s*')
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+_json_decoder = json.JSONDecoder()
+
+def extract_embedded_results(html: str) -> Optional[List[Dict]]:
+    """
+    Extrait les cartes d'offres du JSON embarqué, sans parser le HTML
+
+    Returns:
+        Liste des résultats bruts, ou None si le bloc est absent ou illisible
+    """
+    match = MOSAIC_JOBCARDS_PATTERN.search(html)
+    if not match:
+        return None
+
+    try:
+        data, _ = _json_decoder.raw_decode(html, match.end())
+        return data['metaData']['mosaicProviderJobCardsModel']['results']
+    except (ValueError, KeyError, TypeError):
+        return None
+
 class IndeedScraper(BaseScraper):
     """Scraper spécialisé pour Indeed France"""
 
@@ -17,33 +42,29 @@ class IndeedScraper(BaseScraper):
         self.site_name = "indeed"
         self.search_path = config.get('search_path', '/jobs')
 
-    async def search_jobs(self, metier: Dict, location: str = None) -> List[Dict]:
-        """Recherche des offres sur Indeed"""
-        jobs = []
+    async def iter_jobs(self, metier: Dict, location: str = None) -> AsyncIterator[Dict]:
+        """Recherche des offres sur Indeed, produites page par page (dédupliquées par identité)"""
         keywords = self._build_keywords(metier)
+        seen_keys = set()
 
         for keyword in keywords[:3]:  # Limiter à 3 recherches par métier
-            page_jobs = await self._search_keyword(keyword, metier, location)
-            jobs.extend(page_jobs)
+            async for page_jobs in self._search_keyword(keyword, metier, location):
+                for job in page_jobs:
+                    if job['identity_key'] not in seen_keys:
+                        seen_keys.add(job['identity_key'])
+                        yield job
 
             # Délai entre les recherches
             await asyncio.sleep(2)
 
-        # Dédupliquer par URL
-        unique_jobs = {}
-        for job in jobs:
-            if job['url'] not in unique_jobs:
-                unique_jobs[job['url']] = job
-
-        self.logger.info(f"Indeed: {len(unique_jobs)} offres trouvées pour {metier['nom']}")
-        return list(unique_jobs.values())
+        self.logger.info(f"Indeed: {len(seen_keys)} offres trouvées pour {metier['nom']}")
 
-    async def _search_keyword(self, keyword: str, metier: Dict, location: str) -> List[Dict]:
-        """Effectue une recherche pour un mot-clé spécifique"""
-        jobs = []
+    def _search_keyword(self, keyword: str, metier: Dict, location: str) -> AsyncIterator[List[Dict]]:
+        """Effectue une recherche pour un mot-clé spécifique (offres par page)"""
         max_pages = self.config.get('max_pages', 3)
+        url = f"{self.base_url}{self.search_path}"
 
-        for page in range(max_pages):
+        async def fetch(page: int) -> Optional[List[Dict]]:
             params = {
                 'q': f"{keyword} alternance",
                 'l': location or 'France',
@@ -52,25 +73,27 @@ class IndeedScraper(BaseScraper):
                 'start': page * 10
             }
 
-            url = f"{self.base_url}{self.search_path}"
             html = await self.fetch_page(url, params)
-
             if not html:
-                break
-
-            page_jobs = self._parse_search_page(html, metier)
-            jobs.extend(page_jobs)
+                return None
+            return self._parse_search_page(html, metier)
 
-            # Arrêter si moins de 10 résultats (dernière page)
-            if len(page_jobs) < 10:
-                break
+        # Moins de 10 résultats: dernière page
+        return self.paginate(fetch, max_pages, page_size=10, label=f"Indeed '{keyword}'",
+                             query=(keyword, location))
 
-            await asyncio.sleep(1)  # Délai entre les pages
+    def _parse_search_page(self, html: str, metier: Dict) -> List[Dict]:
+        """Parse une page de résultats Indeed (JSON embarqué, sinon HTML)"""
+        results = extract_embedded_results(html)
+        if results is not None:
+            jobs = [self._parse_embedded_result(result, metier) for result in results]
+            return [job for job in jobs if job and self._is_valid_job(job)]
 
-        return jobs
+        self.logger.debug("JSON embarqué absent, parsing HTML des cartes")
+        return self._parse_search_page_dom(html, metier)
 
-    def _parse_search_page(self, html: str, metier: Dict) -> List[Dict]:
-        """Parse une page de résultats Indeed"""
+    def _parse_search_page_dom(self, html: str, metier: Dict) -> List[Dict]:
+        """Parse une page de résultats Indeed depuis le HTML"""
         jobs = []
         soup = self.get_soup(html)
 
@@ -85,6 +108,39 @@ class IndeedScraper(BaseScraper):
 
         return jobs
 
+    def _parse_embedded_result(self, result: Dict, metier: Dict) -> Optional[Dict]:
+        """Convertit une carte du JSON embarqué"""
+        try:
+            job_id = result.get('jobkey')
+            if not job_id:
+                return None
+
+            titre = self.clean_text(result.get('displayTitle') or result.get('title', ''))
+            description = self.clean_text(unescape(HTML_TAG_PATTERN.sub(' ', result.get('snippet', ''))))
+
+            if not self.is_alternance_related(titre, description):
+                return None
+
+            salary_text = (result.get('salarySnippet') or {}).get('text')
+            pub_date = result.get('pubDate')  # millisecondes epoch
+
+            return self.build_job_dict(
+                titre=titre,
+                entreprise=self.clean_text(result.get('company', '')),
+                description=description,
+                lieu=self.clean_text(result.get('formattedLocation', '')),
+                salaire=self.extract_salary(salary_text) if salary_text else None,
+                url=f"{self.base_url}/viewjob?jk={job_id}",
+                source_site=self.site_name,
+                external_id=job_id,
+                date_publication=datetime.utcfromtimestamp(pub_date / 1000) if pub_date else datetime.utcnow(),
+                metier_id=metier.get('id')
+            )
+
+        except Exception as e:
+            self.logger.error(f"Erreur parsing Indeed JSON: {e}")
+            return None
+
     def _parse_job_card(self, card, metier: Dict) -> Optional[Dict]:
         """Parse une carte d'offre Indeed"""
         try:
@@ -132,7 +188,7 @@ class IndeedScraper(BaseScraper):
                 url=url,
                 source_site=self.site_name,
                 external_id=job_id,
-                date_publication=datetime.now(),
+                date_publication=datetime.utcnow(),
                 metier_id=metier.get('id')
             )
 
@@ -3,7 +3,7 @@ Scraper Indeed avec Selenium pour contourner les protections anti-bot
 """
 
 import asyncio
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from datetime import datetime
 from selenium import webdriver
@@ -12,9 +12,44 @@ from selenium.webdriver.edge.service import Service
 from selenium.webdriver.edge.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
 from .base import BaseScraper
 
+JOB_CARD_SELECTOR = 'div.job_seen_beacon, div[data-jk], a[data-jk]'
+
+# Titres des pages de vérification anti-bot servies à la place des résultats
+BLOCK_PAGE_MARKERS = ('just a moment', 'security check', 'captcha', 'blocked', 'vérification', 'access denied')
+
+# Extraction de toutes les cartes en un seul appel (au lieu d'un aller-retour WebDriver par champ)
+EXTRACT_CARDS_JS = """
+const clean = value => (value || '').replace(/\\s+/g, ' ').trim();
+const cards = [];
+const ids = new Set();
+for (const card of document.querySelectorAll(arguments[0])) {
+    let id = card.getAttribute('data-jk');
+    if (!id) {
+        const link = card.querySelector('a[data-jk]');
+        if (link) id = link.getAttribute('data-jk');
+    }
+    if (!id || ids.has(id)) continue;
+    ids.add(id);
+
+    const text = selector => {
+        const element = card.querySelector(selector);
+        return element ? clean(element.innerText || element.textContent) : '';
+    };
+    cards.push({
+        id: id,
+        titre: text('h2.jobTitle, span[title]'),
+        entreprise: text('span[data-testid="company-name"], span.companyName'),
+        lieu: text('div[data-testid="text-location"], div.companyLocation')
+    });
+    if (cards.length >= arguments[1]) break;
+}
+return cards;
+"""
+
 class IndeedSeleniumScraper(BaseScraper):
     """Scraper Indeed utilisant Selenium"""
 
@@ -23,6 +58,14 @@ class IndeedSeleniumScraper(BaseScraper):
         self.site_name = "indeed_selenium"
         self.driver = None
 
+        # Le driver vit dans un thread dédié: pas de concurrence avec l'executor par défaut
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='indeed-selenium')
+
+    async def _run(self, func, *args):
+        """Exécute un appel Selenium dans le thread du driver"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
     def _init_driver(self):
         """Initialise le driver Selenium Edge"""
         if self.driver:
@@ -41,14 +84,15 @@ class IndeedSeleniumScraper(BaseScraper):
 
     async def __aenter__(self):
         """Initialise le driver au lieu de la session HTTP"""
-        self._init_driver()
+        await self._run(self._init_driver)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Ferme le driver"""
         if self.driver:
-            self.driver.quit()
+            await self._run(self.driver.quit)
             self.driver = None
+        self._executor.shutdown(wait=False)
 
     async def search_jobs(self, metier: Dict, location: str = None) -> List[Dict]:
         """Recherche des offres sur Indeed avec Selenium"""
@@ -64,12 +108,29 @@ class IndeedSeleniumScraper(BaseScraper):
         # Dédupliquer
         unique_jobs = {}
         for job in jobs:
-            if job['url'] not in unique_jobs:
-                unique_jobs[job['url']] = job
+            if job['identity_key'] not in unique_jobs:
+                unique_jobs[job['identity_key']] = job
 
         self.logger.info(f"Indeed Selenium: {len(unique_jobs)} offres trouvées pour {metier['nom']}")
         return list(unique_jobs.values())
 
+    def _load_cards(self, url: str, limit: int) -> List[Dict]:
+        """Charge une page de résultats et extrait ses cartes (dans le thread du driver)"""
+        self.driver.get(url)
+
+        try:
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, JOB_CARD_SELECTOR))
+            )
+        except TimeoutException:
+            # Pas de carte: page de vérification anti-bot, ou simplement aucun résultat
+            title = (self.driver.title or '').lower()
+            if any(marker in title for marker in BLOCK_PAGE_MARKERS):
+                self.blocked = True
+            return []
+
+        return self.driver.execute_script(EXTRACT_CARDS_JS, JOB_CARD_SELECTOR, limit)
+
     async def _search_keyword(self, keyword: str, metier: Dict, location: str) -> List[Dict]:
         """Recherche avec un mot-clé spécifique"""
         jobs = []
@@ -82,88 +143,30 @@ class IndeedSeleniumScraper(BaseScraper):
 
             self.logger.info(f"Scraping Indeed: {url}")
 
-            # Charger la page
-            await asyncio.to_thread(self.driver.get, url)
-            await asyncio.sleep(2)  # Attendre le chargement
-
-            # Extraire les offres
-            job_cards = await asyncio.to_thread(
-                self.driver.find_elements,
-                By.CSS_SELECTOR,
-                'div.job_seen_beacon, div[data-jk], a[data-jk]'
-            )
+            # Charger la page et extraire les offres (limité à 10 par recherche)
+            cards = await self._run(self._load_cards, url, 10)
 
-            self.logger.info(f"Trouvé {len(job_cards)} cartes d'offres")
+            self.logger.info(f"Trouvé {len(cards)} cartes d'offres")
 
-            for card in job_cards[:10]:  # Limiter à 10 offres par recherche
-                job = await self._parse_job_card(card, metier)
+            for card in cards:
+                job = self._parse_job_card(card, metier)
                 if job and self._is_valid_job(job):
                     jobs.append(job)
 
         except Exception as e:
+            self.failed = True
             self.logger.error(f"Erreur scraping Indeed Selenium: {e}")
 
         return jobs
 
-    async def _parse_job_card(self, card, metier: Dict) -> Optional[Dict]:
-        """Parse une carte d'offre Indeed"""
+    def _parse_job_card(self, card: Dict, metier: Dict) -> Optional[Dict]:
+        """Convertit une carte extraite de la page en offre"""
         try:
-            # Récupérer le job ID
-            job_id = await asyncio.to_thread(card.get_attribute, 'data-jk')
-            if not job_id:
-                # Essayer de trouver un élément enfant avec data-jk
-                try:
-                    link = await asyncio.to_thread(
-                        card.find_element,
-                        By.CSS_SELECTOR,
-                        'a[data-jk]'
-                    )
-                    job_id = await asyncio.to_thread(link.get_attribute, 'data-jk')
-                except:
-                    return None
-
-            if not job_id:
+            job_id = card.get('id')
+            titre = card.get('titre', '')
+            if not job_id or not titre:
                 return None
 
-            # Titre
-            try:
-                title_elem = await asyncio.to_thread(
-                    card.find_element,
-                    By.CSS_SELECTOR,
-                    'h2.jobTitle, span[title]'
-                )
-                titre = await asyncio.to_thread(title_elem.text.strip)
-            except:
-                titre = ""
-
-            if not titre:
-                return None
-
-            # Entreprise
-            try:
-                company_elem = await asyncio.to_thread(
-                    card.find_element,
-                    By.CSS_SELECTOR,
-                    'span[data-testid="company-name"], span.companyName'
-                )
-                entreprise = await asyncio.to_thread(company_elem.text.strip)
-            except:
-                entreprise = "Non précisé"
-
-            # Localisation
-            try:
-                location_elem = await asyncio.to_thread(
-                    card.find_element,
-                    By.CSS_SELECTOR,
-                    'div[data-testid="text-location"], div.companyLocation'
-                )
-                lieu = await asyncio.to_thread(location_elem.text.strip)
-            except:
-                lieu = ""
-
-            # URL
-            url = f"https://fr.indeed.com/viewjob?jk={job_id}"
-
             # Vérifier que c'est bien une alternance
             text_to_check = f"{titre}".lower()
             if not any(word in text_to_check for word in ['alternance', 'apprentissage', 'apprenti']):
@@ -171,14 +174,14 @@ class IndeedSeleniumScraper(BaseScraper):
 
             return self.build_job_dict(
                 titre=titre,
-                entreprise=entreprise,
+                entreprise=card.get('entreprise') or "Non précisé",
                 description="",
-                lieu=lieu,
+                lieu=card.get('lieu', ''),
                 salaire=None,
-                url=url,
+                url=f"https://fr.indeed.com/viewjob?jk={job_id}",
                 source_site=self.site_name,
                 external_id=job_id,
-                date_publication=datetime.now(),
+                date_publication=datetime.utcnow(),
                 metier_id=metier.get('id')
             )
 
@@ -188,4 +191,4 @@ class IndeedSeleniumScraper(BaseScraper):
 
     def parse_job_details(self, job_element) -> Optional[Dict]:
         """Non utilisé pour ce scraper"""
-        pass
\ No newline at end of file
+        pass
@@ -3,87 +3,278 @@ Scraper Indeed qui utilise l'API Selenium sur le VPS
 """
 
 import asyncio
+import json
 import aiohttp
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
 from .base import BaseScraper
+from .seen_ids import get_seen_store
 
 class IndeedVPSScraper(BaseScraper):
     """Scraper Indeed utilisant l'API Selenium sur le VPS"""
 
+    provides_publication_time = True
+
     def __init__(self, config: Dict):
         super().__init__(config)
         self.site_name = "indeed_vps"
         self.vps_api_url = config.get('vps_api_url', 'http://45.158.77.193:5000')
+        self.poll_interval = config.get('vps_poll_interval', 2)
+        self.job_timeout = config.get('vps_job_timeout', 300)
 
-    async def search_jobs(self, metier: Dict, location: str = None) -> List[Dict]:
-        """Recherche des offres sur Indeed via l'API VPS"""
-        jobs = []
-        keywords = self._build_keywords(metier)
+        # Scraping forcé: demander au VPS d'ignorer son cache de résultats
+        self.request_headers = {'Cache-Control': 'no-cache'} if config.get('force_refresh') else None
 
-        # Prendre les 3 premiers mots-clés (augmenté de 2 à 3)
-        for keyword in keywords[:3]:
-            page_jobs = await self._search_keyword(keyword, metier, location)
-            jobs.extend(page_jobs)
-            await asyncio.sleep(3)  # Délai entre recherches
+        # Identifiants déjà reçus, envoyés au VPS pour qu'il ne les renvoie pas
+        self.seen_store = get_seen_store(self.site_name)
 
-        # Dédupliquer
-        unique_jobs = {}
-        for job in jobs:
-            if job['url'] not in unique_jobs:
-                unique_jobs[job['url']] = job
+        # Identifiants reçus pas encore confirmés en base: identifiant -> (mot-clé, localisation)
+        self._pending_ids: Dict[str, Tuple[str, str]] = {}
 
-        self.logger.info(f"Indeed VPS: {len(unique_jobs)} offres trouvées pour {metier['nom']}")
-        return list(unique_jobs.values())
+    async def iter_jobs(self, metier: Dict, location: str = None) -> AsyncIterator[Dict]:
+        """
+        Produit les offres au fil de l'eau, dédupliquées par identité (dedupe.identity_key)
 
-    async def _search_keyword(self, keyword: str, metier: Dict, location: str) -> List[Dict]:
-        """Recherche avec un mot-clé spécifique via l'API VPS"""
-        jobs = []
+        Les 3 premiers mots-clés partent dans une seule requête batch et
+        chaque page scrapée par le VPS est convertie dès sa réception.
+        """
+        keywords = self._build_keywords(metier)[:3]
+        seen_keys = set()
+
+        async with aiohttp.ClientSession() as session:
+            async for job in self._stream_batch(session, keywords, metier, location):
+                if job['identity_key'] not in seen_keys:
+                    seen_keys.add(job['identity_key'])
+                    yield job
+
+        self.logger.info(f"Indeed VPS: {len(seen_keys)} offres trouvées pour {metier['nom']}")
+
+    async def _stream_batch(self, session: aiohttp.ClientSession, keywords: List[str],
+                            metier: Dict, location: str) -> AsyncIterator[Dict]:
+        """Lit le flux NDJSON de l'endpoint batch du VPS"""
+        legacy = False
+        payload = dict(self._build_request(location), searches=[
+            {'keyword': keyword, 'seen_ids': self._seen_ids(keyword, location)}
+            for keyword in keywords
+        ])
 
         try:
-            # Appeler l'API du VPS
-            location_query = location or "France"
+            self.logger.info(f"Appel API VPS (batch) pour: {', '.join(keywords)}")
+
+            async with session.post(
+                f"{self.vps_api_url}/scrape/indeed/batch",
+                json=payload,
+                headers=self.request_headers,
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=self.job_timeout)
+            ) as response:
+                if response.status == 404:
+                    legacy = True
+                elif response.status != 200:
+                    self.failed = True
+                    self.logger.error(f"Status {response.status} de l'API VPS")
+                    return
+                else:
+                    async for line in response.content:
+                        if not line.strip():
+                            continue
+
+                        event = json.loads(line)
+                        if event['type'] == 'page':
+                            self._remember(event['keyword'], location, event)
+                            for job in self._convert_api_jobs(event, metier):
+                                yield job
+                        elif event['type'] == 'done':
+                            self._log_done(event)
+                        elif event['type'] == 'error':
+                            self.failed = True
+                            self.logger.error(f"Erreur API VPS: {event.get('error')}")
+
+        except asyncio.TimeoutError:
+            self.failed = True
+            self.logger.error("Timeout lors de l'appel à l'API VPS")
+        except Exception as e:
+            self.failed = True
+            self.logger.error(f"Erreur appel API VPS: {e}")
+
+        if legacy:
+            # Ancienne version de l'API sans endpoint batch: un job par mot-clé
+            results = await asyncio.gather(*[
+                self._search_keyword(session, keyword, metier, location)
+                for keyword in keywords
+            ])
+            for page_jobs in results:
+                for job in page_jobs:
+                    yield job
+
+    def _seen_ids(self, keyword: str, location: str) -> List[str]:
+        """Identifiants déjà reçus pour une recherche"""
+        return self.seen_store.get(keyword, location or "France")
+
+    def _remember(self, keyword: str, location: str, data: Dict):
+        """
+        Note la recherche d'origine des identifiants renvoyés par le VPS
+
+        Ils ne sont marqués vus (et exclus côté VPS) qu'une fois l'offre en
+        base, via record_stored: une offre perdue avant sauvegarde revient.
+        """
+        for api_job in data.get('jobs', []):
+            if api_job.get('external_id'):
+                self._pending_ids[api_job['external_id']] = (keyword, location or "France")
+
+    def record_stored(self, jobs: List[Dict]):
+        """Marque vus les identifiants des offres enregistrées en base"""
+        by_query: Dict[Tuple[str, str], List[str]] = {}
+        for job in jobs:
+            query = self._pending_ids.pop(job.get('external_id'), None)
+            if query:
+                by_query.setdefault(query, []).append(job['external_id'])
+
+        if by_query:
+            for (keyword, location), ids in by_query.items():
+                self.seen_store.add(keyword, location, ids)
+            self.seen_store.save()
+
+    def _log_done(self, data: Dict):
+        """Journalise la fin d'une recherche et les économies liées aux offres connues"""
+        if not data.get('success'):
+            self.failed = True
+            self.logger.error(f"Erreur API VPS ({data.get('keyword')}): {data.get('error')}")
+            return
 
+        if data.get('known_skipped'):
+            self.logger.info(
+                f"VPS '{data.get('keyword')}': {data['known_skipped']} offres connues exclues, "
+                f"{data.get('pages_saved', 0)} pages et ~{data.get('bytes_saved', 0)} octets économisés"
+            )
+
+    def _build_request(self, location: str) -> Dict:
+        """Paramètres de recherche communs envoyés à l'API VPS"""
+        return {
+            'location': location or "France",
+            'max_jobs': 50,  # Augmenté à 50 offres
+            'max_age_minutes': 60  # Offres de moins d'1h
+        }
+
+    async def _search_keyword(self, session: aiohttp.ClientSession, keyword: str,
+                              metier: Dict, location: str) -> List[Dict]:
+        """Recherche avec un mot-clé: soumet un job à l'API VPS puis attend son résultat"""
+        try:
             self.logger.info(f"Appel API VPS pour: {keyword}")
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.vps_api_url}/scrape/indeed",
-                    json={
-                        'keyword': keyword,
-                        'location': location_query,
-                        'max_jobs': 50,  # Augmenté à 50 offres
-                        'max_age_minutes': 60  # Offres de moins d'1h
-                    },
-                    timeout=aiohttp.ClientTimeout(total=120)  # Timeout augmenté pour plusieurs pages
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        if data.get('success'):
-                            api_jobs = data.get('jobs', [])
-                            self.logger.info(f"API VPS a retourné {len(api_jobs)} offres")
-
-                            # Convertir les jobs de l'API au format attendu
-                            for api_job in api_jobs:
-                                job = self._convert_api_job(api_job, metier)
-                                if job and self._is_valid_job(job):
-                                    jobs.append(job)
-                        else:
-                            self.logger.error(f"Erreur API VPS: {data.get('error')}")
-                    else:
-                        self.logger.error(f"Status {response.status} de l'API VPS")
+            async with session.post(
+                f"{self.vps_api_url}/jobs",
+                json=dict(self._build_request(location), keyword=keyword,
+                          seen_ids=self._seen_ids(keyword, location)),
+                headers=self.request_headers,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                if response.status == 404:
+                    # Ancienne version de l'API sans file de jobs
+                    return await self._search_keyword_sync(session, keyword, metier, location)
+                if response.status != 202:
+                    self.failed = True
+                    self.logger.error(f"Status {response.status} de l'API VPS")
+                    return []
+                submitted = await response.json()
+
+            if submitted.get('deduplicated'):
+                self.logger.info(f"Recherche '{keyword}' déjà en cours sur le VPS, résultat partagé")
+
+            data = await self._wait_for_job(session, submitted['job_id'])
+            if data is None:
+                self.failed = True
+                return []
+
+            if not data.get('success'):
+                self.failed = True
+                self.logger.error(f"Erreur API VPS: {data.get('error')}")
+                return []
+
+            self._log_done(data)
+            self._remember(keyword, location, data)
+            return self._convert_api_jobs(data, metier)
 
         except asyncio.TimeoutError:
-            self.logger.error(f"Timeout lors de l'appel à l'API VPS")
+            self.failed = True
+            self.logger.error("Timeout lors de l'appel à l'API VPS")
         except Exception as e:
+            self.failed = True
             self.logger.error(f"Erreur appel API VPS: {e}")
 
+        return []
+
+    async def _wait_for_job(self, session: aiohttp.ClientSession, job_id: str) -> Optional[Dict]:
+        """Interroge l'API VPS jusqu'à la fin d'un job"""
+        deadline = asyncio.get_running_loop().time() + self.job_timeout
+
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+
+            async with session.get(
+                f"{self.vps_api_url}/jobs/{job_id}",
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                if response.status != 200:
+                    self.logger.error(f"Status {response.status} pour le job VPS {job_id}")
+                    return None
+                data = await response.json()
+
+            if data.get('status') in ('done', 'failed'):
+                self.logger.info(
+                    f"Job VPS {data.get('keyword')}: {data.get('status')} "
+                    f"(attente {data.get('queue_seconds')}s, scraping {data.get('run_seconds')}s)"
+                )
+                return data
+
+        self.logger.error(f"Timeout du job VPS {job_id}")
+        return None
+
+    async def _search_keyword_sync(self, session: aiohttp.ClientSession, keyword: str,
+                                   metier: Dict, location: str) -> List[Dict]:
+        """Recherche via l'endpoint synchrone historique"""
+        async with session.post(
+            f"{self.vps_api_url}/scrape/indeed",
+            json=dict(self._build_request(location), keyword=keyword,
+                      seen_ids=self._seen_ids(keyword, location)),
+            headers=self.request_headers,
+            timeout=aiohttp.ClientTimeout(total=120)  # Timeout augmenté pour plusieurs pages
+        ) as response:
+            if response.status != 200:
+                self.failed = True
+                self.logger.error(f"Status {response.status} de l'API VPS")
+                return []
+
+            data = await response.json()
+            if not data.get('success'):
+                self.failed = True
+                self.logger.error(f"Erreur API VPS: {data.get('error')}")
+                return []
+
+            self._log_done(data)
+            self._remember(keyword, location, data)
+            return self._convert_api_jobs(data, metier)
+
+    def _convert_api_jobs(self, data: Dict, metier: Dict) -> List[Dict]:
+        """Convertit les offres renvoyées par l'API VPS"""
+        api_jobs = data.get('jobs', [])
+        self.logger.info(f"API VPS a retourné {len(api_jobs)} offres")
+
+        jobs = []
+        for api_job in api_jobs:
+            job = self._convert_api_job(api_job, metier)
+            if job and self._is_valid_job(job):
+                jobs.append(job)
         return jobs
 
     def _convert_api_job(self, api_job: Dict, metier: Dict) -> Optional[Dict]:
         """Convertit un job de l'API au format du bot"""
         try:
+            # L'API calcule l'ancienneté de l'offre depuis "il y a X minutes/heures"
+            minutes_ago = api_job.get('minutes_ago')
+            date_publication = datetime.utcnow()
+            if minutes_ago is not None:
+                date_publication -= timedelta(minutes=minutes_ago)
+
             return self.build_job_dict(
                 titre=api_job.get('titre', ''),
                 entreprise=api_job.get('entreprise', 'Non précisé'),
@@ -93,7 +284,7 @@ class IndeedVPSScraper(BaseScraper):
                 url=api_job.get('url', ''),
                 source_site=self.site_name,
                 external_id=api_job.get('external_id', ''),
-                date_publication=datetime.now(),
+                date_publication=date_publication,
                 metier_id=metier.get('id')
             )
         except Exception as e:
@@ -0,0 +1,87 @@
+"""
+Offre scrapée, stockée de façon compacte en attendant son enregistrement en base
+"""
+
+import sys
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from dedupe import identity_key as compute_identity_key
+
+# Champs de l'offre, dans l'ordre des colonnes d'OffreEmploi
+JOB_FIELDS = (
+    'titre', 'entreprise', 'description', 'lieu', 'latitude', 'longitude', 'salaire',
+    'url', 'source_site', 'external_id', 'date_publication', 'date_first_seen', 'metier_id',
+    'identity_key'
+)
+
+_FIELD_NAMES = frozenset(JOB_FIELDS)
+
+def to_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Date en UTC sans fuseau, comme les colonnes DateTime de la base
+
+    Une date avec fuseau (API: "...Z", "+02:00") est convertie; une date
+    naïve est déjà en UTC (les scrapers utilisent datetime.utcnow()).
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _intern(value):
+    """
+    Interne une chaîne (les autres valeurs sont retournées telles quelles)
+
+    Pour les valeurs répétées d'une offre à l'autre: une seule copie en mémoire.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+class JobRecord(Mapping):
+    """
+    Offre d'emploi scrapée
+
+    Un objet à slots plutôt qu'un dictionnaire par offre, avec les champs peu
+    variés (site, lieu, entreprise, salaire) internés. Les dates sont en UTC
+    naïf (converties si elles portent un fuseau). S'utilise comme un
+    dictionnaire en lecture: job['url'], job.get('titre'), et
+    values(**job) pour la ligne en base. identity_key (clé de
+    déduplication par source) est calculée si elle n'est pas fournie.
+    """
+
+    __slots__ = JOB_FIELDS
+
+    def __init__(self, titre: str = '', entreprise: str = '', description: str = '', lieu: str = '',
+                 latitude: Optional[float] = None, longitude: Optional[float] = None,
+                 salaire: Optional[str] = None, url: str = '', source_site: str = '',
+                 external_id: Optional[str] = None, date_publication: Optional[datetime] = None,
+                 date_first_seen: Optional[datetime] = None, metier_id: Optional[int] = None,
+                 identity_key: Optional[str] = None):
+        self.titre = titre
+        self.entreprise = _intern(entreprise)
+        self.description = description
+        self.lieu = _intern(lieu)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.salaire = _intern(salaire)
+        self.url = url
+        self.source_site = _intern(source_site)
+        self.external_id = external_id
+        self.date_publication = to_utc_naive(date_publication) if date_publication is not None else datetime.utcnow()
+        self.date_first_seen = to_utc_naive(date_first_seen) if date_first_seen is not None else datetime.utcnow()
+        self.metier_id = metier_id
+        self.identity_key = identity_key or compute_identity_key(source_site, url, external_id)
+
+    def __getitem__(self, key: str):
+        if key not in _FIELD_NAMES:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(JOB_FIELDS)
+
+    def __len__(self) -> int:
+        return len(JOB_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"JobRecord(source_site={self.source_site!r}, url={self.url!r}, titre={self.titre!r})"
@@ -4,44 +4,150 @@ Scraper pour La Bonne Alternance (API Pôle Emploi)
 
 import json
 import asyncio
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from typing import AsyncIterator, List, Dict, Optional
 from datetime import datetime
+from geo import geocode
 from .base import BaseScraper
 
+# Coordonnées par défaut quand la localisation est inconnue (Paris)
+DEFAULT_COORDINATES = {'latitude': 48.8566, 'longitude': 2.3522}
+
+# Nombre maximal de codes ROME acceptés par l'API dans le paramètre romes
+MAX_ROMES_PER_REQUEST = 20
+
+# Résultats du géocodage réseau (lieux absents du référentiel), partagés entre instances
+NETWORK_GEOCODE_CACHE_SIZE = 256
+_network_geocode_cache: 'OrderedDict[str, Optional[Dict]]' = OrderedDict()
+
 class LaBonneAlternanceScraper(BaseScraper):
     """Scraper utilisant l'API de La Bonne Alternance"""
 
+    provides_publication_time = True
+
     def __init__(self, config: Dict):
         super().__init__(config)
         self.site_name = "labonnealternance"
         self.api_url = config.get('api_url', 'https://labonnealternance.pole-emploi.fr/api/v1/jobs')
+        self.max_romes_per_request = config.get('max_romes_per_request', MAX_ROMES_PER_REQUEST)
+
+        # Offres préchargées par prefetch: localisation -> métier -> offres
+        self._prefetched: Dict[str, Dict] = {}
+
+    async def prefetch(self, metiers: List[Dict], location: str = None):
+        """
+        Recherche groupée pour tous les métiers du cycle
+
+        Les codes ROME de tous les métiers sont envoyés par lots dans le
+        paramètre romes, puis chaque offre est rendue aux métiers dont elle
+        porte le code ROME. Une offre sans code ROME lisible n'est pas
+        attribuée au hasard: elle est ignorée, et un lot où aucune offre n'en
+        porte (ou en échec) laisse ses métiers à la recherche individuelle,
+        code par code.
+        """
+        coordinates = await self._get_coordinates(location) if location else None
 
-    async def search_jobs(self, metier: Dict, location: str = None) -> List[Dict]:
-        """Recherche via l'API La Bonne Alternance"""
-        jobs = []
+        # code ROME -> métiers concernés
+        metiers_by_code: Dict[str, List[Dict]] = {}
+        for metier in metiers:
+            for code in self._get_rome_codes(metier):
+                metiers_by_code.setdefault(code, []).append(metier)
+
+        codes = list(metiers_by_code)
+        prefetched: Dict = {}
+        failed = set()
+        requests_count = 0
+        dropped_count = 0
+
+        for i in range(0, len(codes), self.max_romes_per_request):
+            batch = codes[i:i + self.max_romes_per_request]
+            batch_metiers = {self._metier_key(m): m for code in batch for m in metiers_by_code[code]}
 
-        # Utiliser les codes ROME si disponibles
-        rome_codes = self._get_rome_codes(metier)
+            params = {
+                'romes': ','.join(batch),
+                'radius': 30,
+                'sort': 'date'
+            }
+            params.update(coordinates or DEFAULT_COORDINATES)
+
+            data = await self.fetch_json(self.api_url, params)
+            requests_count += 1
+            if not data:
+                failed.update(batch_metiers)
+                continue
+
+            batch_jobs: Dict = {}
+            untagged_count = 0
+            for job_data in self._get_job_list(data):
+                job_codes = self._extract_rome_codes(job_data)
+                targets = {
+                    self._metier_key(m): m for code in batch if code in job_codes for m in metiers_by_code[code]
+                }
+                # Offre sans code ROME du lot: métier inconnu, la donner à tous serait faux
+                if not targets:
+                    untagged_count += 1
+                    continue
+
+                for key, metier in targets.items():
+                    job = self._parse_api_job(job_data, metier)
+                    if job and self._is_valid_job(job):
+                        batch_jobs.setdefault(key, []).append(job)
+
+            # Aucune offre attribuable: codes ROME illisibles, recherche individuelle
+            if untagged_count and not batch_jobs:
+                failed.update(batch_metiers)
+                continue
+
+            dropped_count += untagged_count
+            for key, jobs in batch_jobs.items():
+                prefetched.setdefault(key, []).extend(jobs)
+
+            for key in batch_metiers:
+                prefetched.setdefault(key, [])
+
+        # Un métier dont un lot a échoué repasse par la recherche individuelle
+        for key in failed:
+            prefetched.pop(key, None)
+
+        self._prefetched[location or ''] = prefetched
+        self.logger.info(
+            f"La Bonne Alternance: {len(codes)} codes ROME pour {len(metiers)} métiers "
+            f"en {requests_count} requête(s)"
+        )
+        if dropped_count:
+            self.logger.debug(f"La Bonne Alternance: {dropped_count} offre(s) sans code ROME ignorée(s)")
+
+    async def iter_jobs(self, metier: Dict, location: str = None) -> AsyncIterator[Dict]:
+        """Recherche via l'API La Bonne Alternance, offres produites à chaque réponse"""
         coordinates = await self._get_coordinates(location) if location else None
+        seen_keys = set()
 
-        for rome_code in rome_codes:
-            api_jobs = await self._search_by_rome(rome_code, metier, coordinates)
-            jobs.extend(api_jobs)
+        def unseen(jobs: List[Dict]):
+            """Dédupliquer (identité de l'offre)"""
+            for job in jobs:
+                if job['identity_key'] not in seen_keys:
+                    seen_keys.add(job['identity_key'])
+                    yield job
 
-        # Si pas de codes ROME, recherche par mots-clés
-        if not jobs:
-            keyword_jobs = await self._search_by_keywords(metier, coordinates)
-            jobs.extend(keyword_jobs)
+        # Résultats de la recherche groupée, sinon recherche individuelle
+        prefetched = self._prefetched.get(location or '', {}).pop(self._metier_key(metier), None)
+
+        if prefetched is not None:
+            for job in unseen(prefetched):
+                yield job
+        else:
+            # Utiliser les codes ROME si disponibles
+            for rome_code in self._get_rome_codes(metier):
+                for job in unseen(await self._search_by_rome(rome_code, metier, coordinates)):
+                    yield job
 
-        # Dédupliquer
-        unique_jobs = {}
-        for job in jobs:
-            job_key = f"{job.get('external_id', '')}{job.get('entreprise', '')}"
-            if job_key not in unique_jobs:
-                unique_jobs[job_key] = job
+        # Si pas de codes ROME, recherche par mots-clés
+        if not seen_keys:
+            async for keyword_jobs in self._search_by_keywords(metier, coordinates):
+                for job in unseen(keyword_jobs):
+                    yield job
 
-        self.logger.info(f"La Bonne Alternance: {len(unique_jobs)} offres trouvées pour {metier['nom']}")
-        return list(unique_jobs.values())
+        self.logger.info(f"La Bonne Alternance: {len(seen_keys)} offres trouvées pour {metier['nom']}")
 
     async def _search_by_rome(self, rome_code: str, metier: Dict, coordinates: Dict = None) -> List[Dict]:
         """Recherche par code ROME"""
@@ -51,11 +157,7 @@ class LaBonneAlternanceScraper(BaseScraper):
             'sort': 'date'
         }
 
-        if coordinates:
-            params.update(coordinates)
-        else:
-            # Coordonnées par défaut (Paris)
-            params.update({'latitude': 48.8566, 'longitude': 2.3522})
+        params.update(coordinates or DEFAULT_COORDINATES)
 
         data = await self.fetch_json(self.api_url, params)
         if not data:
@@ -63,9 +165,8 @@ class LaBonneAlternanceScraper(BaseScraper):
 
         return self._parse_api_response(data, metier)
 
-    async def _search_by_keywords(self, metier: Dict, coordinates: Dict = None) -> List[Dict]:
-        """Recherche par mots-clés quand pas de code ROME"""
-        jobs = []
+    async def _search_by_keywords(self, metier: Dict, coordinates: Dict = None) -> AsyncIterator[List[Dict]]:
+        """Recherche par mots-clés quand pas de code ROME (offres par mot-clé)"""
         keywords = self._build_keywords(metier)
 
         for keyword in keywords[:2]:
@@ -76,28 +177,43 @@ class LaBonneAlternanceScraper(BaseScraper):
                 'radius': 30
             }
 
-            if coordinates:
-                params.update(coordinates)
-            else:
-                params.update({'latitude': 48.8566, 'longitude': 2.3522})
+            params.update(coordinates or DEFAULT_COORDINATES)
 
             data = await self.fetch_json(self.api_url, params)
             if data:
-                keyword_jobs = self._parse_api_response(data, metier)
-                jobs.extend(keyword_jobs)
+                yield self._parse_api_response(data, metier)
 
             await asyncio.sleep(1)
 
-        return jobs
+    @staticmethod
+    def _metier_key(metier: Dict):
+        """Identifiant d'un métier pour les résultats préchargés"""
+        return metier.get('id') or metier.get('nom')
+
+    @staticmethod
+    def _get_job_list(data: Dict) -> List[Dict]:
+        """Liste brute des offres d'une réponse"""
+        # L'API peut retourner différents formats
+        return data.get('jobs', []) or data.get('peJobs', []) or data.get('matchas', [])
+
+    @staticmethod
+    def _extract_rome_codes(job_data: Dict) -> set:
+        """Codes ROME portés par une offre (formats romes, job.romeCode, romeCode)"""
+        codes = set()
+        for value in (job_data.get('romes'), job_data.get('romeCode'), (job_data.get('job') or {}).get('romeCode')):
+            if not value:
+                continue
+            for item in value if isinstance(value, list) else [value]:
+                code = item.get('code') if isinstance(item, dict) else item
+                if isinstance(code, str):
+                    codes.add(code)
+        return codes
 
     def _parse_api_response(self, data: Dict, metier: Dict) -> List[Dict]:
         """Parse la réponse de l'API"""
         jobs = []
 
-        # L'API peut retourner différents formats
-        job_list = data.get('jobs', []) or data.get('peJobs', []) or data.get('matchas', [])
-
-        for job_data in job_list:
+        for job_data in self._get_job_list(data):
             job = self._parse_api_job(job_data, metier)
             if job and self._is_valid_job(job):
                 jobs.append(job)
@@ -114,8 +230,10 @@ class LaBonneAlternanceScraper(BaseScraper):
 
             # Localisation
             lieu_data = job_data.get('place', {}) or job_data.get('lieuTravail', {})
+            latitude = longitude = None
             if isinstance(lieu_data, dict):
                 lieu = f"{lieu_data.get('city', '')} ({lieu_data.get('zipCode', '')})".strip(' ()')
+                latitude, longitude = lieu_data.get('latitude'), lieu_data.get('longitude')
             else:
                 lieu = str(lieu_data) if lieu_data else ""
 
@@ -145,9 +263,9 @@ class LaBonneAlternanceScraper(BaseScraper):
                 try:
                     date_publication = datetime.fromisoformat(date_pub.replace('Z', '+00:00'))
                 except:
-                    date_publication = datetime.now()
+                    date_publication = datetime.utcnow()
             else:
-                date_publication = datetime.now()
+                date_publication = datetime.utcnow()
 
             # Vérifier que c'est une alternance
             if not self.is_alternance_related(titre, description):
@@ -158,6 +276,8 @@ class LaBonneAlternanceScraper(BaseScraper):
                 entreprise=entreprise,
                 description=description,
                 lieu=lieu,
+                latitude=latitude,
+                longitude=longitude,
                 salaire=salaire,
                 url=url,
                 source_site=self.site_name,
@@ -196,26 +316,55 @@ class LaBonneAlternanceScraper(BaseScraper):
         return codes or ['M1805']  # Code par défaut (informatique)
 
     async def _get_coordinates(self, location: str) -> Optional[Dict]:
-        """Récupère les coordonnées d'une ville (API géocodage simple)"""
+        """
+        Récupère les coordonnées d'une ville
+
+        Le référentiel hors ligne (avec cache LRU) répond en quelques
+        microsecondes ; l'API adresse n'est appelée que pour les lieux inconnus,
+        et son résultat est gardé en cache pour les cycles suivants.
+        """
         if not location:
             return None
 
+        coords = geocode(location)
+        if coords:
+            return {'latitude': coords[0], 'longitude': coords[1]}
+
+        if location in _network_geocode_cache:
+            _network_geocode_cache.move_to_end(location)
+            return _network_geocode_cache[location]
+
+        result = None
         try:
             # Utiliser l'API du gouvernement français
             geo_api = "https://api-adresse.data.gouv.fr/search/"
             params = {'q': location, 'limit': 1}
 
             data = await self.fetch_json(geo_api, params)
-            if data and data.get('features'):
+            if data is None:
+                # Erreur réseau ou réponse non 200: ne pas mettre en cache
+                return None
+            if data.get('features'):
                 coords = data['features'][0]['geometry']['coordinates']
-                return {
+                result = {
                     'longitude': coords[0],
                     'latitude': coords[1]
                 }
         except Exception as e:
             self.logger.warning(f"Erreur géocodage pour {location}: {e}")
+            return None  # Erreur réseau: ne pas mettre en cache
+
+        # Réponse valide sans résultat: lieu réellement introuvable, mis en cache
+        if not result:
+            self.logger.warning(
+                f"Localisation '{location}' introuvable, recherche autour des coordonnées par défaut (Paris)"
+            )
+
+        _network_geocode_cache[location] = result
+        if len(_network_geocode_cache) > NETWORK_GEOCODE_CACHE_SIZE:
+            _network_geocode_cache.popitem(last=False)
 
-        return None
+        return result
 
     def _build_keywords(self, metier: Dict) -> List[str]:
         """Construit les mots-clés de recherche"""
@@ -0,0 +1,86 @@
+"""
+Identifiants d'offres déjà reçus par recherche, conservés entre deux cycles
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, List
+
+from .base import DATA_DIR
+
+# Une offre "publiée aujourd'hui" reste dans les résultats toute la journée
+SEEN_IDS_TTL = 48 * 3600
+MAX_IDS_PER_QUERY = 1000
+
+class SeenIdStore:
+    """Identifiants vus par requête (mot-clé, localisation), persistés en JSON"""
+
+    def __init__(self, name: str, directory: str = DATA_DIR,
+                 ttl: int = SEEN_IDS_TTL, max_ids: int = MAX_IDS_PER_QUERY):
+        self.path = os.path.join(directory, f"seen_ids_{name}.json")
+        self.ttl = ttl
+        self.max_ids = max_ids
+        self.logger = logging.getLogger(__name__)
+
+        # clé de requête -> {identifiant: timestamp de dernière vue}
+        self.queries: Dict[str, Dict[str, float]] = {}
+        self._load()
+
+    @staticmethod
+    def query_key(keyword: str, location: str) -> str:
+        """Clé normalisée d'une requête"""
+        return f"{(keyword or '').strip().lower()}|{(location or '').strip().lower()}"
+
+    def _load(self):
+        """Charge le fichier s'il existe"""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                self.queries = json.load(file)
+        except Exception as e:
+            self.logger.warning(f"Impossible de charger {self.path}: {e}")
+            self.queries = {}
+
+    def _prune(self, ids: Dict[str, float]) -> Dict[str, float]:
+        """Retire les identifiants expirés et garde les plus récents"""
+        limit = time.time() - self.ttl
+        recent = sorted(((ts, job_id) for job_id, ts in ids.items() if ts >= limit), reverse=True)
+        return {job_id: ts for ts, job_id in recent[:self.max_ids]}
+
+    def get(self, keyword: str, location: str) -> List[str]:
+        """Identifiants déjà vus pour une requête"""
+        ids = self.queries.get(self.query_key(keyword, location), {})
+        return list(self._prune(ids))
+
+    def add(self, keyword: str, location: str, ids: Iterable[str]):
+        """Marque des identifiants comme vus pour une requête"""
+        now = time.time()
+        query_ids = self.queries.setdefault(self.query_key(keyword, location), {})
+        for job_id in ids:
+            if job_id:
+                query_ids[job_id] = now
+
+    def save(self):
+        """Écrit le fichier (écriture atomique)"""
+        self.queries = {key: pruned for key, ids in self.queries.items() if (pruned := self._prune(ids))}
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.queries, file)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"Impossible d'enregistrer {self.path}: {e}")
+
+_stores: Dict[str, SeenIdStore] = {}
+
+def get_seen_store(name: str) -> SeenIdStore:
+    """Retourne le store partagé d'un site (les scrapers sont recréés à chaque cycle)"""
+    if name not in _stores:
+        _stores[name] = SeenIdStore(name)
+    return _stores[name]
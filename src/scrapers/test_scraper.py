@@ -11,6 +11,8 @@ from .base import BaseScraper
 class TestScraper(BaseScraper):
     """Scraper de test qui génère des offres d'alternance factices"""
 
+    provides_publication_time = True
+
     def __init__(self, config: Dict):
         super().__init__(config)
         self.site_name = "test"
@@ -94,7 +96,7 @@ class TestScraper(BaseScraper):
 
         # Date de publication récente (entre aujourd'hui et 7 jours avant)
         days_ago = random.randint(0, 7)
-        date_publication = datetime.now() - timedelta(days=days_ago)
+        date_publication = datetime.utcnow() - timedelta(days=days_ago)
 
         return self.build_job_dict(
             titre=titre,
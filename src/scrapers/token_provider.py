@@ -0,0 +1,161 @@
+"""
+Tokens OAuth2 (client credentials) partagés entre les instances de scrapers et persistés entre les redémarrages
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from .base import DATA_DIR
+
+# Renouvellement anticipé: un token qui expire dans moins de 5 min est redemandé
+REFRESH_MARGIN = 300
+
+class OAuthTokenProvider:
+    """
+    Token d'accès d'un client OAuth2, demandé une seule fois pour tous les scrapers
+
+    Un seul renouvellement à la fois (les appels concurrents attendent le même
+    résultat). Le token et son expiration sont enregistrés dans un fichier
+    local lisible uniquement par l'utilisateur.
+    """
+
+    def __init__(self, name: str, token_url: str, client_id: str, client_secret: str,
+                 scope: str = None, directory: str = DATA_DIR):
+        self.path = os.path.join(directory, f"token_{name}.json")
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.logger = logging.getLogger(__name__)
+
+        self.access_token: Optional[str] = None
+        self.expires_at = 0.0
+        self.request_times: List[float] = []  # Demandes de token des dernières 24h
+
+        self._lock = None
+        self._lock_loop = None
+        self._load()
+
+    def _load(self):
+        """Charge le token enregistré s'il appartient au même client"""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get('client_id') == self.client_id:
+                self.access_token = data.get('access_token')
+                self.expires_at = data.get('expires_at', 0.0)
+            self.request_times = data.get('request_times', [])
+        except Exception as e:
+            self.logger.warning(f"Impossible de charger {self.path}: {e}")
+
+    def _save(self):
+        """Écrit le fichier (écriture atomique, permissions 600)"""
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump({'client_id': self.client_id, 'access_token': self.access_token,
+                           'expires_at': self.expires_at, 'request_times': self.request_times}, file)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"Impossible d'enregistrer {self.path}: {e}")
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Verrou du renouvellement (recréé si la boucle asyncio change, ex: scripts de test)"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def is_fresh(self) -> bool:
+        """True si le token est valide au-delà de la marge de renouvellement"""
+        return bool(self.access_token) and time.time() < self.expires_at - REFRESH_MARGIN
+
+    def invalidate(self):
+        """Oublie le token (refusé par l'API): le prochain appel en redemande un"""
+        self.access_token = None
+        self.expires_at = 0.0
+        self._save()
+
+    def requests_last_hour(self) -> int:
+        """Nombre de demandes de token sur la dernière heure"""
+        limit = time.time() - 3600
+        return sum(1 for ts in self.request_times if ts >= limit)
+
+    async def get_token(self, session) -> Optional[str]:
+        """
+        Retourne un token valide, renouvelé avant expiration si besoin
+
+        Args:
+            session: session aiohttp utilisée pour la demande de token
+        """
+        if self.is_fresh():
+            return self.access_token
+
+        async with self._get_lock():
+            # Un autre appel a pu renouveler le token pendant l'attente
+            if self.is_fresh():
+                return self.access_token
+
+            token = await self._request_token(session)
+            if token:
+                return token
+
+            # Échec du renouvellement anticipé: l'ancien token reste utilisable jusqu'à expiration
+            if self.access_token and time.time() < self.expires_at:
+                return self.access_token
+            return None
+
+    async def _request_token(self, session) -> Optional[str]:
+        """Demande un nouveau token (client credentials)"""
+        data = {
+            'grant_type': 'client_credentials',
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+        }
+        if self.scope:
+            data['scope'] = self.scope
+
+        now = time.time()
+        self.request_times = [ts for ts in self.request_times if ts >= now - 24 * 3600] + [now]
+
+        try:
+            async with session.post(
+                self.token_url,
+                data=data,
+                headers={'Content-Type': 'application/x-www-form-urlencoded'}
+            ) as response:
+                if response.status == 200:
+                    payload = await response.json()
+                    self.access_token = payload['access_token']
+                    self.expires_at = now + payload.get('expires_in', 3600)
+                    self.logger.info(f"🔑 Token obtenu ({self.requests_last_hour()} demande(s) sur la dernière heure)")
+                    return self.access_token
+                else:
+                    error = await response.text()
+                    self.logger.error(f"Erreur obtention token: {response.status} - {error}")
+                    return None
+        except Exception as e:
+            self.logger.error(f"Exception lors de l'obtention du token: {e}")
+            return None
+        finally:
+            self._save()
+
+_providers: Dict[str, OAuthTokenProvider] = {}
+
+def get_token_provider(name: str, token_url: str, client_id: str, client_secret: str,
+                       scope: str = None) -> OAuthTokenProvider:
+    """Retourne le fournisseur partagé d'un client (les scrapers sont recréés à chaque cycle)"""
+    key = f"{name}|{client_id}"
+    if key not in _providers:
+        _providers[key] = OAuthTokenProvider(name, token_url, client_id, client_secret, scope)
+    return _providers[key]
@@ -0,0 +1,60 @@
+"""
+Repères de synchronisation par requête (date de l'offre la plus récente, dernière synchro complète)
+"""
+
+import json
+import logging
+import os
+from typing import Dict
+
+from .base import DATA_DIR
+
+class WatermarkStore:
+    """Repères par requête persistés en JSON, conservés entre les cycles et les redémarrages"""
+
+    def __init__(self, name: str, directory: str = DATA_DIR):
+        self.path = os.path.join(directory, f"watermarks_{name}.json")
+        self.logger = logging.getLogger(__name__)
+
+        # clé de requête -> {'watermark': ..., 'full_sync_at': ...}
+        self.queries: Dict[str, Dict] = {}
+        self._load()
+
+    def _load(self):
+        """Charge le fichier s'il existe"""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                self.queries = json.load(file)
+        except Exception as e:
+            self.logger.warning(f"Impossible de charger {self.path}: {e}")
+            self.queries = {}
+
+    def get(self, key: str) -> Dict:
+        """Repères d'une requête (dictionnaire vide si jamais synchronisée)"""
+        return self.queries.get(key, {})
+
+    def update(self, key: str, **values):
+        """Met à jour les repères d'une requête"""
+        self.queries.setdefault(key, {}).update(values)
+
+    def save(self):
+        """Écrit le fichier (écriture atomique)"""
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.queries, file)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"Impossible d'enregistrer {self.path}: {e}")
+
+_stores: Dict[str, WatermarkStore] = {}
+
+def get_watermark_store(name: str) -> WatermarkStore:
+    """Retourne le store partagé d'un site (les scrapers sont recréés à chaque cycle)"""
+    if name not in _stores:
+        _stores[name] = WatermarkStore(name)
+    return _stores[name]
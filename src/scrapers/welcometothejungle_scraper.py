@@ -4,47 +4,271 @@ Scraper pour Welcome to the Jungle France
 
 import json
 import asyncio
-from typing import List, Dict, Optional
+import re
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
 from urllib.parse import urlencode
+from geo import geocode
 from .base import BaseScraper
 
+# Configuration de la recherche Algolia embarquée dans les pages (window.env = {...})
+ALGOLIA_ENV_PATTERN = re.compile(r'window\.env\s*=\s*')
+ALGOLIA_HITS_PER_PAGE = 30
+# Réplique de l'index triée par date de publication (plus récentes d'abord)
+ALGOLIA_DATE_REPLICA_SUFFIX = '_published_at_desc'
+
+# Types de contrat WTTJ correspondant à l'alternance
+ALTERNANCE_CONTRACT_TYPES = ['apprenticeship']
+
+SALARY_PERIODS = {'yearly': 'par an', 'monthly': 'par mois', 'daily': 'par jour', 'hourly': 'de l\'heure'}
+
+_json_decoder = json.JSONDecoder()
+
+# Identifiants Algolia découverts une fois par processus (les scrapers sont recréés à chaque cycle)
+_algolia_config: Optional[Dict] = None
+
+def extract_algolia_config(html: str) -> Optional[Dict]:
+    """
+    Extrait l'application, la clé de recherche publique et l'index Algolia d'une page WTTJ
+
+    Returns:
+        {'app_id', 'api_key', 'index'} ou None si absents
+    """
+    match = ALGOLIA_ENV_PATTERN.search(html)
+    if not match:
+        return None
+
+    try:
+        env, _ = _json_decoder.raw_decode(html, match.end())
+        return {
+            'app_id': env['ALGOLIA_APPLICATION_ID'],
+            'api_key': env['ALGOLIA_API_KEY_CLIENT'],
+            'index': f"{env['ALGOLIA_JOBS_INDEX_PREFIX']}_fr",
+        }
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def parse_search_response(payload: Dict) -> Tuple[List[Dict], int]:
+    """
+    Offres brutes et nombre de pages d'une réponse de recherche Algolia
+
+    Accepte la réponse multi-requêtes ({"results": [...]}) ou un résultat seul.
+    """
+    result = (payload.get('results') or [payload])[0]
+    return result.get('hits', []), result.get('nbPages', 0)
+
 class WelcomeToTheJungleScraper(BaseScraper):
-    """Scraper spécialisé pour Welcome to the Jungle France"""
+    """
+    Scraper spécialisé pour Welcome to the Jungle France
+
+    Mode 'structured' (défaut): recherche via l'index Algolia utilisé par le
+    site lui-même, réponses JSON. Mode 'html': parsing des pages de résultats,
+    aussi utilisé en repli si la recherche structurée échoue.
+    """
 
     def __init__(self, config: Dict):
         super().__init__(config)
         self.site_name = "welcometothejungle"
         self.search_path = config.get('search_path', '/fr/jobs')
+        self.mode = config.get('mode', 'structured')
+        self.contract_types = config.get('contract_types', ALTERNANCE_CONTRACT_TYPES)
 
-    async def search_jobs(self, metier: Dict, location: str = None) -> List[Dict]:
-        """Recherche des offres sur Welcome to the Jungle"""
-        jobs = []
+        # Les offres Algolia portent leur vraie date de publication
+        self.provides_publication_time = self.mode == 'structured'
+
+    async def iter_jobs(self, metier: Dict, location: str = None) -> AsyncIterator[Dict]:
+        """Recherche des offres sur Welcome to the Jungle, produites page par page (dédupliquées par identité)"""
         keywords = self._build_keywords(metier)
+        seen_keys = set()
 
         for keyword in keywords[:2]:  # Limiter les recherches
-            page_jobs = await self._search_keyword(keyword, metier, location)
-            jobs.extend(page_jobs)
+            async for page_jobs in self._search_keyword(keyword, metier, location):
+                for job in page_jobs:
+                    if job['identity_key'] not in seen_keys:
+                        seen_keys.add(job['identity_key'])
+                        yield job
             await asyncio.sleep(2)
 
-        # Dédupliquer
-        unique_jobs = {}
-        for job in jobs:
-            if job['url'] not in unique_jobs:
-                unique_jobs[job['url']] = job
+        self.logger.info(f"WTTJ: {len(seen_keys)} offres trouvées pour {metier['nom']}")
+
+    async def _search_keyword(self, keyword: str, metier: Dict, location: str) -> AsyncIterator[List[Dict]]:
+        """Effectue une recherche pour un mot-clé spécifique (offres par page)"""
+        if self.mode == 'structured':
+            algolia = await self._get_algolia_config()
+            if algolia:
+                search = {}
+                async for page_jobs in self._search_keyword_algolia(algolia, keyword, metier, location, search):
+                    yield page_jobs
+                # Algolia a répondu: pas de repli, même sans offre
+                if 'nb_pages' in search:
+                    return
+
+            self.logger.warning("Recherche structurée WTTJ indisponible, repli sur le HTML")
+
+        async for page_jobs in self._search_keyword_html(keyword, metier, location):
+            yield page_jobs
+
+    def _search_keyword_algolia(self, algolia: Dict, keyword: str, metier: Dict, location: str,
+                                search: Dict) -> AsyncIterator[List[Dict]]:
+        """
+        Recherche un mot-clé via Algolia (offres par page)
+
+        Passe par paginate (préchargement, limiteur par hôte, repère de la
+        requête: les résultats viennent de la réplique triée par date). search
+        reçoit nb_pages dès la première réponse: les pages au-delà ne sont pas
+        demandées.
+        """
+        async def fetch(page: int) -> Optional[List[Dict]]:
+            if page >= search.get('nb_pages', page + 1):
+                return []
+
+            result = await self._fetch_algolia_page(algolia, keyword, metier, location, page)
+            if result is None:
+                return None
+            page_jobs, search['nb_pages'] = result
+            return page_jobs
+
+        # Offres filtrées au parsing: seule une page vide marque la fin
+        return self.paginate(fetch, self.config.get('max_pages', 3), page_size=1,
+                             label=f"WTTJ Algolia '{keyword}'", query=(keyword, location))
+
+    async def _get_algolia_config(self) -> Optional[Dict]:
+        """Identifiants Algolia: configuration, sinon découverts sur la page de recherche"""
+        global _algolia_config
+
+        if self.config.get('algolia_app_id') and self.config.get('algolia_api_key'):
+            return {
+                'app_id': self.config['algolia_app_id'],
+                'api_key': self.config['algolia_api_key'],
+                'index': self.config.get('algolia_index', 'wttj_jobs_production_fr'),
+            }
+
+        if _algolia_config is None:
+            html = await self.fetch_page(f"{self.base_url}{self.search_path}")
+            if not html:
+                return None  # Réessayé au prochain appel
+            # {} : page lue mais sans configuration, inutile de la redemander
+            _algolia_config = extract_algolia_config(html) or {}
+        return _algolia_config or None
+
+    def _build_algolia_request(self, algolia: Dict, keyword: str, location: str, page: int) -> Dict:
+        """Corps de la requête de recherche Algolia"""
+        params = {
+            'query': keyword,
+            'page': page,
+            'hitsPerPage': ALGOLIA_HITS_PER_PAGE,
+            'filters': ' OR '.join(f"contract_type:{contract}" for contract in self.contract_types),
+        }
+
+        coords = geocode(location) if location else None
+        if coords:
+            params['aroundLatLng'] = f"{coords[0]},{coords[1]}"
+            params['aroundRadius'] = 30000
+
+        # Tri par date: nouvelles offres en premières pages, repère de pagination utilisable
+        index = self.config.get('algolia_sorted_index') or f"{algolia['index']}{ALGOLIA_DATE_REPLICA_SUFFIX}"
+        return {'requests': [{'indexName': index, 'params': urlencode(params)}]}
+
+    async def _fetch_algolia_page(self, algolia: Dict, keyword: str, metier: Dict,
+                                  location: str, page: int) -> Optional[Tuple[List[Dict], int]]:
+        """
+        Une page de la recherche via l'index Algolia de WTTJ
+
+        Returns:
+            (offres, nombre de pages) ou None si la recherche a échoué
+        """
+        url = f"https://{algolia['app_id']}-dsn.algolia.net/1/indexes/*/queries"
+        headers = {
+            'X-Algolia-Application-Id': algolia['app_id'],
+            'X-Algolia-API-Key': algolia['api_key'],
+            'Referer': f"{self.base_url}/",
+            'Origin': self.base_url,
+        }
+        body = self._build_algolia_request(algolia, keyword, location, page)
 
-        self.logger.info(f"WTTJ: {len(unique_jobs)} offres trouvées pour {metier['nom']}")
-        return list(unique_jobs.values())
+        try:
+            async with self.session.post(url, json=body, headers=headers) as response:
+                if response.status != 200:
+                    self.logger.warning(f"HTTP {response.status} pour la recherche Algolia WTTJ")
+                    return None
+                payload = await response.json()
+        except Exception as e:
+            self.logger.error(f"Erreur recherche Algolia WTTJ: {e}")
+            return None
 
-    async def _search_keyword(self, keyword: str, metier: Dict, location: str) -> List[Dict]:
-        """Effectue une recherche pour un mot-clé spécifique"""
+        hits, nb_pages = parse_search_response(payload)
         jobs = []
+        for hit in hits:
+            job = self._parse_hit(hit, metier)
+            if job and self._is_valid_job(job):
+                jobs.append(job)
+        return jobs, nb_pages
+
+    def _parse_hit(self, hit: Dict, metier: Dict) -> Optional[Dict]:
+        """Convertit une offre Algolia"""
+        try:
+            organization = hit.get('organization') or {}
+            slug = hit.get('slug')
+            titre = self.clean_text(hit.get('name', ''))
+            if not slug or not organization.get('slug') or not titre:
+                return None
+
+            description = self.clean_text(hit.get('summary') or '')
+
+            # Le filtre de contrat suffit; sinon vérifier le texte
+            if hit.get('contract_type') not in self.contract_types and \
+                    not self.is_alternance_related(titre, description):
+                return None
+
+            offices = hit.get('offices') or [{}]
+            geoloc = hit.get('_geoloc') or [{}]
+
+            published_at = hit.get('published_at')
+            try:
+                date_publication = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+            except (AttributeError, ValueError):
+                date_publication = datetime.utcnow()
+
+            return self.build_job_dict(
+                titre=titre,
+                entreprise=self.clean_text(organization.get('name', '')),
+                description=description[:500],
+                lieu=offices[0].get('city') or '',
+                latitude=geoloc[0].get('lat'),
+                longitude=geoloc[0].get('lng'),
+                salaire=self._format_salary(hit),
+                url=f"{self.base_url}/fr/companies/{organization['slug']}/jobs/{slug}",
+                source_site=self.site_name,
+                external_id=hit.get('reference') or hit.get('objectID') or slug,
+                date_publication=date_publication,
+                metier_id=metier.get('id')
+            )
+
+        except Exception as e:
+            self.logger.error(f"Erreur parsing WTTJ Algolia: {e}")
+            return None
+
+    @staticmethod
+    def _format_salary(hit: Dict) -> Optional[str]:
+        """Salaire lisible depuis les champs salary_* d'une offre"""
+        minimum, maximum = hit.get('salary_minimum'), hit.get('salary_maximum')
+        if not minimum and not maximum:
+            return None
+
+        amount = f"{minimum} - {maximum}" if minimum and maximum and minimum != maximum else str(minimum or maximum)
+        currency = '€' if hit.get('salary_currency') in (None, 'EUR') else hit['salary_currency']
+        period = SALARY_PERIODS.get(hit.get('salary_period'), '')
+        return f"{amount} {currency} {period}".strip()
+
+    def _search_keyword_html(self, keyword: str, metier: Dict, location: str) -> AsyncIterator[List[Dict]]:
+        """Effectue une recherche pour un mot-clé en parsant les pages HTML (offres par page)"""
         max_pages = self.config.get('max_pages', 3)
+        url = f"{self.base_url}{self.search_path}"
 
-        for page in range(1, max_pages + 1):
+        async def fetch(page: int) -> Optional[List[Dict]]:
             params = {
                 'query': f"{keyword} alternance",
-                'page': page,
+                'page': page + 1,
                 'contractType': 'APPRENTICESHIP,INTERNSHIP',
                 'sortBy': 'date'
             }
@@ -52,22 +276,14 @@ class WelcomeToTheJungleScraper(BaseScraper):
             if location:
                 params['aroundQuery'] = location
 
-            url = f"{self.base_url}{self.search_path}"
             html = await self.fetch_page(url, params)
-
             if not html:
-                break
-
-            page_jobs = self._parse_search_page(html, metier)
-            jobs.extend(page_jobs)
-
-            # Arrêter si pas de résultats
-            if len(page_jobs) == 0:
-                break
-
-            await asyncio.sleep(1)
+                return None
+            return self._parse_search_page(html, metier)
 
-        return jobs
+        # Arrêter si pas de résultats
+        return self.paginate(fetch, max_pages, page_size=1, label=f"WTTJ '{keyword}'",
+                             query=(keyword, location))
 
     def _parse_search_page(self, html: str, metier: Dict) -> List[Dict]:
         """Parse une page de résultats WTTJ"""
@@ -140,7 +356,7 @@ class WelcomeToTheJungleScraper(BaseScraper):
                 url=job_url,
                 source_site=self.site_name,
                 external_id=external_id,
-                date_publication=datetime.now(),
+                date_publication=datetime.utcnow(),
                 metier_id=metier.get('id')
             )
 
@@ -0,0 +1,157 @@
+"""
+Histogrammes de latence du pipeline (publication -> détection -> stockage -> Discord)
+"""
+
+from typing import Dict, List, Optional
+from datetime import datetime
+
+# Bornes supérieures des buckets, en secondes
+LATENCY_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 21600, 86400)
+
+# Étapes mesurées, dans l'ordre du pipeline
+STAGES = ('source_to_seen', 'seen_to_stored', 'stored_to_sent')
+
+STAGE_LABELS = {
+    'source_to_seen': 'Publication → détection',
+    'seen_to_stored': 'Détection → stockage',
+    'stored_to_sent': 'Stockage → Discord'
+}
+
+def format_duration(seconds: float) -> str:
+    """Formate une durée en secondes de façon lisible"""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f}min"
+    return f"{seconds / 3600:.1f}h"
+
+class LatencyHistogram:
+    """Histogramme à buckets fixes (compatible avec le format Prometheus)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Dernier bucket: au-delà de la dernière borne
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        """Ajoute une mesure"""
+        seconds = max(0.0, seconds)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Estime un percentile (borne supérieure du bucket qui le contient)"""
+        if not self.count:
+            return None
+
+        target = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        """Exporte l'histogramme"""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'max': self.max if self.count else None,
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts))
+        }
+
+class LatencyMetrics:
+    """Registre des histogrammes par (étape, site)"""
+
+    def __init__(self):
+        self.histograms: Dict[tuple, LatencyHistogram] = {}
+
+    def observe(self, stage: str, site: str, seconds: float):
+        """Ajoute une mesure pour une étape et un site"""
+        key = (stage, site)
+        if key not in self.histograms:
+            self.histograms[key] = LatencyHistogram()
+        self.histograms[key].observe(seconds)
+
+    def record_stored(self, offre, publication_known: bool = True):
+        """
+        Enregistre les latences d'ingestion d'une offre qui vient d'être stockée
+
+        Args:
+            offre: OffreEmploi fraîchement insérée
+            publication_known: False si le site ne fournit pas de date de
+                publication (la date stockée est alors l'heure du scraping)
+        """
+        if not offre.date_first_seen:
+            return
+
+        site = offre.source_site
+        if publication_known and offre.date_publication:
+            self.observe('source_to_seen', site,
+                         (offre.date_first_seen - offre.date_publication).total_seconds())
+
+        if offre.date_scraped:
+            self.observe('seen_to_stored', site,
+                         (offre.date_scraped - offre.date_first_seen).total_seconds())
+
+    def record_sent(self, offre, sent_at: datetime = None):
+        """Enregistre la latence stockage -> envoi Discord d'une offre"""
+        if not offre.date_scraped:
+            return
+
+        sent_at = sent_at or datetime.utcnow()
+        self.observe('stored_to_sent', offre.source_site,
+                     (sent_at - offre.date_scraped).total_seconds())
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """Retourne {étape: {site: histogramme}}"""
+        snapshot = {stage: {} for stage in STAGES}
+        for (stage, site), histogram in sorted(self.histograms.items()):
+            snapshot.setdefault(stage, {})[site] = histogram.to_dict()
+        return snapshot
+
+    def summary_lines(self) -> List[str]:
+        """Résumé lisible (une ligne par étape et par site)"""
+        lines = []
+        for stage, sites in self.snapshot().items():
+            for site, data in sites.items():
+                if not data['count']:
+                    continue
+                lines.append(
+                    f"• **{STAGE_LABELS.get(stage, stage)}** ({site}): "
+                    f"p50 ≤ {format_duration(data['p50'])}, p95 ≤ {format_duration(data['p95'])} "
+                    f"({data['count']} offres)"
+                )
+        return lines
+
+    def to_prometheus(self) -> str:
+        """Exporte les histogrammes au format texte Prometheus"""
+        lines = [
+            "# HELP alternance_latency_seconds Latence du pipeline par étape et par site",
+            "# TYPE alternance_latency_seconds histogram"
+        ]
+        for (stage, site), histogram in sorted(self.histograms.items()):
+            labels = f'stage="{stage}",site="{site}"'
+            cumulative = 0
+            for bound, bucket_count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'alternance_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'alternance_latency_seconds_sum{{{labels}}} {histogram.total}')
+            lines.append(f'alternance_latency_seconds_count{{{labels}}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+# Registre partagé par le bot, le monitoring et le dispatcher
+latency_metrics = LatencyMetrics()
@@ -12,6 +12,8 @@ from database.manager import DatabaseManager
 from scrapers import get_scraper, SCRAPERS
 from config.settings import Settings
 from discord_bot.webhook import WebhookNotifier
+from discord_bot.dispatcher import NotificationDispatcher
+from utils.latency import latency_metrics
 
 class MonitoringManager:
     """Gestionnaire principal du monitoring des offres d'alternance"""
@@ -20,8 +22,12 @@ class MonitoringManager:
         self.settings = settings
         self.db_manager = db_manager
         self.webhook_notifier = webhook_notifier
+        self.dispatcher = NotificationDispatcher(settings, db_manager, webhook_notifier)
         self.logger = logging.getLogger(__name__)
 
+        # Zone de recherche des cycles de monitoring (None: recherche nationale)
+        self.location = settings.scraping.default_location
+
         # Statistiques du monitoring
         self.monitoring_stats = {
             'last_run': None,
@@ -66,6 +72,7 @@ class MonitoringManager:
             # Envoyer les notifications
             notification_count = await self._send_pending_notifications()
             cycle_stats['total_notifications'] = notification_count
+            cycle_stats['latency'] = latency_metrics.snapshot()
 
             # Calculer la durée du cycle
             end_time = datetime.now()
@@ -113,6 +120,9 @@ class MonitoringManager:
             self.logger.info(f"🔍 Monitoring {site_name} pour {len(metiers)} métiers")
 
             async with scraper:
+                # Requêtes groupées pour tous les métiers quand le site le permet
+                await scraper.prefetch([metier.to_dict() for metier in metiers], location=self.location)
+
                 # Semaphore pour limiter les requêtes concurrentes
                 semaphore = asyncio.Semaphore(self.settings.scraping.max_concurrent_requests)
 
@@ -136,16 +146,20 @@ class MonitoringManager:
         """Monitore un métier spécifique sur un site"""
         async with semaphore:
             try:
-                # Rechercher des offres pour ce métier (avec localisation par défaut)
-                jobs = await scraper.search_jobs(metier, location="Île-de-France")
-                site_stats['jobs_found'] += len(jobs)
-
-                # Sauvegarder les nouvelles offres
+                # Rechercher des offres pour ce métier (avec localisation par défaut),
+                # sauvegardées au fil de l'eau
                 new_jobs = []
-                for job in jobs:
-                    saved_job = await self.db_manager.save_offre(job)
-                    if saved_job:
-                        new_jobs.append(saved_job)
+                stored_jobs = []
+                try:
+                    async for job in scraper.iter_jobs(metier.to_dict(), location=self.location):
+                        site_stats['jobs_found'] += 1
+                        saved_job = await self.db_manager.save_offre(job)
+                        stored_jobs.append(job)
+                        if saved_job:
+                            latency_metrics.record_stored(saved_job, scraper.provides_publication_time)
+                            new_jobs.append(saved_job)
+                finally:
+                    scraper.record_stored(stored_jobs)
 
                 site_stats['new_jobs'] += len(new_jobs)
 
@@ -153,6 +167,7 @@ class MonitoringManager:
                     self.logger.info(
                         f"  📝 {len(new_jobs)} nouvelles offres pour {metier.nom} sur {scraper.site_name}"
                     )
+                    scraper.record_new_offers(new_jobs)
 
                 # Délai entre les métiers
                 await asyncio.sleep(self.settings.scraping.request_delay)
@@ -181,33 +196,8 @@ class MonitoringManager:
                     if not metier:
                         continue
 
-                    # Récupérer les utilisateurs intéressés
-                    users = await self.db_manager.get_users_for_metier(metier.id)
-                    if not users:
-                        # Marquer comme notifié même sans utilisateurs
-                        job.is_notified = True
-                        continue
-
-                    # Créer l'embed de notification
-                    embed = self._create_job_embed(job, metier)
-
-                    # Envoyer la notification
-                    success = await self.webhook_notifier.send_job_notification(embed, users)
-
-                    if success:
-                        # Sauvegarder les notifications individuelles
-                        for user in users:
-                            await self.db_manager.save_notification(
-                                user_id=user.id,
-                                offre_id=job.id,
-                                webhook_url=self.settings.discord.webhook_url
-                            )
-
-                        # Marquer l'offre comme notifiée
-                        job.is_notified = True
-                        notification_count += len(users)
-
-                        self.logger.info(f"  📢 Notification envoyée pour {job.titre} à {len(users)} utilisateurs")
+                    # Notifier immédiatement ou mettre en attente selon les préférences
+                    notification_count += await self.dispatcher.dispatch(job, metier.nom)
 
                     # Délai pour éviter le rate limiting
                     await asyncio.sleep(1)
@@ -221,38 +211,6 @@ class MonitoringManager:
             self.logger.error(f"Erreur envoi notifications: {e}")
             return 0
 
-    def _create_job_embed(self, job, metier):
-        """Crée un embed Discord pour une offre (réutilise la logique du bot)"""
-        import discord
-
-        embed = discord.Embed(
-            title=f"🎯 Nouvelle offre d'alternance - {metier.nom}",
-            description=job.titre,
-            color=discord.Color.green(),
-            timestamp=datetime.now(),
-            url=job.url
-        )
-
-        if job.entreprise:
-            embed.add_field(name="🏢 Entreprise", value=job.entreprise, inline=True)
-
-        if job.lieu:
-            embed.add_field(name="📍 Lieu", value=job.lieu, inline=True)
-
-        if job.salaire:
-            embed.add_field(name="💰 Salaire", value=job.salaire, inline=True)
-
-        if job.description:
-            desc_short = job.description[:200] + "..." if len(job.description) > 200 else job.description
-            embed.add_field(name="📝 Description", value=desc_short, inline=False)
-
-        embed.add_field(name="🌐 Source", value=job.source_site.capitalize(), inline=True)
-        embed.add_field(name="🔗 Postuler", value=f"[Voir l'offre]({job.url})", inline=True)
-
-        embed.set_footer(text=f"Bot Alternance • {job.source_site}")
-
-        return embed
-
     async def _send_monitoring_summary(self, cycle_stats: Dict):
         """Envoie un résumé du cycle de monitoring"""
         try:
@@ -261,7 +219,8 @@ class MonitoringManager:
                 'total_new_jobs': cycle_stats['total_new_jobs'],
                 'total_notifications': cycle_stats['total_notifications'],
                 'duration_minutes': cycle_stats['duration'] / 60,
-                'top_metiers': []  # Peut être enrichi avec plus de données
+                'top_metiers': [],  # Peut être enrichi avec plus de données
+                'latency_lines': latency_metrics.summary_lines()
             }
 
             await self.webhook_notifier.send_monitoring_summary(summary)